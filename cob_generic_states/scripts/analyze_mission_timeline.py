@@ -0,0 +1,20 @@
+#!/usr/bin/python
+#
+# Prints critical path, idle times and folded stacks of mission timelines recorded with
+# cob_generic_states.mission_timeline.MissionTimelineRecorder, one summary per file (scenario run).
+#
+# usage: rosrun cob_generic_states analyze_mission_timeline.py run1.jsonl [run2.jsonl ...]
+# The folded stacks can be rendered with flamegraph.pl after removing the other sections.
+
+import sys
+
+from cob_generic_states.mission_timeline import load_timeline, summarize_timeline
+
+if __name__ == "__main__":
+	if len(sys.argv) < 2:
+		print "usage: analyze_mission_timeline.py timeline.jsonl [timeline.jsonl ...]"
+		sys.exit(1)
+	for filename in sys.argv[1:]:
+		print "=== %s ===" % filename
+		print summarize_timeline(load_timeline(filename))
+		print
@@ -3,3 +3,12 @@ from generic_manipulation_states import *
 from generic_navigation_states import *
 from generic_perception_states import *
 from generic_state_machines import *
+from component_groups import *
+from motion_groups import *
+from ik_utils import *
+from rigid_transforms import *
+from settle_monitor import *
+from component_interlocks import *
+from speech_scheduler import *
+from light_manager import *
+from task_queue import *
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements actions on groups of components which are executed in parallel.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+import time
+
+import smach
+import smach_ros
+
+from simple_script_server import *
+sss = simple_script_server()
+
+## Executes the script server actions of several components in parallel
+#
+# components is a list of (component name, list of actions), e.g. [("head", ["init", "recover"]), ("arm", ["recover"])].
+# The actions of one component are executed one after the other, different components in parallel threads.
+# Returns a dict component name -> "succeeded", "failed" (error code of an action != 0 or an action raised) or "timeout"
+# (the actions did not finish within timeout [s], the thread is left running in the background).
+def bring_up_components(components, timeout = 60.0):
+	results = {}
+	lock = threading.Lock()
+
+	def bring_up(component, actions):
+		result = "succeeded"
+		for action in actions:
+			try:
+				handle = getattr(sss, action)(component)
+			except Exception, e:
+				rospy.logerr("%s of component <<%s>> failed: %s", action, component, str(e))
+				result = "failed"
+				break
+			if handle.get_error_code() != 0:
+				rospy.logerr("%s of component <<%s>> failed with error code %d", action, component, handle.get_error_code())
+				result = "failed"
+				break
+		with lock:
+			results[component] = result
+
+	threads = []
+	for (component, actions) in components:
+		thread = threading.Thread(target=bring_up, args=(component, actions))
+		thread.daemon = True
+		thread.start()
+		threads.append((component, thread))
+
+	deadline = time.time() + timeout
+	for (component, thread) in threads:
+		thread.join(max(0.0, deadline - time.time()))
+
+	with lock:
+		for (component, thread) in threads:
+			if component not in results:
+				rospy.logerr("Component <<%s>> did not finish within %.1f s", component, timeout)
+				results[component] = "timeout"
+		return dict(results)
+
+## Bring up state
+#
+# This state executes the init and recover actions of all components in parallel.
+# It fails if any component except the optional ones failed, the failed components are written to userdata.failed_components.
+class bring_up(smach.State):
+	def __init__(self, components, optional_components = [], timeout = 60.0):
+		smach.State.__init__(
+			self,
+			outcomes=['succeeded', 'failed'],
+			output_keys=['failed_components'])
+
+		self.components = components
+		self.optional_components = optional_components
+		self.timeout = timeout
+
+	def execute(self, userdata):
+		results = bring_up_components(self.components, self.timeout)
+		failed_components = [component for (component, result) in results.items() if result != "succeeded"]
+		userdata.failed_components = failed_components
+		if len(failed_components) > 0:
+			rospy.logwarn("Components failed to come up: %s", ", ".join(sorted(failed_components)))
+		if len([component for component in failed_components if component not in self.optional_components]) > 0:
+			return 'failed'
+		return 'succeeded'
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements interlocks between components which move in the background.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+import time
+
+## Default interlocks
+#
+# component -> components whose background motions have to be finished before the component may move
+# (every component waits for its own background motion). The arm passes through the tray area, so arm and tray
+# exclude each other, and the base does not drive before arm and hand are stowed. The interlocks of a component can be
+# replaced on the parameter server, e.g. /component_interlocks/base: [] lets the base drive while the arm is moving.
+default_interlocks = {"arm": ["tray"], "tray": ["arm"], "base": ["arm", "sdh"]}
+
+## Component interlock
+#
+# Lets motions, e.g. stowing arm and tray after a delivery, finish in the background while the next states already run.
+# A state acquires the components it is going to move, which waits for the background motions of these components and
+# of the components interlocked with them.
+#
+# get_component_interlock().run_in_background(MotionGroup({"arm": "folded", "sdh": "home"}))
+# ...
+# if not get_component_interlock().acquire(["base"]):
+# 	return 'failed'
+class ComponentInterlock:
+	def __init__(self, interlocks_param = "/component_interlocks"):
+		self.lock = threading.Lock()
+		self.background = {}			# component -> MotionGroup moving the component in the background
+		self.interlocks = dict(default_interlocks)
+		self.interlocks.update(rospy.get_param(interlocks_param, {}))
+
+	## Starts the MotionGroup group in the background after the components of the group have been acquired
+	def run_in_background(self, group, timeout = 60.0):
+		if not self.acquire(group.targets.keys(), timeout):
+			return False
+		group.start()
+		with self.lock:
+			for component in group.targets:
+				self.background[component] = group
+		return True
+
+	def get_required_components(self, components):
+		required = set(components)
+		for component in components:
+			required.update(self.interlocks.get(component, []))
+		return required
+
+	def is_busy(self, component):
+		with self.lock:
+			return component in self.background
+
+	## Waits until the background motions of components and of their interlocked components have finished, returns False
+	# if one of them failed or did not finish within timeout [s]
+	def acquire(self, components, timeout = 60.0):
+		deadline = time.time() + timeout
+		succeeded = True
+		for component in sorted(self.get_required_components(components)):
+			with self.lock:
+				group = self.background.get(component)
+			if group == None:
+				continue
+			result = group.wait_for_component(component, deadline)
+			if result.status == "timeout":
+				rospy.logerr("Background motion of %s did not finish within %.1f s", component, timeout)
+				return False
+			with self.lock:
+				if self.background.get(component) is group:
+					del self.background[component]
+			if not result.succeeded():
+				rospy.logerr("Background motion failed: %s", str(result))
+				succeeded = False		# the other components are still waited for, so that none is left moving
+		return succeeded
+
+_component_interlock = None
+_component_interlock_creation_lock = threading.Lock()
+
+## Returns the component interlock shared by all states
+def get_component_interlock():
+	global _component_interlock
+	with _component_interlock_creation_lock:
+		if _component_interlock == None:
+			_component_interlock = ComponentInterlock()
+		return _component_interlock
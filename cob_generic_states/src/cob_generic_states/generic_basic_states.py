@@ -62,6 +62,14 @@ import smach_ros
 from simple_script_server import *
 sss = simple_script_server()
 
+from cob_generic_states.state_instrumentation import instrumented, blocking_section
+from cob_generic_states.component_groups import bring_up_components
+from cob_generic_states.component_interlocks import get_component_interlock
+from cob_generic_states.motion_groups import MotionGroup
+from cob_generic_states.speech_scheduler import get_speech_scheduler
+from cob_generic_states.light_manager import get_light_manager
+from cob_generic_states.task_queue import TaskQueue
+
 from cob_generic_states.srv import *
 
 from std_srvs.srv import *
@@ -72,79 +80,49 @@ from cob_srvs.srv import *
 # This state will initialize all hardware drivers.
 class initialize(smach.State):
 
-	def __init__(self):
+	def __init__(self, timeout = 60.0):
 
 		smach.State.__init__(
 			self,
 			outcomes=['succeeded', 'failed'])
-		
-	def execute(self, userdata):
-		sss.set_light("light", "yellow")
-
-		# initialize components
-		handle_head = sss.init("head")
-		if handle_head.get_error_code() != 0:
-			return 'failed'
-
-		handle_torso = sss.init("torso")
-		if handle_torso.get_error_code() != 0:
-			return 'failed'
-			
-		handle_tray = sss.init("tray")
-		if handle_tray.get_error_code() != 0:
-			return 'failed'
-
-		#handle_arm = sss.init("arm")
-		#if handle_arm.get_error_code() != 0:
-		#	return 'failed'
-
-		handle_sdh = sss.init("sdh")
-		#if handle_sdh.get_error_code() != 0:
-		#	return 'failed'
 
-		handle_base = sss.init("base")
-		if handle_base.get_error_code() != 0:
-			return 'failed'		
-		
-		# recover components
-		handle_head = sss.recover("head")
-		if handle_head.get_error_code() != 0:
-			return 'failed'		
-		
-		handle_torso = sss.recover("torso")
-		if handle_torso.get_error_code() != 0:
-			return 'failed'
+		self.timeout = timeout
 		
-		handle_tray = sss.recover("tray")
-		if handle_tray.get_error_code() != 0:
-			return 'failed'
-
-		handle_arm = sss.recover("arm")
-		#if handle_arm.get_error_code() != 0:
-		#	return 'failed'
-
-		#handle_sdh = sss.recover("sdh")
-		#if handle_sdh.get_error_code() != 0:
-		#	return 'failed'
-
-		handle_base = sss.recover("base")
-		if handle_base.get_error_code() != 0:
+	@instrumented
+	def execute(self, userdata):
+		get_light_manager().set_light("yellow")
+
+		# initialize and recover all components in parallel, the init of the arm and the recover of the sdh are skipped
+		results = bring_up_components([
+			("head", ["init", "recover"]),
+			("torso", ["init", "recover"]),
+			("tray", ["init", "recover"]),
+			("sdh", ["init"]),
+			("arm", ["recover"]),
+			("base", ["init", "recover"])], self.timeout)
+
+		# failures of sdh and arm are tolerated
+		failed_components = [component for (component, result) in results.items() if result != "succeeded" and component not in ["sdh", "arm"]]
+		if len(failed_components) > 0:
+			rospy.logerr("Initialization failed for components: %s", ", ".join(sorted(failed_components)))
 			return 'failed'
 
 		# set light
-		sss.set_light("light", "green")
+		get_light_manager().set_light("green")
 
 		return 'succeeded'
 
 ## Wait for task state
 #
-# This state waits for a new task
+# This state waits for a new task. Tasks which are triggered while the state machine is busy are queued and dispatched by
+# priority in the next executions of this state.
 class wait_for_task(smach.State):
 	def __init__(self, tasks=[]):
 		smach.State.__init__(self,
 			outcomes=tasks)
 		
 		self.tasks = tasks
+		self.task_queue = TaskQueue()
 		rospy.Service('/trigger_new_task', TriggerTask, self.task_callback)
 
 	def task_callback(self, req):
@@ -154,24 +132,19 @@ class wait_for_task(smach.State):
 			res.success.data = False
 			res.error_message.data = "Task rejected"
 		else:
-			self.task = req.task.data
-			print "New task triggered: ", self.task
+			self.task_queue.put(req.task.data, req.priority)
+			print "New task triggered: ", req.task.data
 			res.success.data = True
 			res.error_message.data = "Task accepted"
-			self.task_active = True
+		res.queue_depth = self.task_queue.get_queue_depth()
 		return res
 
+	@instrumented
 	def execute(self, userdata):
-		self.task_active = False
-
-		loop_rate = rospy.Rate(1) #hz
-		while not rospy.is_shutdown():
-			if not self.task_active:
-				rospy.loginfo("Waiting for new task...")
-				loop_rate.sleep()
-			else:
-				self.task_active = True
-				return self.task
+		if self.task_queue.get_queue_depth() == 0:
+			rospy.loginfo("Waiting for new task...")
+		with blocking_section():
+			return self.task_queue.get() # None on shutdown
 
 
 ## Get order state
@@ -185,12 +158,12 @@ class get_order(smach.State):
 
 		self.srv_name_tablet_gui = "/tablet_gui"
 
+	@instrumented
 	def execute(self, userdata):
-		handle_tray = sss.move("tray","up",False)
-		sss.move("head","front",False)
-		sss.sleep(2)
-		sss.say("sound", ["What do you want to order? Please select on my screen."],False)
-		sss.move("torso","front",False)
+		# the prompt does not wait for the arm to be stowed, the tray moves up as soon as it is
+		get_speech_scheduler().say(["What do you want to order? Please select on my screen."])
+		if not get_component_interlock().run_in_background(MotionGroup({"tray": "up", "head": "front", "torso": "front"})):
+			return 'failed'
 
 		# check for tablet_gui service
 		try:
@@ -203,7 +176,8 @@ class get_order(smach.State):
 		try:
 			gui_service = rospy.ServiceProxy(self.srv_name_tablet_gui, GetOrder)
 			req = GetOrderRequest()
-			res = gui_service(req) # TODO: use action to be able to cancel the order e.g. after timeout
+			with blocking_section():
+				res = gui_service(req) # TODO: use action to be able to cancel the order e.g. after timeout
 			if len(res.object_name.data) <= 0 or res.object_name.data == "failed":
 				rospy.logerr("Order failed")
 				return 'no_order'
@@ -212,9 +186,9 @@ class get_order(smach.State):
 			print "Service call failed: %s"%e
 			return 'failed'
 		
-		sss.say("sound", ["You ordered " + res.object_name.data + "."],False)
-		sss.move("torso","nod",False)
-		sss.move("tray","down",False)
+		get_speech_scheduler().say(["You ordered " + res.object_name.data + "."])
+		if not get_component_interlock().run_in_background(MotionGroup({"torso": "nod", "tray": "down"})):
+			return 'failed'
 		return 'succeeded'
 
 
@@ -227,9 +201,12 @@ class deliver_object(smach.State):
 			outcomes=['succeeded', 'retry', 'failed'],
 			input_keys=['object_name'])
 
+	@instrumented
 	def execute(self, userdata):
+		if not get_component_interlock().acquire(["head", "torso"]):
+			return 'failed'
 		sss.move("head","front",False)
-		sss.say("sound", ["Here is your " + userdata.object_name + ". Please help yourself."],False)
+		get_speech_scheduler().say(["Here is your " + userdata.object_name + ". Please help yourself."])
 		sss.move("torso","nod",False)
 		
 #		try:
@@ -254,8 +231,9 @@ class deliver_object(smach.State):
 #				print "Service call failed: %s"%e
 #				return 'failed'
 #			loop_rate.sleep()
-		sss.wait_for_input()		
-		sss.move("tray","down",False)
-		sss.move("torso","nod",False)
+		with blocking_section():
+			sss.wait_for_input()
+		if not get_component_interlock().run_in_background(MotionGroup({"tray": "down", "torso": "nod"})):
+			return 'failed'
 		
 		return 'succeeded'
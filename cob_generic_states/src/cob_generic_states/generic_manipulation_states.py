@@ -57,7 +57,6 @@
 
 import rospy
 import sys
-import copy
 
 import smach
 import smach_ros
@@ -65,6 +64,15 @@ import smach_ros
 from simple_script_server import *
 sss = simple_script_server()
 
+from cob_generic_states.state_instrumentation import instrumented
+from cob_generic_states.motion_groups import MotionGroup
+from cob_generic_states.ik_utils import get_ik_cache, GraspIKPipeline, ComputeIKSolver
+from cob_generic_states.grasp_candidates import generate_grasp_candidates, evaluate_grasp_candidates
+from cob_generic_states.rigid_transforms import translate_poses, stamp_poses
+from cob_generic_states.component_interlocks import get_component_interlock
+from cob_generic_states.speech_scheduler import get_speech_scheduler
+from cob_generic_states.light_manager import get_light_manager
+
 import tf
 from std_srvs.srv import Trigger
 from moveit_msgs.srv import *
@@ -73,7 +81,8 @@ from sensor_msgs.msg import *
 
 ## Select grasp state
 #
-# This state select a grasping strategy. A high object will be grasped from the side, a low one from top.
+# This state select a grasping strategy. The side and top grasp candidates are evaluated in one batch, the grasp type of the
+# best reachable candidate is selected. A high object is preferably grasped from the side, a low one from top.
 class select_grasp(smach.State):
 
 	def __init__(self):
@@ -83,9 +92,12 @@ class select_grasp(smach.State):
 			input_keys=['object'])
 		
 		self.height_switch = 0.5 # Switch to select top or side grasp using the height of the object over the ground in [m].
+		self.type_penalty = 1.0 # Score penalty for candidates of the grasp type which is not preferred by height_switch.
 		
+		self.ik_solver = ComputeIKSolver("sdh_grasp_link")
 		self.listener = tf.TransformListener()
 
+	@instrumented
 	def execute(self, userdata):
 		try:
 			# transform object_pose into base_link
@@ -98,9 +110,26 @@ class select_grasp(smach.State):
 			return 'failed'
 		
 		if object_pose_bl.pose.position.z >= self.height_switch: #TODO how to select grasps for objects within a cabinet or shelf?
-			return 'side'
+			preferred = 'side'
 		else: 
-			return 'top'
+			preferred = 'top'
+
+		# the ik results are cached, so the grasp states reuse them
+		get_ik_cache().update_configuration_version()
+		try:
+			candidates = evaluate_grasp_candidates(generate_grasp_candidates("side") + generate_grasp_candidates("top"), object_pose_bl, self.ik_solver)
+		except rospy.ServiceException, e:
+			rospy.logerr("Ik service call failed: %s"%e)
+			return 'failed'
+		if len(candidates) == 0:
+			rospy.logwarn("No reachable grasp candidate found, selecting %s grasp", preferred)
+			return preferred
+		for candidate in candidates:
+			if candidate.grasp_type != preferred:
+				candidate.score -= self.type_penalty
+		candidates.sort(key=lambda candidate: -candidate.score)
+		rospy.loginfo("Selected %s", str(candidates[0]))
+		return candidates[0].grasp_type
 
 
 ## Grasp side state
@@ -116,21 +145,15 @@ class grasp_side(smach.State):
 		
 		self.max_retries = max_retries
 		self.retries = 0
-		self.iks = rospy.ServiceProxy('/compute_ik', GetPositionIK)
+		self.ik_solver = ComputeIKSolver("sdh_grasp_link")
 		self.listener = tf.TransformListener()
 
-	def callIKSolver(self, current_pose, goal_pose):
-		req = GetPositionIKRequest()
-		req.ik_request.ik_link_name = "sdh_grasp_link"
-		#req.ik_request.ik_seed_state.joint_state.position = current_pose
-		req.ik_request.pose_stamped = goal_pose
-		resp = self.iks(req)
-		result = []
-		for o in resp.solution.joint_state.position:
-			result.append(o)
-		return (result, resp.error_code)
-
+	@instrumented
 	def execute(self, userdata):
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["sdh", "arm", "torso", "head"]):
+			return 'failed'
+
 		# check if maximum retries reached
 		if self.retries > self.max_retries:
 			self.retries = 0
@@ -144,53 +167,22 @@ class grasp_side(smach.State):
 		object_pose_in.header.stamp = self.listener.getLatestCommonTime("/base_link",object_pose_in.header.frame_id)
 		object_pose_bl = self.listener.transformPose("/base_link", object_pose_in)
 	
-		[new_x, new_y, new_z, new_w] = tf.transformations.quaternion_from_euler(-1.5708, 0, 2.481) # rpy 
-		object_pose_bl.pose.orientation.x = new_x
-		object_pose_bl.pose.orientation.y = new_y
-		object_pose_bl.pose.orientation.z = new_z
-		object_pose_bl.pose.orientation.w = new_w
-
-		# FIXME: this is calibration between camera and hand and should be removed from scripting level
-		#object_pose_bl.pose.position.x = object_pose_bl.pose.position.x #- 0.06 #- 0.08
-		#object_pose_bl.pose.position.y = object_pose_bl.pose.position.y #- 0.05
-		object_pose_bl.pose.position.z = object_pose_bl.pose.position.z + 0.1
-		
-		# calculate pre and post grasp positions
-		pre_grasp_bl = PoseStamped()
-		post_grasp_bl = PoseStamped()
-		pre_grasp_bl = copy.deepcopy(object_pose_bl)
-		post_grasp_bl = copy.deepcopy(object_pose_bl)
-
-		pre_grasp_bl.pose.position.x = pre_grasp_bl.pose.position.x + 0.0 # x offset for pre grasp position
-		pre_grasp_bl.pose.position.y = pre_grasp_bl.pose.position.y + 0.10 # y offset for pre grasp position
-		pre_grasp_bl.pose.position.z = pre_grasp_bl.pose.position.z + 0.2 # z offset for pre grasp position
-		post_grasp_bl.pose.position.x = post_grasp_bl.pose.position.x + 0.05 # x offset for post grasp position
-		post_grasp_bl.pose.position.z = post_grasp_bl.pose.position.z + 0.17 # z offset for post grasp position
-		
-		# calculate ik solutions for pre grasp configuration
-		arm_pre_grasp = rospy.get_param("/script_server/arm/pregrasp")
-		(pre_grasp_conf, error_code) = self.callIKSolver(arm_pre_grasp[0], pre_grasp_bl)		
-		if(error_code.val != error_code.SUCCESS):
-			rospy.logerr("Ik pre_grasp Failed")
-			self.retries += 1
-			return 'not_grasped'
-		
-		# calculate ik solutions for grasp configuration
-		(grasp_conf, error_code) = self.callIKSolver(pre_grasp_conf, object_pose_bl)
-		if(error_code.val != error_code.SUCCESS):
-			rospy.logerr("Ik grasp Failed")
-			self.retries += 1
-			return 'not_grasped'
-		
-		# calculate ik solutions for pre grasp configuration
-		(post_grasp_conf, error_code) = self.callIKSolver(grasp_conf, post_grasp_bl)
-		if(error_code.val != error_code.SUCCESS):
-			rospy.logerr("Ik post_grasp Failed")
+		# evaluate the side grasp candidates (orientations and offsets around the nominal grasp) in parallel and take the most reachable one
+		get_ik_cache().update_configuration_version()
+		try:
+			candidates = evaluate_grasp_candidates(generate_grasp_candidates("side"), object_pose_bl, self.ik_solver)
+		except rospy.ServiceException, e:
+			rospy.logerr("Ik service call failed: %s"%e)
+			return 'failed'
+		if len(candidates) == 0:
+			rospy.logerr("No side grasp candidate with ik solutions for pre_grasp, grasp and post_grasp found")
 			self.retries += 1
 			return 'not_grasped'
+		rospy.loginfo("Executing %s", str(candidates[0]))
+		[pre_grasp_conf, grasp_conf, post_grasp_conf] = candidates[0].configurations
 
 		# execute grasp
-		sss.say("sound", ["I am grasping the " + userdata.object.label + " now."],False)
+		get_speech_scheduler().say(["I am grasping the " + userdata.object.label + " now."])
 		sss.move("torso","front")
 		handle_arm = sss.move("arm", [pre_grasp_conf , grasp_conf],False)
 		sss.move("sdh", "cylopen")
@@ -220,11 +212,22 @@ class grasp_side_planned(smach.State):
 		self.retries = 0
 		self.transformer = rospy.ServiceProxy('/cob_pose_transform/get_pose_stamped_transformed', GetPoseStampedTransformed)
 		self.grasped = rospy.ServiceProxy('/sdh_controller/is_cylindric_grasped', Trigger)
+		self.ik_cache = get_ik_cache()
+		self.ik_pipeline = GraspIKPipeline(self.callIKSolver)
+
+	def callIKSolver(self, goal_pose, seed_js):
+		# the target poses are poses of arm_7_link, retries on (nearly) the same object pose are answered from the cache
+		return self.ik_cache.solve(lambda: sss.calculate_ik(goal_pose, seed_js), goal_pose, "arm_7_link", seed_js)
 
+	@instrumented
 	def execute(self, userdata):
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["sdh", "arm", "torso", "head"]):
+			return 'failed'
+
 		# check if maximum retries reached
 		if self.retries > self.max_retries:
-			sss.set_light("light", 'yellow')
+			get_light_manager().set_light('yellow')
 			self.retries = 0
 			handle_torso = sss.move("torso","home",False)
 			handle_torso.wait()
@@ -256,7 +259,7 @@ class grasp_side_planned(smach.State):
 		res = self.transformer(req)
 		if not res.success:
 			print "Service call GetPoseStampedTransformed failed", sys.exc_info()
-			sss.set_light("light", 'red')
+			get_light_manager().set_light('red')
 			self.retries = 0
 			return 'failed'
 		
@@ -270,53 +273,36 @@ class grasp_side_planned(smach.State):
 		#object_pose_bl.pose.orientation.w = new_w
 
 		# calculate pre and post grasp positions
-		pre_grasp_bl = PoseStamped()
-		post_grasp_bl = PoseStamped()
-		pre_grasp_bl = copy.deepcopy(object_pose_bl)
-		post_grasp_bl = copy.deepcopy(object_pose_bl)
-
 		#TODO: check offsets
-		pre_grasp_bl.pose.position.x = pre_grasp_bl.pose.position.x + 0.0 # x offset for pre grasp position
-		pre_grasp_bl.pose.position.y = pre_grasp_bl.pose.position.y + 0.10 # y offset for pre grasp position
-		pre_grasp_bl.pose.position.z = pre_grasp_bl.pose.position.z + 0.2 # z offset for pre grasp position
-		post_grasp_bl.pose.position.x = post_grasp_bl.pose.position.x + 0.05 # x offset for post grasp position
-		post_grasp_bl.pose.position.z = post_grasp_bl.pose.position.z + 0.17 # z offset for post grasp position
+		pre_grasp_offset = [0.0, 0.10, 0.2] # x, y, z offset for pre grasp position
+		post_grasp_offset = [0.05, 0.0, 0.17] # x, y, z offset for post grasp position
+		[pre_grasp_bl, post_grasp_bl] = stamp_poses(object_pose_bl.header, translate_poses(object_pose_bl.pose, [pre_grasp_offset, post_grasp_offset]))
 
-		sss.set_light("light", 'blue')
+		get_light_manager().set_light('blue')
 	
-		# calculate ik solutions for pre grasp configuration
+		# calculate ik solutions for pre grasp, grasp and post grasp configuration in parallel
 		seed_js = JointState()
 		seed_js.name = rospy.get_param("/arm_controller/joint_names")
 		seed_js.position = rospy.get_param("/script_server/arm/pregrasp")[0]
-		pre_grasp_js, error_code = sss.calculate_ik(pre_grasp_bl,seed_js)
-		if(error_code.val != error_code.SUCCESS):
-			if error_code.val != error_code.NO_IK_SOLUTION:
-				sss.set_light("light", 'red')
-			rospy.logerr("Ik pre_grasp Failed")
-			self.retries += 1
-			return 'not_grasped'
-		
-		# calculate ik solutions for grasp configuration
-		grasp_js, error_code = sss.calculate_ik(object_pose_bl, pre_grasp_js)
-		if(error_code.val != error_code.SUCCESS):
-			if error_code.val != error_code.NO_IK_SOLUTION:
-				sss.set_light("light", 'red')
-			rospy.logerr("Ik grasp Failed")
-			self.retries += 1
-			return 'not_grasped'
-		
-		# calculate ik solutions for pre grasp configuration
-		post_grasp_js, error_code = sss.calculate_ik(post_grasp_bl, grasp_js)
-		if(error_code.val != error_code.SUCCESS):
-			if error_code.val != error_code.NO_IK_SOLUTION:
-				sss.set_light("light", 'red')
-			rospy.logerr("Ik post_grasp Failed")
-			self.retries += 1
-			return 'not_grasped'
+		self.ik_cache.update_configuration_version()
+		try:
+			results = self.ik_pipeline.solve([pre_grasp_bl, object_pose_bl, post_grasp_bl], seed_js)
+		except rospy.ServiceException, e:
+			get_light_manager().set_light('red')
+			rospy.logerr("Ik service call failed: %s"%e)
+			return 'failed'
+		for ((js, error_code), name) in zip(results, ["pre_grasp", "grasp", "post_grasp"]):
+			if(error_code.val != error_code.SUCCESS):
+				if error_code.val != error_code.NO_IK_SOLUTION:
+					get_light_manager().set_light('red')
+				rospy.logerr("Ik %s Failed"%name)
+				self.retries += 1
+				return 'not_grasped'
+		[pre_grasp_js, grasp_js, post_grasp_js] = [js for (js, error_code) in results]
 
 		# execute grasp
-		sss.set_light("light", 'yellow')
-		sss.say("sound", ["I am grasping the " + userdata.object.label + " now."],False)
+		get_light_manager().set_light('yellow')
+		get_speech_scheduler().say(["I am grasping the " + userdata.object.label + " now."])
 		#handle_arm = sss.move("arm", [pre_grasp_conf , grasp_conf],False)
 		handle_arm = sss.move_planned("arm", [list(pre_grasp_js.position)],False)
 		sss.move("sdh", "cylopen",False)
@@ -334,7 +320,7 @@ class grasp_side_planned(smach.State):
 		if self.grasped().success.data:
 			return 'grasped'
 		else:
-			sss.say("sound", ["I could not grasp " + userdata.object.label],False)
+			get_speech_scheduler().say(["I could not grasp " + userdata.object.label])
 			return 'not_grasped'
 		
 ## Grasp top state
@@ -350,21 +336,15 @@ class grasp_top(smach.State):
 		
 		self.max_retries = max_retries
 		self.retries = 0
-		self.iks = rospy.ServiceProxy('/compute_ik', GetPositionIK)
+		self.ik_solver = ComputeIKSolver("sdh_grasp_link")
 		self.listener = tf.TransformListener()
 
-	def callIKSolver(self, current_pose, goal_pose):
-		req = GetPositionIKRequest()
-		req.ik_request.ik_link_name = "sdh_grasp_link"
-		#req.ik_request.ik_seed_state.joint_state.position = current_pose
-		req.ik_request.pose_stamped = goal_pose
-		resp = self.iks(req)
-		result = []
-		for o in resp.solution.joint_state.position:
-			result.append(o)
-		return (result, resp.error_code)
-
+	@instrumented
 	def execute(self, userdata):
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["sdh", "arm", "torso", "head"]):
+			return 'failed'
+
 		# check if maximum retries reached
 		if self.retries > self.max_retries:
 			self.retries = 0
@@ -378,52 +358,22 @@ class grasp_top(smach.State):
 		object_pose_in.header.stamp = self.listener.getLatestCommonTime("/base_link",object_pose_in.header.frame_id)
 		object_pose_bl = self.listener.transformPose("/base_link", object_pose_in)
 	
-		# use a predefined (fixed) orientation for object_pose_bl
-		[new_x, new_y, new_z, new_w] = tf.transformations.quaternion_from_euler(3.121, 0.077, -2.662) # rpy 
-		object_pose_bl.pose.orientation.x = new_x
-		object_pose_bl.pose.orientation.y = new_y
-		object_pose_bl.pose.orientation.z = new_z
-		object_pose_bl.pose.orientation.w = new_w
-
-		# FIXME: this is calibration between camera and hand and should be removed from scripting level
-		object_pose_bl.pose.position.x = object_pose_bl.pose.position.x #-0.04 #- 0.08
-		object_pose_bl.pose.position.y = object_pose_bl.pose.position.y# + 0.02
-		object_pose_bl.pose.position.z = object_pose_bl.pose.position.z #+ 0.07
-
-		# calculate pre and post grasp positions
-		pre_grasp_bl = PoseStamped()
-		post_grasp_bl = PoseStamped()
-		pre_grasp_bl = copy.deepcopy(object_pose_bl)
-		post_grasp_bl = copy.deepcopy(object_pose_bl)
-	
-		pre_grasp_bl.pose.position.z = pre_grasp_bl.pose.position.z + 0.18 # z offset for pre grasp position
-		post_grasp_bl.pose.position.x = post_grasp_bl.pose.position.x + 0.05 # x offset for post grasp position
-		post_grasp_bl.pose.position.z = post_grasp_bl.pose.position.z + 0.15 # z offset for post grasp position
-		
-		# calculate ik solutions for pre grasp configuration
-		arm_pre_grasp = rospy.get_param("/script_server/arm/pregrasp_top")
-		(pre_grasp_conf, error_code) = self.callIKSolver(arm_pre_grasp[0], pre_grasp_bl)		
-		if(error_code.val != error_code.SUCCESS):
-			rospy.logerr("Ik pre_grasp Failed")
-			self.retries += 1
-			return 'no_ik_solution'
-		
-		# calculate ik solutions for grasp configuration
-		(grasp_conf, error_code) = self.callIKSolver(pre_grasp_conf, object_pose_bl)
-		if(error_code.val != error_code.SUCCESS):
-			rospy.logerr("Ik grasp Failed")
+		# evaluate the top grasp candidates (orientations and offsets around the nominal grasp) in parallel and take the most reachable one
+		get_ik_cache().update_configuration_version()
+		try:
+			candidates = evaluate_grasp_candidates(generate_grasp_candidates("top"), object_pose_bl, self.ik_solver)
+		except rospy.ServiceException, e:
+			rospy.logerr("Ik service call failed: %s"%e)
+			return 'failed'
+		if len(candidates) == 0:
+			rospy.logerr("No top grasp candidate with ik solutions for pre_grasp, grasp and post_grasp found")
 			self.retries += 1
 			return 'no_ik_solution'
-		
-		# calculate ik solutions for pre grasp configuration
-		(post_grasp_conf, error_code) = self.callIKSolver(grasp_conf, post_grasp_bl)
-		if(error_code.val != error_code.SUCCESS):
-			rospy.logerr("Ik post_grasp Failed")
-			self.retries += 1
-			return 'no_ik_solution'	
+		rospy.loginfo("Executing %s", str(candidates[0]))
+		[pre_grasp_conf, grasp_conf, post_grasp_conf] = candidates[0].configurations
 
 		# execute grasp
-		sss.say("sound", ["I am grasping the " + userdata.object.label + " now."],False)
+		get_speech_scheduler().say(["I am grasping the " + userdata.object.label + " now."])
 		sss.move("torso","home")
 		handle_arm = sss.move("arm", [pre_grasp_conf , grasp_conf],False)
 		sss.move("sdh", "spheropen")
@@ -449,23 +399,25 @@ class put_object_on_tray_side(smach.State):
 			self,
 			outcomes=['succeeded', 'failed'])
 
+	@instrumented
 	def execute(self, userdata):
 		#TODO select position on tray depending on how many objects are on the tray already
+		if not get_component_interlock().acquire(["arm", "tray", "sdh"]):
+			return 'failed'
 		
 		# move object to frontside
-		handle_arm = sss.move("arm","grasp-to-tray",False)
-		sss.sleep(2)
-		sss.move("tray","up")
-		handle_arm.wait()
+		# the tray moves up after the arm has left the tray area (after 2 s)
+		result = MotionGroup({"arm": "grasp-to-tray", "tray": "up"}, delays = {"tray": 2.0}).execute()
+		if not result.succeeded():
+			result.log_failures()
+			return 'failed'
 		
 		# release object
 		sss.move("sdh","cylopen")
 		
-		# move arm to backside again
-		handle_arm = sss.move("arm","tray-to-folded",False)
-		sss.sleep(3)
-		sss.move("sdh","home")
-		handle_arm.wait()
+		# move arm to backside again in the background, the hand is closed when it is clear of the tray (after 3 s)
+		if not get_component_interlock().run_in_background(MotionGroup({"arm": "tray-to-folded", "sdh": "home"}, delays = {"sdh": 3.0})):
+			return 'failed'
 		return 'succeeded'
 
 
@@ -479,23 +431,25 @@ class put_object_on_tray_top(smach.State):
 			self,
 			outcomes=['succeeded', 'failed'])
 
+	@instrumented
 	def execute(self, userdata):
 		#TODO select position on tray depending on how many objects are on the tray already
+		if not get_component_interlock().acquire(["arm", "tray", "sdh"]):
+			return 'failed'
 		
 		# move object to frontside
-		handle_arm = sss.move("arm","grasp-to-tray_top",False)
-		sss.sleep(2)
-		sss.move("tray","up")
-		handle_arm.wait()
+		# the tray moves up after the arm has left the tray area (after 2 s)
+		result = MotionGroup({"arm": "grasp-to-tray_top", "tray": "up"}, delays = {"tray": 2.0}).execute()
+		if not result.succeeded():
+			result.log_failures()
+			return 'failed'
 		
 		# release object
 		sss.move("sdh","spheropen")
 		
-		# move arm to backside again
-		handle_arm = sss.move("arm","tray_top-to-folded",False)
-		sss.sleep(3)
-		sss.move("sdh","home",False)
-		handle_arm.wait()
+		# move arm to backside again in the background, the hand is closed when it is clear of the tray (after 3 s)
+		if not get_component_interlock().run_in_background(MotionGroup({"arm": "tray_top-to-folded", "sdh": "home"}, delays = {"sdh": 3.0})):
+			return 'failed'
 		return 'succeeded'
 
 
@@ -510,19 +464,21 @@ class put_object_on_table(smach.State):
 			outcomes=['succeeded', 'failed'],
 			input_keys=['object_target_pose'])
 
+	@instrumented
 	def execute(self, userdata):
 		# TODO: for placing the object the wrench information from the arm could be used to determine the placing height exactly
 		# TODO: tke into account the current grasping configuration and use this for releasing the object on the table. FIXME: At the moment only a fixed position is used
 
+		if not get_component_interlock().acquire(["arm", "sdh"]):
+			return 'failed'
+
 		# move object to release position
 		sss.move("arm","pregrasp")
 
 		# release object
 		sss.move("sdh","cylopen")
 
-		# move arm to backside again
-		handle_arm = sss.move("arm",["hold","folded"],False)
-		sss.sleep(3)
-		sss.move("sdh","home",False)
-		handle_arm.wait()
+		# move arm to backside again in the background, the hand is closed when it is clear of the object (after 3 s)
+		if not get_component_interlock().run_in_background(MotionGroup({"arm": ["hold","folded"], "sdh": "home"}, delays = {"sdh": 3.0})):
+			return 'failed'
 		return 'succeeded'
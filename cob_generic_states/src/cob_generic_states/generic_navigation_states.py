@@ -65,6 +65,11 @@ from nav_msgs.msg import Odometry
 from simple_script_server import *
 sss = simple_script_server()
 
+from cob_generic_states.state_instrumentation import instrumented
+from cob_generic_states.component_interlocks import get_component_interlock
+from cob_generic_states.speech_scheduler import get_speech_scheduler, PRIORITY_HIGH
+from cob_generic_states.light_manager import get_light_manager
+
 ## Approach pose state
 #
 # This state will try forever to move the robot to the given pose.
@@ -95,6 +100,7 @@ class approach_pose(smach.State):
 		#rospy.loginfo("/base_controller/odometry is publishing a message")
 
 
+	@instrumented
 	def execute(self, userdata):
 
 		# determine target position
@@ -111,8 +117,12 @@ class approach_pose(smach.State):
 			rospy.logerr("Invalid userdata 'pose'")
 			return 'failed'
 
+		# wait for the components which have to be stowed before driving (see component_interlocks)
+		if not get_component_interlock().acquire(["base"]):
+			return 'failed'
+
 		# try reaching pose
-		sss.set_light("light", 'yellow')
+		get_light_manager().set_light('yellow')
 		handle_base = sss.move("base", pose, mode=self.mode, blocking=False)
 		move_second = self.move_second
 
@@ -125,13 +135,13 @@ class approach_pose(smach.State):
 			elif (handle_base.get_state() == 3) and (move_second):
 				return 'succeeded'		
 			elif (handle_base.get_state() == 4):	
-				sss.set_light("light", 'red')
+				get_light_manager().set_light('red')
 				return 'failed'		
 	
 			#Check if the base is moving
 			if not self.is_moving: # robot stands still
 				if timeout > 10:
-					sss.say("sound", ["I can not reach my target position because my path or target is blocked"],False)
+					get_speech_scheduler().say(["I can not reach my target position because my path or target is blocked"], coalesce_key = "path_blocked")
 					timeout = 0
 				else:
 					timeout = timeout + 1
@@ -155,6 +165,7 @@ class approach_pose_without_retry(smach.State):
 		self.move_second = move_second
 		self.is_moving = False
 
+	@instrumented
 	def execute(self, userdata):
 		#Callback for the /base_controller/odometry subscriber
 		def callback(data):
@@ -175,6 +186,10 @@ class approach_pose_without_retry(smach.State):
 			rospy.logerr("Invalid userdata 'pose'")
 			return 'failed'
 
+		# wait for the components which have to be stowed before driving (see component_interlocks)
+		if not get_component_interlock().acquire(["base"]):
+			return 'failed'
+
 		# try reaching pose
 		handle_base = sss.move("base", pose, mode=self.mode, blocking=False)
 		move_second = self.move_second
@@ -196,7 +211,7 @@ class approach_pose_without_retry(smach.State):
 			# evaluate sevice response
 			if not is_moving: # robot stands still
 				if timeout > 10:
-					sss.say("sound", ["I can not reach my target position because my path or target is blocked, I will abort."],False)
+					get_speech_scheduler().say(["I can not reach my target position because my path or target is blocked, I will abort."], priority = PRIORITY_HIGH)
 					rospy.wait_for_service('base_controller/stop',10)
 					try:
 						stop = rospy.ServiceProxy('base_controller/stop',Trigger)
@@ -57,7 +57,6 @@
 
 import rospy
 import os
-import copy
 from math import *
 
 import smach
@@ -66,6 +65,12 @@ import smach_ros
 from simple_script_server import *
 sss = simple_script_server()
 
+from cob_generic_states.state_instrumentation import instrumented
+from cob_generic_states.settle_monitor import get_settle_monitor
+from cob_generic_states.component_interlocks import get_component_interlock
+from cob_generic_states.speech_scheduler import get_speech_scheduler
+from cob_generic_states.light_manager import get_light_manager
+
 from cob_object_detection_msgs.msg import *
 from cob_object_detection_msgs.srv import *
 
@@ -73,16 +78,39 @@ from cob_object_detection_msgs.srv import *
 #
 # In this class the actual object detection is executed exactly one time
 # No further actions are executed
+#
+# Only detections of images which are not older than min_stamp are accepted. The detection service is called again
+# (every retry_period [s]) until it returns a fresh detection or freshness_timeout [s] is exceeded.
 class ObjectDetector:
-	def __init__(self, detector_srv = '/object_detection/detect_object', object_name = "", min_dist = 2  ):
+	def __init__(self, detector_srv = '/object_detection/detect_object', object_name = "", min_dist = 2, freshness_timeout = 2.0, retry_period = 0.1):
 		self.detector_srv = detector_srv 
 		self.object_name = object_name
 		self.min_dist = min_dist
+		self.freshness_timeout = freshness_timeout
+		self.retry_period = retry_period
+		self.detector_service = None
 		print "Contructor ObjectDetector:",self.detector_srv
 	
 		print os.environ['PYTHONPATH']
 
-	def execute(self, userdata):
+	## Returns the result of the detection service for an image not older than min_stamp (stale results are returned after freshness_timeout)
+	def detect(self, object_name, min_stamp):
+		if self.detector_service == None:
+			self.detector_service = rospy.ServiceProxy(self.detector_srv, DetectObjects)
+		req = DetectObjectsRequest()
+		req.object_name.data = object_name
+		deadline = rospy.Time.now() + rospy.Duration(self.freshness_timeout)
+		while True:
+			res = self.detector_service(req)
+			stamp = res.object_list.header.stamp
+			if stamp.is_zero() or stamp >= min_stamp: # detections without stamp can not be checked
+				return res
+			if rospy.Time.now() >= deadline or rospy.is_shutdown():
+				rospy.logwarn("No detection newer than %.3f received, using detection of %.3f", min_stamp.to_sec(), stamp.to_sec())
+				return res
+			rospy.sleep(self.retry_period)
+
+	def execute(self, userdata, min_stamp = None):
 		# determine object name
 		if self.object_name != "":
 			object_name = self.object_name
@@ -92,6 +120,10 @@ class ObjectDetector:
 			rospy.logerr("Invalid userdata 'object_name'")
 			return 'failed'
 
+		# only images taken after the call are accepted by default
+		if min_stamp == None:
+			min_stamp = rospy.Time.now()
+
 		# check if object detection service is available
 		try:
 			rospy.wait_for_service(self.detector_srv,10)
@@ -101,20 +133,7 @@ class ObjectDetector:
 
 		# call object detection service
 		try:
-			detector_service = rospy.ServiceProxy(self.detector_srv, DetectObjects)
-			req = DetectObjectsRequest()
-			req.object_name.data = object_name
-			res = detector_service(req)
-		except rospy.ServiceException, e:
-			print "Service call failed: %s"%e
-			return 'failed'
-
-		# HACK TODO FIXME call object detection service TWICE TO GET CURRENT IMAGE
-		try:
-			detector_service = rospy.ServiceProxy(self.srv_name_object_detection, DetectObjects)
-			req = DetectObjectsRequest()
-			req.object_name.data = object_name
-			res = detector_service(req)
+			res = self.detect(object_name, min_stamp)
 		except rospy.ServiceException, e:
 			print "Service call failed: %s"%e
 			return 'failed'
@@ -125,15 +144,16 @@ class ObjectDetector:
 			return 'no_object'
 		
 		# select nearest object in x-y-plane in head_camera_left_link
-		obj = Detection()
+		obj = None
+		min_dist = self.min_dist
 		for item in res.object_list.detections:
 			dist = sqrt(item.pose.pose.position.x*item.pose.pose.position.x+item.pose.pose.position.y*item.pose.pose.position.y)
-			if dist < self.min_dist:
-				self.min_dist = dist
-				obj = copy.deepcopy(item)
+			if dist < min_dist:
+				min_dist = dist
+				obj = item
 		
 		# check if an object could be found within the min_dist start value
-		if obj.label == "":
+		if obj == None or obj.label == "":
 			rospy.logerr("Object not within target range")
 			return 'no_object'
 
@@ -148,7 +168,7 @@ class ObjectDetector:
 		# we succeeded to detect an object
 		userdata.object = obj
 		
-		return 'success'
+		return 'succeeded'
 		
 
 
@@ -169,7 +189,8 @@ class DetectObjectBackside(smach.State):
 		self.retries = 0
 		self.namespace = namespace
 
-		self.object_detector = ObjectDetector(object_name, detector_srv,2)
+		self.object_detector = ObjectDetector(detector_srv, object_name, 2)
+		self.settle_monitor = get_settle_monitor()
 	
 		#ToDo: Read from yaml	
 		
@@ -200,18 +221,23 @@ class DetectObjectBackside(smach.State):
 		#self.torso_poses.append("back_left")
 		#self.torso_poses.append("back_left_extreme")
 
+	@instrumented
 	def execute(self, userdata):
 
-		sss.set_light("light", 'blue')
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["sdh", "arm", "torso", "head"]):
+			return 'failed'
+
+		get_light_manager().set_light('blue')
 	
 		# check if maximum retries reached
 		if self.retries > self.max_retries:
-			sss.set_light("light", 'yellow')
+			get_light_manager().set_light('yellow')
 			self.retries = 0
 			handle_torso = sss.move("torso","home",False)
 			handle_torso.wait()
 			handle_arm = sss.move("arm","look_at_table-to-folded")
-			sss.set_light("light", 'blue')
+			get_light_manager().set_light('blue')
 			return 'no_more_retries'
 		
 		# move sdh as feedback
@@ -224,15 +250,15 @@ class DetectObjectBackside(smach.State):
 			object_name = "given object"
 
 		if self.retries == 0: # only move arm, sdh and head for the first try
-			sss.set_light("light", 'yellow')
-			sss.say("sound", ["I will now search for the " + object_name + "."],False)
+			get_light_manager().set_light('yellow')
+			get_speech_scheduler().say(["I will now search for the " + object_name + "."])
 			handle_arm = sss.move("arm","folded-to-look_at_table",False)
 			handle_torso = sss.move("torso","shake",False)
 			handle_head = sss.move("head","back",False)
 			handle_arm.wait()
 			handle_head.wait()
 			handle_torso.wait()
-			sss.set_light("light", 'blue')
+			get_light_manager().set_light('blue')
 
 		# have an other viewing point for each retry
 		handle_torso = sss.move("torso",self.torso_poses[self.retries % len(self.torso_poses)]) 
@@ -240,14 +266,14 @@ class DetectObjectBackside(smach.State):
 		# move sdh as feedback
 		sss.move("sdh","home",False) # UHR: see above
 		
-		# wait for image to become stable
-		sss.sleep(2)
+		# wait for image to become stable (at most 2s), only images taken afterwards are used
+		self.settle_monitor.wait_until_settled(["torso_", "head_"], timeout = 2.0)
 	
-		result = self.object_detector.execute(userdata)
+		result = self.object_detector.execute(userdata, rospy.Time.now())
 		if result == 'failed':
 			self.retries = 0
-			sss.set_light("light", 'red')
-		elif results == "no_object":
+			get_light_manager().set_light('red')
+		elif result == "no_object":
 			self.retries += 1
 		else: #suceeded
 			self.retries = 0
@@ -276,7 +302,8 @@ class DetectObjectFrontside(smach.State):
 		self.torso_poses = []
 
 		print "DetectObjectFrontside", self.detector_srv
-		self.object_detector = ObjectDetector(object_name, self.detector_srv)
+		self.object_detector = ObjectDetector(self.detector_srv, object_name)
+		self.settle_monitor = get_settle_monitor()
 	
 		#ToDo: Read from yaml	
 		if rospy.has_param(namespace):
@@ -302,18 +329,23 @@ class DetectObjectFrontside(smach.State):
 		#self.torso_poses.append("front_left")
 		#self.torso_poses.append("front_left_extreme")
 
+	@instrumented
 	def execute(self, userdata):
 
-		sss.set_light("light", 'blue')
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["sdh", "arm", "torso", "head"]):
+			return 'failed'
+
+		get_light_manager().set_light('blue')
 	
 		# check if maximum retries reached
 		if self.retries > self.max_retries:
-			sss.set_light("light", 'yellow')
+			get_light_manager().set_light('yellow')
 			self.retries = 0
 			handle_torso = sss.move("torso","home",False)
 			handle_torso.wait()
 			handle_arm = sss.move("arm","look_at_table-to-folded")
-			sss.set_light("light", 'blue')
+			get_light_manager().set_light('blue')
 			return 'no_more_retries'
 		
 		# move sdh as feedback
@@ -326,13 +358,13 @@ class DetectObjectFrontside(smach.State):
 			object_name = "given object"
 
 		if self.retries == 0: # only move sdh and head for the first try
-			sss.set_light("light", 'yellow')
-			sss.say("sound", ["I will now search for the " + object_name + "."],False)
+			get_light_manager().set_light('yellow')
+			get_speech_scheduler().say(["I will now search for the " + object_name + "."])
 			handle_torso = sss.move("torso","shake",False)
 			handle_head = sss.move("head","front",False)
 			handle_head.wait()
 			handle_torso.wait()
-			sss.set_light("light", 'blue')
+			get_light_manager().set_light('blue')
 
 		# have an other viewing point for each retry
 		handle_torso = sss.move("torso",self.torso_poses[self.retries % len(self.torso_poses)]) 
@@ -340,14 +372,14 @@ class DetectObjectFrontside(smach.State):
 		# move sdh as feedback
 		sss.move("sdh","home",False) # UHR: see above
 		
-		# wait for image to become stable
-		sss.sleep(2)
+		# wait for image to become stable (at most 2s), only images taken afterwards are used
+		self.settle_monitor.wait_until_settled(["torso_", "head_"], timeout = 2.0)
 	
-		result = self.object_detector.execute(userdata)
+		result = self.object_detector.execute(userdata, rospy.Time.now())
 		if result == 'failed':
 			self.retries = 0
-			sss.set_light("light", 'red')
-		elif results == "no_object":
+			get_light_manager().set_light('red')
+		elif result == "no_object":
 			self.retries += 1
 		else: #suceeded
 			self.retries = 0
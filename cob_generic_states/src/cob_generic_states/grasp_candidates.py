@@ -0,0 +1,182 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements the generation and ranking of grasp candidates.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import numpy
+import sys
+import threading
+import Queue
+
+from cob_generic_states.ik_utils import GraspIKPipeline
+from cob_generic_states.rigid_transforms import quaternion_from_euler, quaternion_about_axis, quaternion_multiply, quaternion_matrix, translate_poses, stamp_poses
+
+## Grasp types
+#
+# rpy: nominal orientation of sdh_grasp_link in base_link
+# offset: offset of the grasp position from the object position in base_link [m]
+# pre_grasp_offset, post_grasp_offset: offsets of the pre and post grasp position from the grasp position [m]
+# seed_param: joint configuration which is used as ik seed
+grasp_types = {
+	"side": {"rpy": (-1.5708, 0.0, 2.481),
+		"offset": (0.0, 0.0, 0.1),		# FIXME: this is calibration between camera and hand and should be removed from scripting level
+		"pre_grasp_offset": (0.0, 0.10, 0.2),
+		"post_grasp_offset": (0.05, 0.0, 0.17),
+		"height_offsets": [0.0, 0.03],
+		"seed_param": "/script_server/arm/pregrasp"},
+	"top": {"rpy": (3.121, 0.077, -2.662),
+		"offset": (0.0, 0.0, 0.0),
+		"pre_grasp_offset": (0.0, 0.0, 0.18),
+		"post_grasp_offset": (0.05, 0.0, 0.15),
+		"height_offsets": [0.0],
+		"seed_param": "/script_server/arm/pregrasp_top"}}
+
+## Grasp candidate
+#
+# The nominal grasp of grasp_type rotated by yaw_offset [rad] around the vertical axis and moved up by height_offset [m].
+# The approach direction (pre grasp offset) is rotated with the hand. After the evaluation configurations holds the ik
+# solutions of the pre grasp, grasp and post grasp pose and score the reachability score (higher is better).
+class GraspCandidate:
+	def __init__(self, grasp_type, yaw_offset = 0.0, height_offset = 0.0):
+		self.grasp_type = grasp_type
+		self.yaw_offset = yaw_offset
+		self.height_offset = height_offset
+		self.configurations = None
+		self.error_code = None
+		self.score = None
+
+	def is_feasible(self):
+		return self.configurations != None
+
+	## Returns the pre grasp, grasp and post grasp pose for the object pose in base_link
+	def get_poses(self, object_pose_bl):
+		grasp_type = grasp_types[self.grasp_type]
+		rotation = quaternion_about_axis(self.yaw_offset, (0.0, 0.0, 1.0))
+		orientation = quaternion_multiply(rotation, quaternion_from_euler(*grasp_type["rpy"]))
+		grasp_offset = numpy.array(grasp_type["offset"]) + (0.0, 0.0, self.height_offset)
+		pre_grasp_offset = numpy.dot(quaternion_matrix(rotation), grasp_type["pre_grasp_offset"])
+		translations = [grasp_offset + pre_grasp_offset, grasp_offset, grasp_offset + grasp_type["post_grasp_offset"]]
+		return stamp_poses(object_pose_bl.header, translate_poses(object_pose_bl.pose, translations, orientation))
+
+	def __repr__(self):
+		return "%s grasp (yaw offset %.2f, height offset %.2f, score %s)" % (self.grasp_type, self.yaw_offset, self.height_offset, str(self.score))
+
+## Returns the grasp candidates of grasp_type with number_of_orientations yaw offsets in [-yaw_range, yaw_range] [rad],
+# ordered by their distance to the nominal grasp
+def generate_grasp_candidates(grasp_type, number_of_orientations = 5, yaw_range = 0.4):
+	yaw_offsets = [0.0]
+	if number_of_orientations > 1:
+		yaw_offsets = [-yaw_range + 2.0*yaw_range*i/(number_of_orientations - 1) for i in range(number_of_orientations)]
+	candidates = []
+	for height_offset in grasp_types[grasp_type]["height_offsets"]:
+		for yaw_offset in yaw_offsets:
+			candidates.append(GraspCandidate(grasp_type, yaw_offset, height_offset))
+	candidates.sort(key=lambda candidate: (abs(candidate.yaw_offset) + abs(candidate.height_offset)))
+	return candidates
+
+## Evaluates the ik feasibility of all candidates in parallel (at most max_parallel candidates at a time) and returns the
+# feasible candidates ranked by their reachability score
+#
+# The score is the negative joint space travel from the seed over the pre grasp and grasp to the post grasp configuration
+# [rad], reduced by orientation_weight times the yaw offset, so short arm motions close to the nominal grasp are preferred.
+# solver(pose_stamped, seed) has to return (joint position list, error_code). An exception of the solver stops the
+# evaluation and is raised again in the calling thread.
+def evaluate_grasp_candidates(candidates, object_pose_bl, solver, max_parallel = 4, orientation_weight = 1.0):
+	pipeline = GraspIKPipeline(solver)
+	seeds = {}
+	for grasp_type in set([candidate.grasp_type for candidate in candidates]):
+		seeds[grasp_type] = rospy.get_param(grasp_types[grasp_type]["seed_param"])[0]
+
+	pending = Queue.Queue()
+	for candidate in candidates:
+		pending.put(candidate)
+	errors = []
+	def evaluate():
+		while len(errors) == 0:
+			try:
+				candidate = pending.get_nowait()
+			except Queue.Empty:
+				return
+			seed = seeds[candidate.grasp_type]
+			try:
+				results = pipeline.solve(candidate.get_poses(object_pose_bl), seed)
+			except Exception:
+				errors.append(sys.exc_info())
+				return
+			candidate.error_code = results[-1][1]
+			for (conf, error_code) in results:
+				if error_code.val != error_code.SUCCESS:
+					candidate.error_code = error_code
+					break
+			else:
+				candidate.configurations = [conf for (conf, error_code) in results]
+				travel = 0.0
+				previous = seed
+				for conf in candidate.configurations:
+					travel += sum([abs(a - b) for (a, b) in zip(previous, conf)])
+					previous = conf
+				candidate.score = -travel - orientation_weight*abs(candidate.yaw_offset)
+	workers = [threading.Thread(target=evaluate) for i in range(min(max_parallel, len(candidates)))]
+	for worker in workers:
+		worker.start()
+	for worker in workers:
+		worker.join()
+	if len(errors) > 0:
+		raise errors[0][0], errors[0][1], errors[0][2]
+
+	feasible = [candidate for candidate in candidates if candidate.is_feasible()]
+	feasible.sort(key=lambda candidate: -candidate.score)
+	return feasible
@@ -0,0 +1,239 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements a cache for inverse kinematics solutions.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import copy
+import sys
+import threading
+
+from collections import OrderedDict
+
+from moveit_msgs.srv import GetPositionIK, GetPositionIKRequest
+
+## IK cache
+#
+# LRU cache of inverse kinematics results keyed on the quantized target pose (frame, position and orientation), the ik link
+# and the quantized seed state. Successful results and NO_IK_SOLUTION results are cached, all other errors (e.g. timeouts)
+# are not. The whole cache is cleared when the robot configuration version changes, the version is read from the
+# parameter configuration_version_param and has to be increased by every node which changes the kinematics or the
+# collision environment of the arm.
+#
+# (grasp_conf, error_code) = get_ik_cache().solve(lambda: sss.calculate_ik(pose, seed), pose, "arm_7_link", seed)
+class IKCache:
+	def __init__(self, max_entries = 200, position_resolution = 0.005, orientation_resolution = 0.01, seed_resolution = 0.01, configuration_version_param = "/ik_cache/configuration_version"):
+		self.lock = threading.Lock()
+		self.max_entries = max_entries
+		self.position_resolution = position_resolution				# in [m]
+		self.orientation_resolution = orientation_resolution		# quaternion components
+		self.seed_resolution = seed_resolution						# in [rad]
+		self.configuration_version_param = configuration_version_param
+		self.configuration_version = None
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	## Reads the robot configuration version from the parameter server and clears the cache if it changed
+	def update_configuration_version(self):
+		self.set_configuration_version(rospy.get_param(self.configuration_version_param, 0))
+
+	def set_configuration_version(self, version):
+		with self.lock:
+			if version != self.configuration_version:
+				self.configuration_version = version
+				self.entries.clear()
+
+	def invalidate(self):
+		with self.lock:
+			self.entries.clear()
+
+	def get_key(self, pose_stamped, link_name, seed):
+		p = pose_stamped.pose.position
+		q = pose_stamped.pose.orientation
+		sign = 1.0
+		if q.w < 0.0:
+			sign = -1.0		# q and -q are the same orientation
+		position = tuple([int(round(v/self.position_resolution)) for v in [p.x, p.y, p.z]])
+		orientation = tuple([int(round(sign*v/self.orientation_resolution)) for v in [q.x, q.y, q.z, q.w]])
+		if hasattr(seed, "position"):
+			seed = seed.position		# JointState
+		seed = tuple([int(round(v/self.seed_resolution)) for v in seed])
+		return (pose_stamped.header.frame_id.lstrip("/"), position, orientation, link_name, seed)
+
+	## Returns a copy of the cached (solution, error_code) or None
+	def get(self, key):
+		with self.lock:
+			if key not in self.entries:
+				self.misses += 1
+				return None
+			self.hits += 1
+			result = self.entries.pop(key)
+			self.entries[key] = result
+		return copy.deepcopy(result)
+
+	def put(self, key, result):
+		with self.lock:
+			self.entries.pop(key, None)
+			self.entries[key] = copy.deepcopy(result)
+			while len(self.entries) > self.max_entries:
+				self.entries.popitem(last=False)
+
+	## Returns the cached result for the query or calls solver, which has to return (solution, error_code)
+	def solve(self, solver, pose_stamped, link_name, seed = []):
+		key = self.get_key(pose_stamped, link_name, seed)
+		result = self.get(key)
+		if result != None:
+			return result
+		(solution, error_code) = solver()
+		if error_code.val in [error_code.SUCCESS, error_code.NO_IK_SOLUTION]:
+			self.put(key, (solution, error_code))
+		return (solution, error_code)
+
+	def get_counters(self):
+		with self.lock:
+			return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+## IK solver
+#
+# Calls the /compute_ik service of MoveIt for ik_link_name, seed is a joint position list for the joints of the arm.
+# The results are cached in the shared IK cache. solver(pose_stamped, seed) returns (joint position list, error_code).
+class ComputeIKSolver:
+	def __init__(self, ik_link_name = "sdh_grasp_link", service_name = "/compute_ik", joint_names_param = "/arm_controller/joint_names"):
+		self.ik_link_name = ik_link_name
+		self.joint_names_param = joint_names_param
+		self.iks = rospy.ServiceProxy(service_name, GetPositionIK)
+		self.ik_cache = get_ik_cache()
+
+	def __call__(self, goal_pose, seed):
+		return self.ik_cache.solve(lambda: self.solve(goal_pose, seed), goal_pose, self.ik_link_name, seed)
+
+	def solve(self, goal_pose, seed):
+		req = GetPositionIKRequest()
+		req.ik_request.ik_link_name = self.ik_link_name
+		req.ik_request.ik_seed_state.joint_state.name = rospy.get_param(self.joint_names_param)
+		req.ik_request.ik_seed_state.joint_state.position = seed
+		req.ik_request.pose_stamped = goal_pose
+		resp = self.iks(req)
+		return (list(resp.solution.joint_state.position), resp.error_code)
+
+_ik_cache = None
+_ik_cache_creation_lock = threading.Lock()
+
+## Returns the IK cache shared by all grasp states
+def get_ik_cache():
+	global _ik_cache
+	with _ik_cache_creation_lock:
+		if _ik_cache == None:
+			_ik_cache = IKCache()
+		return _ik_cache
+
+## Grasp IK pipeline
+#
+# Solves the ik queries of a grasp (e.g. pre grasp, grasp and post grasp pose) concurrently, all seeded from the same joint
+# state (e.g. the pregrasp configuration). Afterwards the joint space continuity of consecutive solutions is checked, a
+# solution which differs in any joint by more than max_joint_step [rad] from its predecessor is solved again, seeded from
+# the predecessor. So the latency is about one ik round trip as long as the solutions are continuous.
+#
+# solver(pose_stamped, seed) has to return (solution, error_code), solution and seed are joint position lists or JointStates.
+# An exception of the solver (e.g. rospy.ServiceException) is raised again by solve() in the calling thread.
+class GraspIKPipeline:
+	def __init__(self, solver, max_joint_step = 1.0):
+		self.solver = solver
+		self.max_joint_step = max_joint_step
+
+	## Returns a list with (solution, error_code) for each pose
+	def solve(self, poses, seed):
+		results = [None]*len(poses)
+		errors = [None]*len(poses)
+		def solve_pose(i):
+			try:
+				results[i] = self.solver(poses[i], seed)
+			except Exception:
+				errors[i] = sys.exc_info()
+		workers = [threading.Thread(target=solve_pose, args=(i,)) for i in range(len(poses))]
+		for worker in workers:
+			worker.start()
+		for worker in workers:
+			worker.join()
+		for error in errors:
+			if error != None:
+				raise error[0], error[1], error[2]
+		for (solution, error_code) in results:
+			if error_code.val != error_code.SUCCESS:
+				return results
+
+		for i in range(1, len(results)):
+			if self.is_continuous(results[i-1][0], results[i][0]):
+				continue
+			rospy.logdebug("IK solution %d is not continuous to its predecessor, solving it again", i)
+			results[i] = self.solver(poses[i], results[i-1][0])
+			if results[i][1].val != results[i][1].SUCCESS:
+				return results
+			if not self.is_continuous(results[i-1][0], results[i][0]):
+				rospy.logwarn("IK solution %d is not continuous to its predecessor", i)
+		return results
+
+	def is_continuous(self, first, second):
+		if hasattr(first, "position"):
+			first = first.position		# JointState
+		if hasattr(second, "position"):
+			second = second.position
+		if len(first) != len(second):
+			return False
+		for (a, b) in zip(first, second):
+			if abs(a - b) > self.max_joint_step:
+				return False
+		return True
@@ -0,0 +1,175 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements a manager which debounces light commands.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+import time
+
+from simple_script_server import *
+sss = simple_script_server()
+
+from cob_generic_states.mission_timeline import get_active_state, active_state
+
+## Light manager
+#
+# Keeps track of the colour of the light and sends colour changes from a background thread, so that states can set the
+# light from inside control loops without waiting for the light component. Requests for the colour which is already set
+# are dropped. At most one colour is sent per coalesce_window [s], requests made in between are coalesced and only the
+# last one is sent. All light commands have to go through the manager, otherwise it does not know the current colour.
+#
+# get_light_manager().set_light("yellow")
+class LightManager:
+	def __init__(self, component = "light", coalesce_window = None, set_light_function = None):
+		self.component = component
+		if coalesce_window == None:
+			coalesce_window = rospy.get_param("/light_manager/coalesce_window", 0.2)
+		self.coalesce_window = coalesce_window
+		self.set_light_function = set_light_function
+		if self.set_light_function == None:
+			self.set_light_function = lambda color: sss.set_light(self.component, color)
+		self.condition = threading.Condition()
+		self.color = None			# colour which has been sent last
+		self.pending = None			# colour which is waiting to be sent
+		self.pending_state = ""		# state which requested the pending colour, the colour change is recorded for it
+		self.sending = None			# colour which is being sent
+		self.last_sent = 0.0
+		self.counters = {"requested": 0, "sent": 0, "unchanged": 0, "coalesced": 0, "failed": 0}
+		self.thread = threading.Thread(target = self._run)
+		self.thread.daemon = True
+		self.thread.start()
+
+	## Requests color (a colour name or [r, g, b, a] like for sss.set_light), returns immediately
+	def set_light(self, color):
+		with self.condition:
+			self.counters["requested"] += 1
+			if self.pending != None:
+				self.counters["coalesced"] += 1
+				self.pending = None
+			current = self.color
+			if self.sending != None:
+				current = self.sending
+			if color == current:
+				self.counters["unchanged"] += 1
+				return
+			self.pending = color
+			self.pending_state = get_active_state()
+			self.condition.notify_all()
+
+	def _run(self):
+		while True:
+			with self.condition:
+				while self.pending == None or time.time() < self.last_sent + self.coalesce_window:
+					if self.pending == None:
+						self.condition.wait()
+					else:
+						self.condition.wait(self.last_sent + self.coalesce_window - time.time())
+				color = self.pending
+				state = self.pending_state
+				self.pending = None
+				self.sending = color
+			success = True
+			try:
+				with active_state(state):
+					self.set_light_function(color)
+			except Exception, e:
+				rospy.logerr("Setting light to %s failed: %s", str(color), str(e))
+				success = False
+			with self.condition:
+				self.sending = None
+				self.last_sent = time.time()
+				if success:
+					self.counters["sent"] += 1
+					self.color = color
+				else:
+					self.counters["failed"] += 1
+				self.condition.notify_all()
+
+	## Returns the colour which has been sent last
+	def get_color(self):
+		with self.condition:
+			return self.color
+
+	## Waits until the last requested colour has been sent, returns False on timeout
+	def wait_until_idle(self, timeout = None):
+		deadline = None
+		if timeout != None:
+			deadline = time.time() + timeout
+		with self.condition:
+			while self.pending != None or self.sending != None:
+				if deadline == None:
+					self.condition.wait(1.0)
+				elif time.time() >= deadline:
+					return False
+				else:
+					self.condition.wait(deadline - time.time())
+			return True
+
+	## Returns the counters of requested, sent, unchanged (dropped no-op), coalesced and failed colour changes
+	def get_statistics(self):
+		with self.condition:
+			return dict(self.counters)
+
+_light_manager = None
+_light_manager_creation_lock = threading.Lock()
+
+## Returns the light manager shared by all states
+def get_light_manager():
+	global _light_manager
+	with _light_manager_creation_lock:
+		if _light_manager == None:
+			_light_manager = LightManager()
+		return _light_manager
@@ -0,0 +1,321 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Records the timeline of a mission (states and component actions) and analyzes it offline.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+import time
+import json
+import inspect
+import Queue
+
+import smach
+
+## Names of the simple_script_server methods which are recorded as component actions
+SCRIPT_SERVER_ACTIONS = ["init", "recover", "stop", "halt", "move", "move_base_rel", "move_planned", "set_light", "say", "play", "sleep", "wait_for_input"]
+
+_active_state = threading.local()	# name of the recorded state which is executed by the current thread
+
+## Returns the name of the recorded state which is executed by the current thread ("" outside of recorded states)
+def get_active_state():
+	return getattr(_active_state, "name", "")
+
+## Context manager attributing the actions of a helper thread to the state which queued the work
+#
+# state = get_active_state()		# when the work is queued
+# ...
+# with active_state(state):			# in the helper thread
+# 	sss.say(text)
+class active_state:
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		self.previous = get_active_state()
+		_active_state.name = self.name
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		_active_state.name = self.previous
+		return False
+
+## Mission timeline recorder
+#
+# Writes one JSON object per line into filename, states are named by their labels below the attached container:
+#   {"type": "state", "name": "PICK/DETECT_OBJECT", "start": t, "end": t, "outcome": "succeeded", "thread": id}
+#   {"type": "action", "component": "arm", "action": "move", "parameter": "folded", "blocking": true, "start": t, "end": t, "state": "PICK/GRASP_SIDE", "error_code": 0, "thread": id}
+#   {"type": "container", "name": "SM", "event": "start"|"termination", "time": t, "outcome": ...}
+#   {"type": "transition", "name": "SM", "active_states": [...], "time": t}
+# The file is written by a background thread, so that recording does not delay the mission. Actions are attributed to the
+# state executed by the calling thread, helper threads (motion groups, speech scheduler, light manager) attribute them to
+# the state which queued the work.
+#
+# recorder = MissionTimelineRecorder("/tmp/mission.jsonl")
+# recorder.attach(sm, "SM")
+# recorder.hook_script_server(simple_script_server)
+# sm.execute()
+# recorder.close()
+class MissionTimelineRecorder:
+	def __init__(self, filename):
+		self.file = open(filename, "w")
+		self.queue = Queue.Queue()
+		self.hooked_classes = []
+		self.writer = threading.Thread(target=self.write_events)
+		self.writer.daemon = True
+		self.writer.start()
+
+	## Records the states of container and of all containers nested in it, name is the label of container in the timeline
+	#
+	# The states are named by their path below the attached container, which also holds for the children of a
+	# smach.Concurrence running in threads of their own. path is the state name of a nested container.
+	def attach(self, container, name, path = ""):
+		container.register_start_cb(self.start_cb, [name])
+		if isinstance(container, smach.StateMachine):
+			container.register_transition_cb(self.transition_cb, [name])
+		container.register_termination_cb(self.termination_cb, [name])
+		for label, state in container.get_children().items():
+			state_name = label
+			if path != "":
+				state_name = path + "/" + label
+			self.wrap_state(state, state_name)
+			if isinstance(state, smach.Container):
+				self.attach(state, name + "/" + label, state_name)
+
+	## Records the calls of the SCRIPT_SERVER_ACTIONS of all instances of script_server_class (e.g. simple_script_server)
+	def hook_script_server(self, script_server_class):
+		for action in SCRIPT_SERVER_ACTIONS:
+			method = getattr(script_server_class, action, None)
+			if method == None:
+				continue
+			setattr(script_server_class, action, self.wrap_action(action, method))
+			self.hooked_classes.append((script_server_class, action, method))
+
+	## Restores the script server and writes the remaining events
+	def close(self):
+		for (script_server_class, action, method) in self.hooked_classes:
+			setattr(script_server_class, action, method)
+		self.hooked_classes = []
+		self.queue.put(None)
+		self.writer.join()
+		self.file.close()
+
+	def wrap_state(self, state, name):
+		execute = state.execute
+		def recorded_execute(userdata):
+			event = {"type": "state", "name": name, "start": time.time(), "outcome": "exception", "thread": threading.current_thread().ident}
+			try:
+				with active_state(name):
+					event["outcome"] = execute(userdata)
+				return event["outcome"]
+			finally:
+				event["end"] = time.time()
+				self.queue.put(event)
+		state.execute = recorded_execute
+
+	def wrap_action(self, action, method):
+		recorder = self
+		def recorded_action(script_server, *args, **kwargs):
+			try:
+				callargs = inspect.getcallargs(method, script_server, *args, **kwargs)
+			except TypeError:
+				return method(script_server, *args, **kwargs)		# raises the error of the invalid call
+			blocking = callargs.get("blocking", True)		# e.g. sleep and wait_for_input always block
+			parameter = ""
+			for key in ["parameter_name", "text", "duration"]:
+				if key in callargs:
+					parameter = str(callargs[key])[:100]
+					break
+			event = {"type": "action", "action": action, "blocking": blocking, "start": time.time(),
+				"component": str(callargs.get("component_name", "")), "parameter": parameter,
+				"state": get_active_state(), "thread": threading.current_thread().ident}
+			try:
+				handle = method(script_server, *args, **kwargs)
+				if blocking and hasattr(handle, "get_error_code"):
+					event["error_code"] = handle.get_error_code()
+				return handle
+			finally:
+				event["end"] = time.time()
+				recorder.queue.put(event)
+		recorded_action.__name__ = method.__name__
+		recorded_action.__doc__ = method.__doc__
+		return recorded_action
+
+	def start_cb(self, userdata, initial_states, name):
+		self.queue.put({"type": "container", "name": name, "event": "start", "time": time.time(), "initial_states": list(initial_states)})
+
+	def transition_cb(self, userdata, active_states, name):
+		self.queue.put({"type": "transition", "name": name, "time": time.time(), "active_states": list(active_states)})
+
+	def termination_cb(self, userdata, terminal_states, container_outcome, name):
+		self.queue.put({"type": "container", "name": name, "event": "termination", "time": time.time(), "outcome": container_outcome})
+
+	def write_events(self):
+		while True:
+			event = self.queue.get()
+			if event == None:
+				break
+			self.file.write(json.dumps(event, separators=(',', ':')) + "\n")
+		self.file.flush()
+
+
+## Reads a timeline written by MissionTimelineRecorder
+def load_timeline(filename):
+	events = []
+	with open(filename) as f:
+		for line in f:
+			if len(line.strip()) > 0:
+				events.append(json.loads(line))
+	return events
+
+def _merge_intervals(intervals):
+	merged = []
+	for (start, end) in sorted(intervals):
+		if len(merged) > 0 and start <= merged[-1][1]:
+			merged[-1][1] = max(merged[-1][1], end)
+		else:
+			merged.append([start, end])
+	return merged
+
+def _covered_time(intervals, start, end):
+	covered = 0.0
+	for (s, e) in _merge_intervals([(max(s, start), min(e, end)) for (s, e) in intervals if e > start and s < end]):
+		covered += e - s
+	return covered
+
+def _child_states(states, parent):
+	# direct children of the execution parent (top level states for parent None)
+	if parent == None:
+		return [s for s in states if "/" not in s["name"]]
+	return [s for s in states if s["name"].startswith(parent["name"] + "/") and s["name"].count("/") == parent["name"].count("/") + 1
+		and s["start"] >= parent["start"] and s["end"] <= parent["end"]]
+
+## Returns the states which determined the duration of the run in execution order
+#
+# Sequential states are all on the critical path, of concurrently running states only the one finishing last.
+# Each entry is (nesting depth, state name, duration, longest blocking action of that state or None).
+def critical_path(events):
+	states = [e for e in events if e["type"] == "state"]
+	actions = [e for e in events if e["type"] == "action" and e["blocking"]]
+	path = []
+	def follow(parent, depth):
+		critical = []
+		for s in sorted(_child_states(states, parent), key=lambda s: s["start"]):
+			if len(critical) > 0 and s["start"] < critical[-1]["end"]:
+				if s["end"] > critical[-1]["end"]:
+					critical[-1] = s
+			else:
+				critical.append(s)
+		for s in critical:
+			own_actions = [a for a in actions if a["state"] == s["name"] and a["start"] >= s["start"] and a["end"] <= s["end"]]
+			longest_action = None
+			if len(own_actions) > 0:
+				a = max(own_actions, key=lambda a: a["end"] - a["start"])
+				longest_action = (a["component"] + "." + a["action"] + "(" + a["parameter"] + ")", a["end"] - a["start"])
+			path.append((depth, s["name"], s["end"] - s["start"], longest_action))
+			follow(s, depth + 1)
+	follow(None, 0)
+	return path
+
+## Returns the idle time of every state, i.e. the time in which neither a blocking component action nor a child state was running
+def idle_times(events):
+	states = [e for e in events if e["type"] == "state"]
+	actions = [e for e in events if e["type"] == "action" and e["blocking"]]
+	idle = {}
+	for s in states:
+		busy = [(a["start"], a["end"]) for a in actions if a["state"] == s["name"] and a["start"] >= s["start"] and a["end"] <= s["end"]]
+		busy += [(c["start"], c["end"]) for c in _child_states(states, s)]
+		idle[s["name"]] = idle.get(s["name"], 0.0) + (s["end"] - s["start"]) - _covered_time(busy, s["start"], s["end"])
+	return idle
+
+## Returns the folded stacks ("PICK;GRASP_SIDE;arm.move" -> self time in [ms]) as used by flame graph tools
+def folded_stacks(events):
+	states = [e for e in events if e["type"] == "state"]
+	actions = [e for e in events if e["type"] == "action" and e["blocking"]]
+	stacks = {}
+	for s in states:
+		children = [(c["start"], c["end"]) for c in _child_states(states, s)]
+		own_actions = [a for a in actions if a["state"] == s["name"] and a["start"] >= s["start"] and a["end"] <= s["end"]]
+		self_time = (s["end"] - s["start"]) - _covered_time(children + [(a["start"], a["end"]) for a in own_actions], s["start"], s["end"])
+		stack = s["name"].replace("/", ";")
+		stacks[stack] = stacks.get(stack, 0.0) + 1000.0*self_time
+		for a in own_actions:
+			action_stack = stack + ";" + a["component"] + "." + a["action"]
+			stacks[action_stack] = stacks.get(action_stack, 0.0) + 1000.0*(a["end"] - a["start"])
+	return stacks
+
+## Returns a printable summary of the timeline with critical path, idle times and folded stacks
+def summarize_timeline(events):
+	lines = []
+	times = [e.get("start", e.get("time")) for e in events] + [e.get("end", e.get("time")) for e in events]
+	if len(times) == 0:
+		return "empty timeline"
+	lines.append("total duration: %.3f s" % (max(times) - min(times)))
+	lines.append("")
+	lines.append("critical path:")
+	for (depth, name, duration, longest_action) in critical_path(events):
+		if longest_action != None:
+			lines.append("  %8.3f s  %s%s   (longest action: %s %.3f s)" % (duration, "  "*depth, name, longest_action[0], longest_action[1]))
+		else:
+			lines.append("  %8.3f s  %s%s" % (duration, "  "*depth, name))
+	lines.append("")
+	lines.append("idle time per state:")
+	for (name, idle) in sorted(idle_times(events).items(), key=lambda i: -i[1]):
+		lines.append("  %8.3f s  %s" % (idle, name))
+	lines.append("")
+	lines.append("folded stacks [ms]:")
+	for (stack, value) in sorted(folded_stacks(events).items()):
+		lines.append("%s %d" % (stack, int(round(value))))
+	return "\n".join(lines)
@@ -0,0 +1,242 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements the parallel execution of motions of several components (motion groups).
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+import time
+
+from simple_script_server import *
+sss = simple_script_server()
+
+from cob_generic_states.mission_timeline import get_active_state, active_state
+
+## Result of the motion of one component within a motion group
+#
+# status is "succeeded", "failed", "timeout", "skipped" (the previous motion of the component in a chained group did not succeed)
+# or "stopped" (the group has been stopped before the motion succeeded).
+class ComponentMotionResult:
+	def __init__(self, component, target, status, state = None, error_code = None, duration = None):
+		self.component = component
+		self.target = target
+		self.status = status
+		self.state = state					# actionlib goal state of the motion (3 = succeeded)
+		self.error_code = error_code
+		self.duration = duration			# from dispatch to end of the motion in [s]
+
+	def succeeded(self):
+		return self.status == "succeeded"
+
+	def __repr__(self):
+		return "%s -> %s: %s (state %s, error code %s)" % (self.component, str(self.target), self.status, str(self.state), str(self.error_code))
+
+## Results of a motion group, component name -> ComponentMotionResult
+class MotionGroupResult(dict):
+	def succeeded(self):
+		return len(self.failed_components()) == 0
+
+	def failed_components(self):
+		return [component for (component, result) in self.items() if not result.succeeded()]
+
+	def log_failures(self):
+		for component in sorted(self.failed_components()):
+			rospy.logerr("Motion failed: %s", str(self[component]))
+
+## Motion group
+#
+# Moves several components to their targets in parallel and waits for all of them with one common deadline.
+#
+# result = MotionGroup({"arm": "folded", "tray": "down", "head": "front"}).execute(timeout = 30.0)
+# if not result.succeeded():
+# 	result.log_failures()
+#
+# Groups can be chained with overlap: every component of the next group starts as soon as its own motion in the previous
+# group has succeeded, the other components of the next group start immediately.
+#
+# first = MotionGroup({"arm": "pregrasp", "head": "back"}).start()
+# second = first.chain({"arm": "folded", "tray": "down"})
+# result = second.wait()
+#
+# delays (component name -> time in [s] or start condition) postpones the start of single components, e.g. to avoid
+# collisions. A start condition is a callable which blocks until the component may start.
+#
+# stop() stops all motions of a group which are running and cancels the ones which are not dispatched yet, e.g. the
+# second stage of a chain if another component of the first stage has failed:
+#
+# if not first.wait().succeeded():
+# 	second.stop()
+class MotionGroup:
+	def __init__(self, targets, delays = {}, previous = None):
+		self.targets = dict(targets)
+		self.delays = dict(delays)
+		self.previous = previous
+		self.lock = threading.Lock()
+		self.handles = {}
+		self.start_times = {}
+		self.skipped = {}			# component -> result of the previous motion which prevented the dispatch
+		self.dispatched = dict([(component, threading.Event()) for component in self.targets])
+		self.started = False
+		self.stopped = False
+		self.state = ""			# state which started the group, the delayed and chained motions are recorded for it
+
+	## Dispatches all motions without blocking
+	def start(self):
+		if self.started:
+			return self
+		self.started = True
+		self.state = get_active_state()
+		for (component, target) in self.targets.items():
+			if self._has_delay(component) or (self.previous != None and component in self.previous.targets):
+				dispatcher = threading.Thread(target=self._dispatch_when_free, args=(component, target))
+				dispatcher.daemon = True
+				dispatcher.start()
+			else:
+				self._dispatch(component, target)
+		return self
+
+	## Starts and waits for all motions of this group
+	def execute(self, timeout = None):
+		return self.start().wait(timeout)
+
+	## Returns a new, already started group which starts each of its components as soon as the component is free in this group
+	def chain(self, targets, delays = {}):
+		return MotionGroup(targets, delays, previous = self).start()
+
+	## Stops the dispatched motions of this group and cancels the pending ones
+	def stop(self):
+		with self.lock:
+			self.stopped = True
+			components = self.handles.keys()
+		for component in components:
+			sss.stop(component)
+
+	## Waits for all motions of this group with the common deadline timeout [s] (None = no deadline) and returns the MotionGroupResult
+	def wait(self, timeout = None):
+		self.start()
+		deadline = None
+		if timeout != None:
+			deadline = time.time() + timeout
+		result = MotionGroupResult()
+		for component in self.targets:
+			result[component] = self.wait_for_component(component, deadline)
+		return result
+
+	## Waits for the motion of a single component until deadline (absolute time, None = no deadline) and returns its ComponentMotionResult
+	def wait_for_component(self, component, deadline = None):
+		if not self.dispatched[component].wait(self._remaining(deadline)):
+			return ComponentMotionResult(component, self.targets[component], "timeout")
+		with self.lock:
+			if component in self.skipped:
+				return ComponentMotionResult(component, self.targets[component], "skipped")
+			if component not in self.handles:
+				return ComponentMotionResult(component, self.targets[component], "stopped")
+			handle = self.handles[component]
+			start_time = self.start_times[component]
+
+		remaining = self._remaining(deadline)
+		if remaining == None:
+			handle.wait()
+		else:
+			handle.wait(remaining)
+		state = handle.get_state()
+		error_code = handle.get_error_code()
+		if state == 3:
+			status = "succeeded"
+		elif self.stopped:
+			status = "stopped"
+		elif state in [0, 1] and deadline != None and time.time() >= deadline:
+			status = "timeout"		# goal still pending or active
+		else:
+			status = "failed"
+		return ComponentMotionResult(component, self.targets[component], status, state, error_code, time.time() - start_time)
+
+	def _remaining(self, deadline):
+		if deadline == None:
+			return None
+		return max(0.0, deadline - time.time())
+
+	def _has_delay(self, component):
+		delay = self.delays.get(component, 0.0)
+		return callable(delay) or delay > 0.0
+
+	def _dispatch_when_free(self, component, target):
+		if self.previous != None and component in self.previous.targets:
+			previous_result = self.previous.wait_for_component(component)
+			if not previous_result.succeeded():
+				with self.lock:
+					self.skipped[component] = previous_result
+				self.dispatched[component].set()
+				return
+		if callable(self.delays.get(component)):
+			self.delays[component]()
+		elif self._has_delay(component):
+			rospy.sleep(self.delays[component])
+		self._dispatch(component, target)
+
+	def _dispatch(self, component, target):
+		with self.lock:
+			stopped = self.stopped
+		if not stopped:
+			with active_state(self.state):
+				handle = sss.move(component, target, False)
+			with self.lock:
+				self.handles[component] = handle
+				self.start_times[component] = time.time()
+				stopped = self.stopped		# stop() might have been called during the dispatch
+			if stopped:
+				with active_state(self.state):
+					sss.stop(component)
+		self.dispatched[component].set()
@@ -0,0 +1,156 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements NumPy based rigid transformations of poses.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import math
+import numpy
+
+from std_msgs.msg import Header
+from geometry_msgs.msg import Pose, PoseStamped
+
+# Quaternions are (x, y, z, w) and euler angles are static xyz (roll, pitch, yaw) like in tf.transformations,
+# transformations are homogeneous 4x4 matrices.
+
+def quaternion_from_euler(roll, pitch, yaw):
+	(ci, si) = (math.cos(roll/2.0), math.sin(roll/2.0))
+	(cj, sj) = (math.cos(pitch/2.0), math.sin(pitch/2.0))
+	(ck, sk) = (math.cos(yaw/2.0), math.sin(yaw/2.0))
+	return numpy.array([si*cj*ck - ci*sj*sk, ci*sj*ck + si*cj*sk, ci*cj*sk - si*sj*ck, ci*cj*ck + si*sj*sk])
+
+def quaternion_about_axis(angle, axis):
+	axis = numpy.array(axis, dtype=numpy.float64)
+	axis = axis/numpy.linalg.norm(axis)*math.sin(angle/2.0)
+	return numpy.array([axis[0], axis[1], axis[2], math.cos(angle/2.0)])
+
+## Returns the quaternion q1*q0 (rotation q0 followed by q1)
+def quaternion_multiply(q1, q0):
+	(x0, y0, z0, w0) = q0
+	(x1, y1, z1, w1) = q1
+	return numpy.array([x1*w0 + y1*z0 - z1*y0 + w1*x0,
+		-x1*z0 + y1*w0 + z1*x0 + w1*y0,
+		x1*y0 - y1*x0 + z1*w0 + w1*z0,
+		-x1*x0 - y1*y0 - z1*z0 + w1*w0])
+
+## Returns the 3x3 rotation matrix of the quaternion q
+def quaternion_matrix(q):
+	q = numpy.array(q, dtype=numpy.float64)
+	n = numpy.dot(q, q)
+	if n < 1e-12:
+		return numpy.identity(3)
+	(x, y, z, w) = q*math.sqrt(2.0/n)
+	return numpy.array([[1.0 - y*y - z*z, x*y - z*w, x*z + y*w],
+		[x*y + z*w, 1.0 - x*x - z*z, y*z - x*w],
+		[x*z - y*w, y*z + x*w, 1.0 - x*x - y*y]])
+
+## Returns the quaternion of the rotation part of the 3x3 or 4x4 matrix m
+def quaternion_from_matrix(m):
+	m = numpy.asarray(m)
+	trace = m[0, 0] + m[1, 1] + m[2, 2]
+	if trace > 0.0:
+		s = 0.5/math.sqrt(trace + 1.0)
+		return numpy.array([(m[2, 1] - m[1, 2])*s, (m[0, 2] - m[2, 0])*s, (m[1, 0] - m[0, 1])*s, 0.25/s])
+	i = numpy.argmax([m[0, 0], m[1, 1], m[2, 2]])
+	(j, k) = ((i + 1) % 3, (i + 2) % 3)
+	s = 2.0*math.sqrt(1.0 + m[i, i] - m[j, j] - m[k, k])
+	q = numpy.zeros(4)
+	q[i] = 0.25*s
+	q[j] = (m[j, i] + m[i, j])/s
+	q[k] = (m[k, i] + m[i, k])/s
+	q[3] = (m[k, j] - m[j, k])/s
+	return q
+
+## Returns the 4x4 transformation of translation (x, y, z) and quaternion (x, y, z, w)
+def make_transform(translation = (0.0, 0.0, 0.0), quaternion = (0.0, 0.0, 0.0, 1.0)):
+	T = numpy.identity(4)
+	T[:3, :3] = quaternion_matrix(quaternion)
+	T[:3, 3] = translation
+	return T
+
+def pose_to_matrix(pose):
+	p = pose.position
+	q = pose.orientation
+	return make_transform((p.x, p.y, p.z), (q.x, q.y, q.z, q.w))
+
+def matrix_to_pose(T):
+	pose = Pose()
+	(pose.position.x, pose.position.y, pose.position.z) = [float(v) for v in T[:3, 3]]
+	(pose.orientation.x, pose.orientation.y, pose.orientation.z, pose.orientation.w) = [float(v) for v in quaternion_from_matrix(T)]
+	return pose
+
+## Returns the poses pose*T for all transformations T in transforms (offsets given in the frame of pose)
+def transform_poses(pose, transforms):
+	transforms = numpy.asarray(transforms).reshape(-1, 4, 4)
+	return [matrix_to_pose(T) for T in numpy.einsum('ij,njk->nik', pose_to_matrix(pose), transforms)]
+
+## Returns copies of pose moved by all translations (given in the parent frame of pose), the orientation is replaced by
+# quaternion if given
+def translate_poses(pose, translations, quaternion = None):
+	p = pose.position
+	positions = numpy.array([p.x, p.y, p.z]) + numpy.asarray(translations, dtype=numpy.float64).reshape(-1, 3)
+	if quaternion is None:
+		q = pose.orientation
+		quaternion = (q.x, q.y, q.z, q.w)
+	poses = []
+	for position in positions:
+		new_pose = Pose()
+		(new_pose.position.x, new_pose.position.y, new_pose.position.z) = [float(v) for v in position]
+		(new_pose.orientation.x, new_pose.orientation.y, new_pose.orientation.z, new_pose.orientation.w) = [float(v) for v in quaternion]
+		poses.append(new_pose)
+	return poses
+
+## Returns PoseStamped messages of poses with a copy of header
+def stamp_poses(header, poses):
+	return [PoseStamped(header = Header(header.seq, header.stamp, header.frame_id), pose = pose) for pose in poses]
@@ -0,0 +1,167 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements the detection of settled joints and fresh camera frames.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+
+from sensor_msgs.msg import JointState, CameraInfo
+
+## Settle monitor
+#
+# Replaces fixed sleeps which wait for the robot to come to rest. A joint is still as soon as its velocity (from
+# /joint_states, or estimated from the positions if no velocities are published) stays below velocity_threshold [rad/s]
+# for still_duration [s]. wait_until_settled returns as soon as all selected joints are still and a camera frame taken
+# afterwards has arrived, the timeout is the fallback if the joints or the camera do not report.
+#
+# get_settle_monitor().wait_until_settled(["torso_", "head_"], timeout = 2.0)
+class SettleMonitor:
+	def __init__(self, joint_states_topic = "/joint_states", camera_info_topic = None, velocity_threshold = 0.02, still_duration = 0.2, max_joint_state_age = 0.5):
+		if camera_info_topic == None:
+			camera_info_topic = rospy.get_param("/settle_monitor/camera_info_topic", "/cam3d/rgb/camera_info")
+		self.velocity_threshold = velocity_threshold
+		self.still_duration = still_duration
+		self.max_joint_state_age = max_joint_state_age
+		self.condition = threading.Condition()
+		self.positions = {}				# joint name -> (position, time)
+		self.last_moving = {}			# joint name -> last time the joint was moving
+		self.last_frame_stamp = None
+		rospy.Subscriber(joint_states_topic, JointState, self.joint_states_callback)
+		rospy.Subscriber(camera_info_topic, CameraInfo, self.camera_info_callback)
+
+	def joint_states_callback(self, msg):
+		stamp = msg.header.stamp.to_sec()
+		if stamp == 0.0:
+			stamp = rospy.get_time()
+		with self.condition:
+			for (i, name) in enumerate(msg.name):
+				if i >= len(msg.position):
+					break
+				moving = name not in self.positions	# unknown before the second message
+				if i < len(msg.velocity):
+					moving = abs(msg.velocity[i]) > self.velocity_threshold
+				elif name in self.positions:
+					(position, time) = self.positions[name]
+					if stamp > time:
+						moving = abs(msg.position[i] - position)/(stamp - time) > self.velocity_threshold
+				self.positions[name] = (msg.position[i], stamp)
+				if moving:
+					self.last_moving[name] = stamp
+			self.condition.notify_all()
+
+	def camera_info_callback(self, msg):
+		with self.condition:
+			self.last_frame_stamp = msg.header.stamp.to_sec()
+			self.condition.notify_all()
+
+	def get_joints(self, joint_prefixes):
+		return [name for name in self.positions if any([name.startswith(prefix) for prefix in joint_prefixes])]
+
+	## Returns the time since which all joints with one of joint_prefixes are still or None
+	def get_settled_since(self, joint_prefixes, now):
+		joints = self.get_joints(joint_prefixes)
+		if len(joints) == 0:
+			return None
+		for name in joints:
+			if now - self.positions[name][1] > self.max_joint_state_age:
+				return None
+		settled_since = max([self.last_moving.get(name, 0.0) for name in joints])
+		if now - settled_since < self.still_duration:
+			return None
+		return settled_since
+
+	## Waits until all joints with one of joint_prefixes are still and (with wait_for_frame) a camera frame of the settled
+	# robot has arrived, returns False if this did not happen within timeout [s]
+	def wait_until_settled(self, joint_prefixes = [""], timeout = 2.0, wait_for_frame = True):
+		deadline = rospy.get_time() + timeout
+		with self.condition:
+			while not rospy.is_shutdown():
+				now = rospy.get_time()
+				settled_since = self.get_settled_since(joint_prefixes, now)
+				if settled_since != None and (not wait_for_frame or (self.last_frame_stamp != None and self.last_frame_stamp > settled_since)):
+					return True
+				if now >= deadline:
+					rospy.logdebug("Robot did not settle within %.1f s", timeout)
+					return False
+				self.condition.wait(min(deadline - now, 0.05))
+		return False
+
+	## Waits until any joint with one of joint_prefixes has moved by displacement [rad] from its position at the time of the call,
+	# returns False if this did not happen within timeout [s]
+	def wait_for_motion(self, joint_prefixes, displacement, timeout):
+		deadline = rospy.get_time() + timeout
+		with self.condition:
+			start_positions = dict([(name, self.positions[name][0]) for name in self.get_joints(joint_prefixes)])
+			while not rospy.is_shutdown():
+				for (name, position) in start_positions.items():
+					if abs(self.positions[name][0] - position) >= displacement:
+						return True
+				now = rospy.get_time()
+				if now >= deadline:
+					return False
+				self.condition.wait(min(deadline - now, 0.05))
+		return False
+
+_settle_monitor = None
+_settle_monitor_creation_lock = threading.Lock()
+
+## Returns the settle monitor shared by all states
+def get_settle_monitor():
+	global _settle_monitor
+	with _settle_monitor_creation_lock:
+		if _settle_monitor == None:
+			_settle_monitor = SettleMonitor()
+		return _settle_monitor
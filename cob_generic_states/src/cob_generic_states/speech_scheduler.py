@@ -0,0 +1,240 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements an asynchronous scheduler for speech output.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import heapq
+import threading
+import time
+
+from simple_script_server import *
+sss = simple_script_server()
+
+from cob_generic_states.mission_timeline import get_active_state, active_state
+
+## Speech priorities
+#
+# Requests with a lower value are spoken first, requests of the same priority in the order they were made.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+## Speech request
+#
+# Handle returned by SpeechScheduler.say. state is one of "queued", "speaking", "spoken", "coalesced", "dropped" or "failed".
+class SpeechRequest:
+	def __init__(self, text, priority, coalesce_key):
+		self.text = text
+		self.priority = priority
+		self.coalesce_key = coalesce_key
+		self.state = "queued"
+		self.requesting_state = get_active_state()		# the speech output is recorded for this state
+		self.done = threading.Event()
+
+	def finish(self, state):
+		self.state = state
+		self.done.set()
+
+	## Waits until the request has been spoken, dropped or coalesced, returns False on timeout
+	def wait(self, timeout = None):
+		self.done.wait(timeout)
+		return self.done.is_set()
+
+	def __str__(self):
+		return "%s (priority %d): %s"%(self.state, self.priority, " ".join(self.text))
+
+## Speech scheduler
+#
+# Speaks the requests of all states one after another in a background thread, so that states do not wait for the
+# text-to-speech output while moving the robot. Requests are ordered by priority. Requests with a coalesce_key are dropped
+# if a request with the same key is still queued or has been spoken less than coalesce_period [s] ago, which keeps repeated
+# warnings, e.g. while retrying a blocked navigation goal, from piling up. If more than max_queue_size requests are queued,
+# the request with the lowest priority is dropped.
+#
+# get_speech_scheduler().say(["I am grasping the cup now."])
+# get_speech_scheduler().say(["My path is blocked."], coalesce_key = "path_blocked")
+# get_speech_scheduler().say(["Ready."], blocking = True)
+class SpeechScheduler:
+	def __init__(self, component = "sound", max_queue_size = None, coalesce_period = None, say_function = None):
+		self.component = component
+		if max_queue_size == None:
+			max_queue_size = rospy.get_param("/speech_scheduler/max_queue_size", 10)
+		if coalesce_period == None:
+			coalesce_period = rospy.get_param("/speech_scheduler/coalesce_period", 10.0)
+		self.max_queue_size = max_queue_size
+		self.coalesce_period = coalesce_period
+		self.say_function = say_function
+		if self.say_function == None:
+			self.say_function = lambda text: sss.say(self.component, text, True)
+		self.condition = threading.Condition()
+		self.queue = []				# heap of (priority, sequence number, SpeechRequest)
+		self.sequence = 0
+		self.speaking = None
+		self.last_spoken = {}		# coalesce_key -> time the last request with this key was spoken
+		self.counters = {"requested": 0, "spoken": 0, "coalesced": 0, "dropped": 0, "failed": 0, "max_queue_depth": 0}
+		self.thread = threading.Thread(target = self._run)
+		self.thread.daemon = True
+		self.thread.start()
+
+	## Queues text (list of strings like for sss.say) and returns its SpeechRequest, waits for the request to be spoken if
+	# blocking is True
+	def say(self, text, priority = PRIORITY_NORMAL, blocking = False, coalesce_key = None):
+		request = SpeechRequest(text, priority, coalesce_key)
+		with self.condition:
+			self.counters["requested"] += 1
+			if self._is_coalesced(coalesce_key):
+				self.counters["coalesced"] += 1
+				rospy.logdebug("Coalesced speech request: %s", " ".join(text))
+				request.finish("coalesced")
+				return request
+			heapq.heappush(self.queue, (priority, self.sequence, request))
+			self.sequence += 1
+			if len(self.queue) > self.max_queue_size:
+				# the last element of the sorted heap is the request with the lowest priority which was made last
+				dropped = max(self.queue)
+				self.queue.remove(dropped)
+				heapq.heapify(self.queue)
+				self.counters["dropped"] += 1
+				rospy.logwarn("Speech queue is full, dropped: %s", " ".join(dropped[2].text))
+				dropped[2].finish("dropped")
+			self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], len(self.queue))
+			self.condition.notify_all()
+		if blocking:
+			request.wait()
+		return request
+
+	def _is_coalesced(self, coalesce_key):
+		if coalesce_key == None:
+			return False
+		if self.speaking != None and self.speaking.coalesce_key == coalesce_key:
+			return True
+		for (priority, sequence, request) in self.queue:
+			if request.coalesce_key == coalesce_key:
+				return True
+		return time.time() - self.last_spoken.get(coalesce_key, -self.coalesce_period) < self.coalesce_period
+
+	def _run(self):
+		while True:
+			with self.condition:
+				while len(self.queue) == 0:
+					self.condition.wait()
+				request = heapq.heappop(self.queue)[2]
+				request.state = "speaking"
+				self.speaking = request
+			state = "spoken"
+			try:
+				with active_state(request.requesting_state):
+					self.say_function(request.text)
+			except Exception, e:
+				rospy.logerr("Speech output failed: %s", str(e))
+				state = "failed"
+			with self.condition:
+				self.speaking = None
+				self.counters[state] += 1
+				if request.coalesce_key != None:
+					self.last_spoken[request.coalesce_key] = time.time()
+				request.finish(state)
+				self.condition.notify_all()
+
+	## Waits until all queued requests have been spoken, returns False on timeout
+	def wait_until_idle(self, timeout = None):
+		deadline = None
+		if timeout != None:
+			deadline = time.time() + timeout
+		with self.condition:
+			while len(self.queue) > 0 or self.speaking != None:
+				if deadline == None:
+					self.condition.wait(1.0)
+				elif time.time() >= deadline:
+					return False
+				else:
+					self.condition.wait(deadline - time.time())
+			return True
+
+	## Drops all queued requests with a priority value of at least priority (the request being spoken is finished)
+	def clear(self, priority = PRIORITY_HIGH):
+		with self.condition:
+			kept = []
+			for entry in self.queue:
+				if entry[0] >= priority:
+					self.counters["dropped"] += 1
+					entry[2].finish("dropped")
+				else:
+					kept.append(entry)
+			heapq.heapify(kept)
+			self.queue = kept
+
+	def get_queue_depth(self):
+		with self.condition:
+			return len(self.queue)
+
+	## Returns the counters of requested, spoken, coalesced, dropped and failed requests and the current and maximum queue depth
+	def get_statistics(self):
+		with self.condition:
+			statistics = dict(self.counters)
+			statistics["queue_depth"] = len(self.queue)
+			return statistics
+
+_speech_scheduler = None
+_speech_scheduler_creation_lock = threading.Lock()
+
+## Returns the speech scheduler shared by all states
+def get_speech_scheduler():
+	global _speech_scheduler
+	with _speech_scheduler_creation_lock:
+		if _speech_scheduler == None:
+			_speech_scheduler = SpeechScheduler()
+		return _speech_scheduler
@@ -0,0 +1,202 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements the timing and outcome instrumentation of smach states.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import threading
+import time
+import json
+import functools
+from collections import deque
+
+from std_msgs.msg import String
+
+# upper bounds of the histogram buckets of the state durations in [s]
+HISTOGRAM_BUCKETS = [0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, float('inf')]
+
+_enabled = False
+_configured = False
+_max_samples = 1000
+_statistics = {}		# state name -> deque of samples (duration, outcome, blocking time, retries)
+_current = threading.local()	# sample of the state which is executed by the current thread
+_publisher_thread = None
+
+## Enables the instrumentation
+#
+# The aggregated statistics are published as JSON string on topic every 1/publish_rate seconds (no publishing for publish_rate <= 0).
+def enable_instrumentation(publish_rate = 0.2, max_samples = 1000, topic = "/state_statistics"):
+	global _enabled, _configured, _max_samples, _publisher_thread
+	_max_samples = max_samples
+	_configured = True
+	_enabled = True
+	if publish_rate > 0 and _publisher_thread == None:
+		_publisher_thread = threading.Thread(target=_publish_statistics, args=(rospy.Publisher(topic, String, queue_size=1), publish_rate))
+		_publisher_thread.daemon = True
+		_publisher_thread.start()
+
+## Disables the instrumentation, instrumented states run without any bookkeeping afterwards
+def disable_instrumentation():
+	global _enabled, _configured
+	_configured = True
+	_enabled = False
+
+## Returns True if the instrumentation is enabled
+#
+# Unless enable_instrumentation() or disable_instrumentation() were called, the parameters /state_instrumentation/enabled,
+# /state_instrumentation/publish_rate and /state_instrumentation/max_samples are read once the node is initialized.
+def is_instrumentation_enabled():
+	if not _configured and rospy.core.is_initialized():
+		if rospy.get_param("/state_instrumentation/enabled", False):
+			enable_instrumentation(rospy.get_param("/state_instrumentation/publish_rate", 0.2), rospy.get_param("/state_instrumentation/max_samples", 1000))
+		else:
+			disable_instrumentation()
+	return _enabled
+
+class _Sample:
+	def __init__(self):
+		self.blocking_time = 0.0
+		self.retries = 0
+
+## Decorator for smach.State.execute
+#
+# Records wall time, outcome, retries and the time spent in blocking sections of every execution.
+def instrumented(execute):
+	@functools.wraps(execute)
+	def instrumented_execute(self, userdata):
+		if not _enabled and (_configured or not is_instrumentation_enabled()):
+			return execute(self, userdata)
+
+		sample = _Sample()
+		retries_before = getattr(self, "retries", 0)	# retries of the states which count them themselves
+		parent = getattr(_current, "sample", None)
+		_current.sample = sample
+		outcome = "exception"
+		start = time.time()
+		try:
+			outcome = execute(self, userdata)
+			return outcome
+		finally:
+			duration = time.time() - start
+			_current.sample = parent
+			# the counter of the state is cumulative (and reset by the state), only the retries added by this execution count
+			sample.retries += max(0, getattr(self, "retries", 0) - retries_before)
+			samples = _statistics.get(self.__class__.__name__)
+			if samples == None:
+				samples = _statistics.setdefault(self.__class__.__name__, deque(maxlen=_max_samples))
+			samples.append((duration, outcome, sample.blocking_time, sample.retries))
+	return instrumented_execute
+
+## Counts a retry of the currently executed state
+def count_retry():
+	sample = getattr(_current, "sample", None)
+	if sample != None:
+		sample.retries += 1
+
+## Context manager measuring the time of blocking calls of the currently executed state
+#
+# with blocking_section():
+# 	sss.wait_for_input()
+class blocking_section:
+	def __enter__(self):
+		self.sample = getattr(_current, "sample", None)
+		if self.sample != None:
+			self.start = time.time()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		if self.sample != None:
+			self.sample.blocking_time += time.time() - self.start
+		return False
+
+## Returns the aggregated statistics of all instrumented states
+def get_statistics():
+	statistics = {}
+	for name, samples in _statistics.items():
+		samples = list(samples)
+		if len(samples) == 0:
+			continue
+		durations = sorted([s[0] for s in samples])
+		outcomes = {}
+		for s in samples:
+			outcomes[s[1]] = outcomes.get(s[1], 0) + 1
+		histogram = [0] * len(HISTOGRAM_BUCKETS)
+		for d in durations:
+			for i in range(len(HISTOGRAM_BUCKETS)):
+				if d <= HISTOGRAM_BUCKETS[i]:
+					histogram[i] += 1
+					break
+		n = len(durations)
+		statistics[name] = {"executions": n,
+			"outcomes": outcomes,
+			"duration_mean": sum(durations)/n,
+			"duration_median": durations[n/2],
+			"duration_max": durations[-1],
+			"duration_histogram": histogram,
+			"blocking_time_mean": sum([s[2] for s in samples])/n,
+			"retries": sum([s[3] for s in samples])}
+	return statistics
+
+## Clears all recorded samples
+def reset_statistics():
+	_statistics.clear()
+
+def _publish_statistics(publisher, publish_rate):
+	while not rospy.is_shutdown():
+		rospy.sleep(1.0/publish_rate)
+		if _enabled and len(_statistics) > 0:
+			statistics = get_statistics()
+			statistics["histogram_buckets"] = [b if b != float('inf') else -1 for b in HISTOGRAM_BUCKETS]
+			publisher.publish(String(json.dumps(statistics)))
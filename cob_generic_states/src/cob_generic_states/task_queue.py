@@ -0,0 +1,124 @@
+#!/usr/bin/python
+#################################################################
+##\file
+#
+# \note
+#   Copyright (c) 2010 \n
+#   Fraunhofer Institute for Manufacturing Engineering
+#   and Automation (IPA) \n\n
+#
+#################################################################
+#
+# \note
+#   Project name: care-o-bot
+# \note
+#   ROS stack name: cob_scenarios
+# \note
+#   ROS package name: cob_generic_states
+#
+# \author
+#   cob_scenarios contributors
+#
+# \date Date of creation: Oct 2026
+#
+# \brief
+#   Implements a thread-safe priority queue for incoming tasks.
+#
+#################################################################
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer. \n
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution. \n
+#     - Neither the name of the Fraunhofer Institute for Manufacturing
+#       Engineering and Automation (IPA) nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission. \n
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License LGPL as 
+# published by the Free Software Foundation, either version 3 of the 
+# License, or (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License LGPL for more details.
+# 
+# You should have received a copy of the GNU Lesser General Public 
+# License LGPL along with this program. 
+# If not, see <http://www.gnu.org/licenses/>.
+#
+#################################################################
+
+import rospy
+import heapq
+import threading
+import time
+
+## Task queue
+#
+# Thread-safe queue for tasks which are received by service callbacks and dispatched by states. A waiting state is woken
+# up as soon as a task arrives. Tasks with a higher priority are dispatched first, tasks of the same priority in the order
+# they were received. No task is dropped: if max_size tasks are queued, put() rejects the new task.
+class TaskQueue:
+	def __init__(self, max_size = None):
+		self.max_size = max_size
+		self.condition = threading.Condition()
+		self.queue = []				# heap of (-priority, sequence number, task)
+		self.sequence = 0
+		self.counters = {"received": 0, "dispatched": 0, "rejected": 0, "max_queue_depth": 0}
+
+	## Queues task, returns False if the queue is full
+	def put(self, task, priority = 0):
+		with self.condition:
+			if self.max_size != None and len(self.queue) >= self.max_size:
+				self.counters["rejected"] += 1
+				return False
+			heapq.heappush(self.queue, (-priority, self.sequence, task))
+			self.sequence += 1
+			self.counters["received"] += 1
+			self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], len(self.queue))
+			self.condition.notify()
+			return True
+
+	## Removes and returns the next task, waits until a task arrives, returns None on timeout [s] or shutdown
+	def get(self, timeout = None):
+		deadline = None
+		if timeout != None:
+			deadline = time.time() + timeout
+		with self.condition:
+			while len(self.queue) == 0:
+				if rospy.is_shutdown():
+					return None
+				if deadline == None:
+					# wake up regularly to notice a shutdown
+					self.condition.wait(1.0)
+				elif time.time() >= deadline:
+					return None
+				else:
+					self.condition.wait(min(1.0, deadline - time.time()))
+			self.counters["dispatched"] += 1
+			return heapq.heappop(self.queue)[2]
+
+	def get_queue_depth(self):
+		with self.condition:
+			return len(self.queue)
+
+	## Removes all queued tasks and returns them in the order they would have been dispatched
+	def clear(self):
+		with self.condition:
+			tasks = [entry[2] for entry in sorted(self.queue)]
+			self.queue = []
+			return tasks
+
+	## Returns the counters of received, dispatched and rejected tasks and the current and maximum queue depth
+	def get_statistics(self):
+		with self.condition:
+			statistics = dict(self.counters)
+			statistics["queue_depth"] = len(self.queue)
+			return statistics
@@ -0,0 +1,38 @@
+#!/usr/bin/python
+
+import rospy
+import smach
+import smach_ros
+import unittest
+
+from cob_generic_states.component_groups import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def test_bring_up(self):
+		# create a SMACH state machine
+		SM = smach.StateMachine(outcomes=['overall_succeeded','overall_failed'])
+
+		# open the container
+		with SM:
+			smach.StateMachine.add('TEST', bring_up([("head", ["init", "recover"]), ("torso", ["init", "recover"])]),
+				transitions={'succeeded':'overall_succeeded', 'failed':'overall_failed'})
+
+		try:
+			SM.execute()
+		except:
+			error_message = "Unexpected error:", sys.exc_info()[0]
+			self.fail(error_message)
+
+	def test_bring_up_exception(self):
+		# an action which raises is reported as failure instead of timeout
+		results = bring_up_components([("head", ["no_such_action"])], timeout = 5.0)
+		self.assertEqual(results, {"head": "failed"})
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'component_groups', TestStates)
@@ -0,0 +1,55 @@
+#!/usr/bin/python
+
+import rospy
+import unittest
+
+from cob_generic_states.component_interlocks import *
+from cob_generic_states.motion_groups import MotionGroup, ComponentMotionResult
+
+## Background group whose motions have already ended with status
+class FinishedGroup:
+	def __init__(self, targets, status):
+		self.targets = targets
+		self.status = status
+
+	def start(self):
+		return self
+
+	def wait_for_component(self, component, deadline = None):
+		return ComponentMotionResult(component, self.targets[component], self.status)
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def test_component_interlock(self):
+		interlock = ComponentInterlock()
+		self.assertTrue(interlock.run_in_background(MotionGroup({"torso": "home", "head": "front"}), timeout = 20.0))
+		self.assertTrue(interlock.is_busy("torso"))
+		self.assertEqual(interlock.get_required_components(["tray"]), set(["tray", "arm"]))
+		self.assertTrue(interlock.acquire(["torso", "head"], timeout = 20.0))
+		self.assertFalse(interlock.is_busy("torso"))
+		self.assertFalse(interlock.is_busy("head"))
+
+	def test_default_interlocks(self):
+		interlock = ComponentInterlock()
+		self.assertEqual(interlock.get_required_components(["base"]), set(["base", "arm", "sdh"]))
+		rospy.set_param("/test_component_interlocks", {"base": []})
+		interlock = ComponentInterlock("/test_component_interlocks")
+		self.assertEqual(interlock.get_required_components(["base"]), set(["base"]))
+		self.assertEqual(interlock.get_required_components(["tray"]), set(["tray", "arm"]))
+
+	def test_failed_background_motion(self):
+		interlock = ComponentInterlock()
+		self.assertTrue(interlock.run_in_background(FinishedGroup({"arm": "folded", "sdh": "home"}, "failed")))
+		self.assertTrue(interlock.is_busy("arm"))
+		self.assertFalse(interlock.acquire(["base"], timeout = 1.0))
+		self.assertFalse(interlock.is_busy("arm"))
+		self.assertTrue(interlock.run_in_background(FinishedGroup({"tray": "up"}, "succeeded")))
+		self.assertTrue(interlock.acquire(["arm"], timeout = 1.0))
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'component_interlocks', TestStates)
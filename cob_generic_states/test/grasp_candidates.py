@@ -0,0 +1,63 @@
+#!/usr/bin/python
+
+import rospy
+import unittest
+import tf
+
+from geometry_msgs.msg import PoseStamped
+from moveit_msgs.msg import MoveItErrorCodes
+
+from cob_generic_states.grasp_candidates import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def test_generate_grasp_candidates(self):
+		candidates = generate_grasp_candidates("top", number_of_orientations = 3, yaw_range = 0.4)
+		self.assertEqual([candidate.yaw_offset for candidate in candidates], [0.0, -0.4, 0.4])
+
+		object_pose = PoseStamped()
+		object_pose.header.frame_id = "/base_link"
+		object_pose.pose.position.x = 0.5
+		object_pose.pose.orientation.w = 1.0
+		[pre_grasp, grasp, post_grasp] = candidates[0].get_poses(object_pose)
+		self.assertAlmostEqual(pre_grasp.pose.position.z - grasp.pose.position.z, 0.18)
+		self.assertAlmostEqual(post_grasp.pose.position.x - grasp.pose.position.x, 0.05)
+
+	def test_evaluate_grasp_candidates(self):
+		rospy.set_param("/script_server/arm/pregrasp_top", [[0.0, 0.0]])
+		# only candidates with a positive yaw offset are reachable, the joint travel grows with the yaw offset
+		def solver(pose, seed):
+			q = pose.pose.orientation
+			yaw_offset = tf.transformations.euler_from_quaternion([q.x, q.y, q.z, q.w])[2] - grasp_types["top"]["rpy"][2]
+			if yaw_offset < -0.01:
+				return ([], MoveItErrorCodes(val = MoveItErrorCodes.NO_IK_SOLUTION))
+			return ([yaw_offset, 0.0], MoveItErrorCodes(val = MoveItErrorCodes.SUCCESS))
+
+		object_pose = PoseStamped()
+		object_pose.header.frame_id = "/base_link"
+		object_pose.pose.orientation.w = 1.0
+		candidates = generate_grasp_candidates("top", number_of_orientations = 5, yaw_range = 0.4)
+		feasible = evaluate_grasp_candidates(candidates, object_pose, solver)
+		self.assertEqual(len(feasible), 3)
+		self.assertAlmostEqual(feasible[0].yaw_offset, 0.0)
+		for (better, worse) in zip(feasible[:-1], feasible[1:]):
+			self.assertTrue(better.score >= worse.score)
+
+	def test_evaluate_grasp_candidates_exception(self):
+		rospy.set_param("/script_server/arm/pregrasp_top", [[0.0, 0.0]])
+		def solver(pose, seed):
+			raise rospy.ServiceException("ik service unavailable")
+
+		object_pose = PoseStamped()
+		object_pose.header.frame_id = "/base_link"
+		object_pose.pose.orientation.w = 1.0
+		candidates = generate_grasp_candidates("top", number_of_orientations = 5, yaw_range = 0.4)
+		self.assertRaises(rospy.ServiceException, evaluate_grasp_candidates, candidates, object_pose, solver)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'grasp_candidates', TestStates)
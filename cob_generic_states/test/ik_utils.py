@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+import rospy
+import unittest
+
+from geometry_msgs.msg import PoseStamped
+from moveit_msgs.msg import MoveItErrorCodes
+
+from cob_generic_states.ik_utils import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+		self.solver_calls = 0
+
+	def solver(self, val = MoveItErrorCodes.SUCCESS):
+		self.solver_calls += 1
+		return ([0.1, 0.2, 0.3], MoveItErrorCodes(val = val))
+
+	def create_pose(self, x):
+		pose = PoseStamped()
+		pose.header.frame_id = "/base_link"
+		pose.pose.position.x = x
+		pose.pose.orientation.w = 1.0
+		return pose
+
+	def test_ik_cache(self):
+		cache = IKCache(max_entries = 2)
+		cache.set_configuration_version(0)
+		(solution, error_code) = cache.solve(self.solver, self.create_pose(0.5), "sdh_grasp_link", [0.0, 0.0])
+		self.assertEqual(solution, [0.1, 0.2, 0.3])
+		# nearly the same pose is answered from the cache
+		cache.solve(self.solver, self.create_pose(0.501), "sdh_grasp_link", [0.0, 0.0])
+		self.assertEqual(self.solver_calls, 1)
+		# different link, seed or pose
+		cache.solve(self.solver, self.create_pose(0.501), "arm_7_link", [0.0, 0.0])
+		cache.solve(self.solver, self.create_pose(0.501), "sdh_grasp_link", [0.5, 0.0])
+		self.assertEqual(self.solver_calls, 3)
+		# the first entry has been evicted
+		cache.solve(self.solver, self.create_pose(0.5), "sdh_grasp_link", [0.0, 0.0])
+		self.assertEqual(self.solver_calls, 4)
+		# a new configuration version clears the cache
+		cache.set_configuration_version(1)
+		cache.solve(self.solver, self.create_pose(0.5), "sdh_grasp_link", [0.0, 0.0])
+		self.assertEqual(self.solver_calls, 5)
+
+	def test_ik_cache_errors(self):
+		cache = IKCache()
+		cache.solve(lambda: self.solver(MoveItErrorCodes.TIMED_OUT), self.create_pose(0.5), "sdh_grasp_link")
+		cache.solve(lambda: self.solver(MoveItErrorCodes.TIMED_OUT), self.create_pose(0.5), "sdh_grasp_link")
+		self.assertEqual(self.solver_calls, 2)
+		cache.solve(lambda: self.solver(MoveItErrorCodes.NO_IK_SOLUTION), self.create_pose(0.5), "sdh_grasp_link")
+		(solution, error_code) = cache.solve(lambda: self.solver(MoveItErrorCodes.NO_IK_SOLUTION), self.create_pose(0.5), "sdh_grasp_link")
+		self.assertEqual(self.solver_calls, 3)
+		self.assertEqual(error_code.val, MoveItErrorCodes.NO_IK_SOLUTION)
+
+	def test_grasp_ik_pipeline(self):
+		# the solution of the second pose jumps if it is not seeded from the first solution
+		def solver(pose, seed):
+			self.solver_calls += 1
+			if pose.pose.position.x == 0.6 and seed == [0.0, 0.0]:
+				return ([3.0, 0.0], MoveItErrorCodes(val = MoveItErrorCodes.SUCCESS))
+			return ([pose.pose.position.x, 0.0], MoveItErrorCodes(val = MoveItErrorCodes.SUCCESS))
+		pipeline = GraspIKPipeline(solver, max_joint_step = 1.0)
+		results = pipeline.solve([self.create_pose(0.5), self.create_pose(0.6), self.create_pose(0.7)], [0.0, 0.0])
+		self.assertEqual([solution for (solution, error_code) in results], [[0.5, 0.0], [0.6, 0.0], [0.7, 0.0]])
+		self.assertEqual(self.solver_calls, 4)
+
+	def test_grasp_ik_pipeline_exception(self):
+		def solver(pose, seed):
+			if pose.pose.position.x == 0.6:
+				raise rospy.ServiceException("ik service unavailable")
+			return ([pose.pose.position.x, 0.0], MoveItErrorCodes(val = MoveItErrorCodes.SUCCESS))
+		pipeline = GraspIKPipeline(solver)
+		self.assertRaises(rospy.ServiceException, pipeline.solve, [self.create_pose(0.5), self.create_pose(0.6)], [0.0, 0.0])
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'ik_utils', TestStates)
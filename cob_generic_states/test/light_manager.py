@@ -0,0 +1,39 @@
+#!/usr/bin/python
+
+import rospy
+import unittest
+
+from cob_generic_states.light_manager import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+		self.sent = []
+
+	def send(self, color):
+		self.sent.append(color)
+
+	def test_light_manager(self):
+		manager = LightManager(coalesce_window = 0.5, set_light_function = self.send)
+		manager.set_light("blue")
+		self.assertTrue(manager.wait_until_idle(2.0))
+		manager.set_light("yellow")
+		manager.set_light("blue")
+		manager.set_light("blue")
+		manager.set_light("red")
+		manager.set_light("green")
+		self.assertTrue(manager.wait_until_idle(2.0))
+		manager.set_light("green")
+		self.assertEqual(self.sent, ["blue", "green"])
+		self.assertEqual(manager.get_color(), "green")
+		statistics = manager.get_statistics()
+		self.assertEqual(statistics["requested"], 7)
+		self.assertEqual(statistics["sent"], 2)
+		self.assertEqual(statistics["unchanged"], 3)
+		self.assertEqual(statistics["coalesced"], 2)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'light_manager', TestStates)
@@ -4,8 +4,26 @@ import rospy
 import smach
 import smach_ros
 import unittest
+import time
 
 from cob_generic_states.generic_manipulation_states import *
+from cob_generic_states.motion_groups import ComponentMotionResult
+
+## Background stow of arm and hand which ends after duration [s] without reaching its target
+class AbortedStow:
+	def __init__(self, duration):
+		self.targets = {"arm": "folded", "sdh": "home"}
+		self.end = time.time() + duration
+
+	def start(self):
+		return self
+
+	def wait_for_component(self, component, deadline = None):
+		end = self.end
+		if deadline != None:
+			end = min(end, deadline)
+		rospy.sleep(max(0.0, end - time.time()))
+		return ComponentMotionResult(component, self.targets[component], "failed")
 
 class TestStates(unittest.TestCase):
 	def __init__(self, *args):
@@ -57,6 +75,17 @@ class TestStates(unittest.TestCase):
 			error_message = "Unexpected error:", sys.exc_info()[0]
 			self.fail(error_message)
 
+	def test_grasp_during_stow(self):
+		# the grasp states wait for the stow of the previous state and do not move an arm which did not reach its stow position
+		interlock = get_component_interlock()
+		for state in [grasp_side(), grasp_side_planned(), grasp_top()]:
+			self.assertTrue(interlock.run_in_background(AbortedStow(0.5)))
+			start = time.time()
+			self.assertEqual(state.execute(smach.UserData()), 'failed')
+			self.assertTrue(time.time() - start >= 0.5)
+			self.assertFalse(interlock.is_busy("arm"))
+			self.assertFalse(interlock.is_busy("sdh"))
+
 	def test_put_object_on_tray_side(self):
 		# create a SMACH state machine
 		SM = smach.StateMachine(outcomes=['overall_succeeded','overall_failed'])
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+
+import rospy
+import smach
+import smach_ros
+import unittest
+import tempfile
+import os
+
+from cob_generic_states.mission_timeline import *
+from cob_generic_states.light_manager import LightManager
+
+class timeline_test_state(smach.State):
+	def __init__(self):
+		smach.State.__init__(self, outcomes=['succeeded'])
+
+	def execute(self, userdata):
+		rospy.sleep(0.1)
+		return 'succeeded'
+
+## Script server with the signatures of simple_script_server, the actions do nothing
+class timeline_script_server:
+	def move(self, component_name, parameter_name, blocking = True, mode = None):
+		return None
+
+	def set_light(self, component_name, parameter_name, blocking = False):
+		pass
+
+	def sleep(self, duration):
+		pass
+
+class timeline_action_state(smach.State):
+	def __init__(self, component, light_manager = None):
+		smach.State.__init__(self, outcomes=['succeeded'])
+		self.component = component
+		self.light_manager = light_manager
+
+	def execute(self, userdata):
+		server = timeline_script_server()
+		server.move(self.component, "home", False)
+		server.sleep(0.1)
+		if self.light_manager != None:
+			self.light_manager.set_light("green")
+			self.light_manager.wait_until_idle(5.0)
+		return 'succeeded'
+
+class TestMissionTimeline(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestMissionTimeline, self).__init__(*args)
+		rospy.init_node('test_mission_timeline')
+
+	def test_recorder(self):
+		SM = smach.StateMachine(outcomes=['overall_succeeded'])
+		with SM:
+			smach.StateMachine.add('FIRST', timeline_test_state(),
+				transitions={'succeeded':'SECOND'})
+			smach.StateMachine.add('SECOND', timeline_test_state(),
+				transitions={'succeeded':'overall_succeeded'})
+
+		filename = tempfile.mktemp(suffix=".jsonl")
+		recorder = MissionTimelineRecorder(filename)
+		recorder.attach(SM, "SM")
+		SM.execute()
+		recorder.close()
+
+		events = load_timeline(filename)
+		os.remove(filename)
+		states = [e for e in events if e["type"] == "state"]
+		self.assertEqual([s["name"] for s in states], ["FIRST", "SECOND"])
+		self.assertEqual([s["outcome"] for s in states], ["succeeded", "succeeded"])
+		self.assertEqual(len([e for e in events if e["type"] == "container"]), 2)
+
+	def test_concurrence(self):
+		server = timeline_script_server()
+		light_manager = LightManager(coalesce_window = 0.0, set_light_function = lambda color: server.set_light("light", color))
+		CC = smach.Concurrence(outcomes=['succeeded'], default_outcome='succeeded')
+		with CC:
+			smach.Concurrence.add('HEAD', timeline_action_state("head", light_manager))
+			smach.Concurrence.add('TORSO', timeline_action_state("torso"))
+		SM = smach.StateMachine(outcomes=['overall_succeeded'])
+		with SM:
+			smach.StateMachine.add('PARALLEL', CC,
+				transitions={'succeeded':'overall_succeeded'})
+
+		filename = tempfile.mktemp(suffix=".jsonl")
+		recorder = MissionTimelineRecorder(filename)
+		recorder.attach(SM, "SM")
+		recorder.hook_script_server(timeline_script_server)
+		SM.execute()
+		recorder.close()
+
+		events = load_timeline(filename)
+		os.remove(filename)
+		states = dict([(e["name"], e) for e in events if e["type"] == "state"])
+		# the children of the concurrence run in threads of their own and are still named below their container
+		self.assertEqual(sorted(states.keys()), ["PARALLEL", "PARALLEL/HEAD", "PARALLEL/TORSO"])
+		self.assertEqual([p[1] for p in critical_path(events)][0], "PARALLEL")
+		actions = [e for e in events if e["type"] == "action"]
+		moves = sorted([(a["component"], a["parameter"], a["blocking"], a["state"]) for a in actions if a["action"] == "move"])
+		self.assertEqual(moves, [("head", "home", False, "PARALLEL/HEAD"), ("torso", "home", False, "PARALLEL/TORSO")])
+		sleeps = [(a["component"], a["parameter"], a["blocking"]) for a in actions if a["action"] == "sleep"]
+		self.assertEqual(sleeps, [("", "0.1", True), ("", "0.1", True)])
+		# the light is sent by the thread of the light manager and recorded for the state which requested it
+		[light] = [a for a in actions if a["action"] == "set_light"]
+		self.assertEqual((light["component"], light["parameter"], light["blocking"], light["state"]), ("light", "green", False, "PARALLEL/HEAD"))
+		self.assertNotEqual(light["thread"], states["PARALLEL/HEAD"]["thread"])
+
+	def test_analyzer(self):
+		events = [{"type": "state", "name": "PICK", "start": 0.0, "end": 10.0, "outcome": "succeeded"},
+			{"type": "state", "name": "PICK/DETECT", "start": 0.0, "end": 4.0, "outcome": "succeeded"},
+			{"type": "state", "name": "PICK/GRASP", "start": 4.0, "end": 10.0, "outcome": "succeeded"},
+			{"type": "action", "component": "arm", "action": "move", "parameter": "pregrasp", "blocking": True, "start": 5.0, "end": 8.0, "state": "PICK/GRASP"},
+			{"type": "action", "component": "head", "action": "move", "parameter": "front", "blocking": False, "start": 4.0, "end": 4.1, "state": "PICK/GRASP"}]
+
+		path = critical_path(events)
+		self.assertEqual([p[1] for p in path], ["PICK", "PICK/DETECT", "PICK/GRASP"])
+		self.assertEqual(path[2][3][0], "arm.move(pregrasp)")
+
+		idle = idle_times(events)
+		self.assertAlmostEqual(idle["PICK"], 0.0)
+		self.assertAlmostEqual(idle["PICK/DETECT"], 4.0)
+		self.assertAlmostEqual(idle["PICK/GRASP"], 3.0)
+
+		stacks = folded_stacks(events)
+		self.assertAlmostEqual(stacks["PICK;GRASP;arm.move"], 3000.0)
+		self.assertAlmostEqual(stacks["PICK;GRASP"], 3000.0)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'mission_timeline', TestMissionTimeline)
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+
+import rospy
+import threading
+import unittest
+
+import cob_generic_states.motion_groups as motion_groups
+from cob_generic_states.motion_groups import *
+
+## Motion handle which ends after duration [s], the target "unreachable" fails
+class FakeMotion:
+	def __init__(self, target, duration):
+		self.target = target
+		self.done = threading.Event()
+		self.preempted = False
+		self.timer = threading.Timer(duration, self.done.set)
+		self.timer.start()
+
+	def preempt(self):
+		self.timer.cancel()
+		self.preempted = True
+		self.done.set()
+
+	def wait(self, duration = None):
+		self.done.wait(duration)
+
+	def get_state(self):
+		if not self.done.is_set():
+			return 1
+		if self.preempted:
+			return 2
+		if self.target == "unreachable":
+			return 4
+		return 3
+
+	def get_error_code(self):
+		return 0
+
+## Script server which records all moves and stops
+class FakeScriptServer:
+	def __init__(self, durations = {}):
+		self.durations = durations
+		self.lock = threading.Lock()
+		self.moves = []
+		self.stops = []
+		self.motions = {}
+
+	def move(self, component, target, blocking = True):
+		motion = FakeMotion(target, self.durations.get(component, 0.1))
+		with self.lock:
+			self.moves.append((component, target))
+			self.motions[component] = motion
+		return motion
+
+	def stop(self, component, mode = "omni", blocking = True):
+		with self.lock:
+			self.stops.append(component)
+			self.motions[component].preempt()
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def setUp(self):
+		self.original_sss = motion_groups.sss
+		motion_groups.sss = FakeScriptServer({"torso": 0.5})
+
+	def tearDown(self):
+		motion_groups.sss = self.original_sss
+
+	def test_motion_group(self):
+		result = MotionGroup({"head": "front", "torso": "home"}).execute(timeout = 5.0)
+		self.assertEqual(sorted(result.keys()), ["head", "torso"])
+		self.assertTrue(result.succeeded())
+		self.assertEqual(result["torso"].state, 3)
+
+	def test_motion_group_failure(self):
+		result = MotionGroup({"head": "unreachable", "torso": "home"}).execute(timeout = 5.0)
+		self.assertFalse(result.succeeded())
+		self.assertEqual(result["head"].status, "failed")
+		self.assertEqual(result["torso"].status, "succeeded")
+		self.assertEqual(result.failed_components(), ["head"])
+
+	def test_motion_group_timeout(self):
+		result = MotionGroup({"head": "front", "torso": "home"}).execute(timeout = 0.2)
+		self.assertEqual(result["head"].status, "succeeded")
+		self.assertEqual(result["torso"].status, "timeout")
+
+	def test_chained_motion_groups(self):
+		first = MotionGroup({"head": "back"}).start()
+		second = first.chain({"head": "front", "torso": "home"}, delays = {"torso": 0.2})
+		self.assertTrue(first.wait(5.0).succeeded())
+		self.assertTrue(second.wait(5.0).succeeded())
+		self.assertEqual(motion_groups.sss.moves.index(("head", "back")), 0)
+		self.assertEqual(motion_groups.sss.moves[-1], ("torso", "home"))
+
+	def test_chained_motion_groups_failure(self):
+		first = MotionGroup({"head": "unreachable", "torso": "home"}).start()
+		second = first.chain({"head": "front", "torso": "shake"})
+		first_result = first.wait(5.0)
+		self.assertFalse(first_result.succeeded())
+		second.stop()
+		second_result = second.wait(5.0)
+		self.assertEqual(second_result["head"].status, "skipped")
+		self.assertFalse(("head", "front") in motion_groups.sss.moves)
+		# torso might already have started its second pose, it is stopped together with the group
+		self.assertEqual(second_result["torso"].status, "stopped")
+		self.assertEqual(("torso", "shake") in motion_groups.sss.moves, motion_groups.sss.stops == ["torso"])
+
+	def test_stop_pending_motions(self):
+		group = MotionGroup({"head": "front", "torso": "home"}, delays = {"torso": 0.5}).start()
+		group.stop()
+		result = group.wait(5.0)
+		self.assertEqual(result["head"].status, "stopped")
+		self.assertEqual(result["torso"].status, "stopped")
+		self.assertFalse(("torso", "home") in motion_groups.sss.moves)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'motion_groups', TestStates)
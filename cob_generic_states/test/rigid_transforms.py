@@ -0,0 +1,50 @@
+#!/usr/bin/python
+
+import rospy
+import unittest
+import numpy
+import tf
+
+from geometry_msgs.msg import Pose
+
+from cob_generic_states.rigid_transforms import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def assertQuaternionEqual(self, q1, q2):
+		self.assertTrue(numpy.allclose(q1, q2) or numpy.allclose(q1, -numpy.array(q2)))
+
+	def test_quaternions(self):
+		for (roll, pitch, yaw) in [(0.0, 0.0, 0.0), (-1.5708, 0.0, 2.481), (3.121, 0.077, -2.662), (2.44, -1.535, -1.552)]:
+			q = quaternion_from_euler(roll, pitch, yaw)
+			self.assertQuaternionEqual(q, tf.transformations.quaternion_from_euler(roll, pitch, yaw))
+			self.assertTrue(numpy.allclose(quaternion_matrix(q), tf.transformations.quaternion_matrix(q)[:3, :3]))
+			self.assertQuaternionEqual(quaternion_from_matrix(quaternion_matrix(q)), q)
+			r = quaternion_about_axis(0.3, (0.0, 0.0, 1.0))
+			self.assertQuaternionEqual(quaternion_multiply(r, q), tf.transformations.quaternion_multiply(r, q))
+
+	def test_transform_poses(self):
+		pose = Pose()
+		pose.position.x = 1.0
+		(pose.orientation.x, pose.orientation.y, pose.orientation.z, pose.orientation.w) = quaternion_from_euler(0.0, 0.0, 1.5708)
+		[moved, rotated] = transform_poses(pose, [make_transform((1.0, 0.0, 0.0)), make_transform(quaternion = quaternion_from_euler(0.0, 0.0, -1.5708))])
+		self.assertAlmostEqual(moved.position.x, 1.0, places = 4)
+		self.assertAlmostEqual(moved.position.y, 1.0, places = 4)
+		self.assertQuaternionEqual([rotated.orientation.x, rotated.orientation.y, rotated.orientation.z, rotated.orientation.w], [0.0, 0.0, 0.0, 1.0])
+
+	def test_translate_poses(self):
+		pose = Pose()
+		pose.orientation.w = 1.0
+		poses = translate_poses(pose, [[0.0, 0.1, 0.2], [0.05, 0.0, 0.17]])
+		self.assertEqual(len(poses), 2)
+		self.assertAlmostEqual(poses[0].position.z, 0.2)
+		self.assertAlmostEqual(poses[1].position.x, 0.05)
+		self.assertEqual(pose.position.z, 0.0)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'rigid_transforms', TestStates)
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+
+import rospy
+import threading
+import unittest
+
+from sensor_msgs.msg import JointState, CameraInfo
+
+from cob_generic_states.settle_monitor import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def publish(self, velocities, duration):
+		joint_states_pub = rospy.Publisher("/settle_monitor_test/joint_states", JointState, queue_size=10)
+		camera_info_pub = rospy.Publisher("/settle_monitor_test/camera_info", CameraInfo, queue_size=10)
+		position = 0.0
+		r = rospy.Rate(50)
+		end = rospy.get_time() + duration
+		while rospy.get_time() < end and not rospy.is_shutdown():
+			velocity = velocities(rospy.get_time())
+			position += velocity*0.02
+			joint_states_pub.publish(JointState(name = ["torso_lower_neck_tilt_joint"], position = [position], velocity = [velocity], header = rospy.Header(stamp = rospy.Time.now())))
+			camera_info_pub.publish(CameraInfo(header = rospy.Header(stamp = rospy.Time.now())))
+			r.sleep()
+
+	def test_settle_monitor(self):
+		monitor = SettleMonitor("/settle_monitor_test/joint_states", "/settle_monitor_test/camera_info")
+		start = rospy.get_time()
+		# the torso moves for one second, then it is still
+		publisher = threading.Thread(target=self.publish, args=(lambda t: 0.5 if t < start + 1.0 else 0.0, 4.0))
+		publisher.start()
+		rospy.sleep(0.3)
+		self.assertTrue(monitor.wait_for_motion(["torso_"], 0.1, 1.0))
+		self.assertTrue(monitor.wait_until_settled(["torso_"], timeout = 3.0))
+		self.assertTrue(rospy.get_time() - start >= 1.0)
+		self.assertFalse(monitor.wait_until_settled(["head_"], timeout = 0.5))
+		publisher.join()
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'settle_monitor', TestStates)
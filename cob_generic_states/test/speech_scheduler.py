@@ -0,0 +1,43 @@
+#!/usr/bin/python
+
+import rospy
+import unittest
+
+from cob_generic_states.speech_scheduler import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+		self.spoken = []
+
+	def speak(self, text):
+		rospy.sleep(0.2)
+		self.spoken.append(text[0])
+
+	def test_speech_scheduler(self):
+		scheduler = SpeechScheduler(max_queue_size = 4, coalesce_period = 5.0, say_function = self.speak)
+		scheduler.say(["first"])
+		rospy.sleep(0.05)
+		scheduler.say(["low"], priority = PRIORITY_LOW)
+		scheduler.say(["blocked"], coalesce_key = "blocked")
+		scheduler.say(["still blocked"], coalesce_key = "blocked")
+		scheduler.say(["high"], priority = PRIORITY_HIGH)
+		scheduler.say(["normal"])
+		request = scheduler.say(["last"], blocking = True)
+		self.assertEqual(request.state, "spoken")
+		self.assertTrue(scheduler.wait_until_idle(5.0))
+		self.assertEqual(self.spoken, ["first", "high", "blocked", "normal", "last"])
+		self.assertEqual(scheduler.say(["blocked again"], coalesce_key = "blocked").state, "coalesced")
+		statistics = scheduler.get_statistics()
+		self.assertEqual(statistics["requested"], 8)
+		self.assertEqual(statistics["spoken"], 5)
+		self.assertEqual(statistics["coalesced"], 2)
+		self.assertEqual(statistics["dropped"], 1)
+		self.assertEqual(statistics["queue_depth"], 0)
+		self.assertEqual(statistics["max_queue_depth"], 4)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'speech_scheduler', TestStates)
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+
+import rospy
+import smach
+import smach_ros
+import unittest
+
+from cob_generic_states.state_instrumentation import *
+
+class instrumented_test_state(smach.State):
+	def __init__(self):
+		smach.State.__init__(self, outcomes=['succeeded'])
+		self.retries = 2
+
+	@instrumented
+	def execute(self, userdata):
+		with blocking_section():
+			rospy.sleep(0.1)
+		self.retries += 1
+		count_retry()
+		return 'succeeded'
+
+class TestStateInstrumentation(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStateInstrumentation, self).__init__(*args)
+		rospy.init_node('test_state_instrumentation')
+
+	def setUp(self):
+		reset_statistics()
+
+	def test_disabled(self):
+		disable_instrumentation()
+		SM = smach.StateMachine(outcomes=['overall_succeeded'])
+		with SM:
+			smach.StateMachine.add('TEST', instrumented_test_state(),
+				transitions={'succeeded':'overall_succeeded'})
+		SM.execute()
+		self.assertEqual(get_statistics(), {})
+
+	def test_enabled(self):
+		enable_instrumentation(publish_rate = 0)
+		SM = smach.StateMachine(outcomes=['overall_succeeded'])
+		with SM:
+			smach.StateMachine.add('TEST', instrumented_test_state(),
+				transitions={'succeeded':'overall_succeeded'})
+		SM.execute()
+		SM.execute()
+		disable_instrumentation()
+
+		statistics = get_statistics()["instrumented_test_state"]
+		self.assertEqual(statistics["executions"], 2)
+		self.assertEqual(statistics["outcomes"], {'succeeded': 2})
+		self.assertEqual(statistics["retries"], 4)
+		self.assertTrue(statistics["blocking_time_mean"] >= 0.1)
+		self.assertTrue(statistics["duration_mean"] >= statistics["blocking_time_mean"])
+		self.assertEqual(sum(statistics["duration_histogram"]), 2)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'state_instrumentation', TestStateInstrumentation)
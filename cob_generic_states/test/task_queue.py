@@ -0,0 +1,42 @@
+#!/usr/bin/python
+
+import rospy
+import threading
+import unittest
+
+from cob_generic_states.task_queue import *
+
+class TestStates(unittest.TestCase):
+	def __init__(self, *args):
+		super(TestStates, self).__init__(*args)
+		rospy.init_node('test_states')
+
+	def test_task_queue(self):
+		queue = TaskQueue(max_size = 3)
+		self.assertTrue(queue.put("deliver"))
+		self.assertTrue(queue.put("charge", priority = -1))
+		self.assertTrue(queue.put("stop", priority = 10))
+		self.assertFalse(queue.put("explore"))
+		self.assertEqual(queue.get_queue_depth(), 3)
+		self.assertEqual(queue.get(), "stop")
+		self.assertEqual(queue.get(), "deliver")
+		self.assertEqual(queue.get(), "charge")
+		self.assertEqual(queue.get(timeout = 0.1), None)
+		statistics = queue.get_statistics()
+		self.assertEqual(statistics["received"], 3)
+		self.assertEqual(statistics["dispatched"], 3)
+		self.assertEqual(statistics["rejected"], 1)
+		self.assertEqual(statistics["max_queue_depth"], 3)
+
+	def test_task_queue_wakeup(self):
+		queue = TaskQueue()
+		timer = threading.Timer(0.2, queue.put, ["deliver"])
+		timer.start()
+		start = rospy.Time.now()
+		self.assertEqual(queue.get(timeout = 5.0), "deliver")
+		self.assertTrue((rospy.Time.now() - start).to_sec() < 1.0)
+
+# main
+if __name__ == '__main__':
+    import rostest
+    rostest.rosrun('cob_generic_states', 'task_queue', TestStates)
@@ -80,6 +80,7 @@ import rospy
 import copy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 import math
 
 import tf
@@ -100,6 +101,7 @@ class ComputeNavigationGoals(smach.State):
 			input_keys=['center', 'radius', 'rotational_sampling_step', 'new_computation_flag'],
 			output_keys=['goal_poses_verified', 'gaze_direction_goal_pose', 'new_computation_flag'])
 
+	@instrumented
 	def execute(self, userdata):
 		sf = ScreenFormat("ComputeNavigationGoals")
 		if not userdata.new_computation_flag:
@@ -128,6 +130,7 @@ class SelectNavigationGoal(smach.State):
 			output_keys=['goal_pose'])
 		self.listener = tf.TransformListener(True, rospy.Duration(20.0))
 		
+	@instrumented
 	def execute(self, userdata):
 		sf = ScreenFormat("SelectNavigationGoal")
 		
@@ -77,6 +77,7 @@ import ctypes
 import copy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 import tf
 from tf.transformations import *
@@ -98,6 +99,7 @@ class ComputeNavigationGoals(smach.State):
 			input_keys=['polygon','new_computation_flag'],
 			output_keys=['goal_poses_verified','new_computation_flag'])
 
+	@instrumented
 	def execute(self, userdata):
 		sf = ScreenFormat("ComputeNavigationGoals")
 		if not userdata.new_computation_flag:
@@ -122,6 +124,7 @@ class SelectNavigationGoal(smach.State):
 			output_keys=['goal_pose'])
 		self.listener = tf.TransformListener(True, rospy.Duration(20.0))
 
+	@instrumented
 	def execute(self, userdata):
 		sf = ScreenFormat("SelectNavigationGoal")
 		"""compute closest position to current robot pose"""
@@ -58,11 +58,14 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 import random
 from nav_msgs.msg import Odometry
 
 from simple_script_server import *
 sss = simple_script_server()
+from cob_generic_states.speech_scheduler import get_speech_scheduler
+from cob_generic_states.light_manager import get_light_manager
 
 
 ## Approach pose state
@@ -96,6 +99,7 @@ class ApproachPose(smach.State):
 			self.is_moving = False
 		return 
 
+	@instrumented
 	def execute(self, userdata):
 
 		# determine target position
@@ -126,22 +130,22 @@ class ApproachPose(smach.State):
 			
 			# finished with succeeded
 			if (handle_base.get_state() == 3):
-				sss.set_light("light", 'green')
+				get_light_manager().set_light('green')
 				return 'reached'
 			# finished with aborted
 			elif (handle_base.get_state() == 4):
-				sss.set_light("light", 'green')
+				get_light_manager().set_light('green')
 				sss.stop("base")
 				return 'not_reached'
 			# finished with preempted or canceled
 			elif (handle_base.get_state() == 2) or (handle_base.get_state() == 8):
-				sss.set_light("light", 'green')
+				get_light_manager().set_light('green')
 				sss.stop("base")
 				return 'not_reached'
 			# return with error
 			elif (handle_base.get_error_code() > 0):
 				print "error_code = " + str(handle_base.get_error_code())
-				sss.set_light("light", 'red')
+				get_light_manager().set_light('red')
 				return 'failed'
 	
 			# check if the base is moving
@@ -153,13 +157,13 @@ class ApproachPose(smach.State):
 
 				# abort after timeout is reached
 				if stopping_time >= self.timeout:
-					sss.set_light("light", 'green')
+					get_light_manager().set_light('green')
 					sss.stop("base")
 					return 'not_reached'
 				
 				# announce warning after every 10 sec
 				if announce_time >= 10.0:
-					sss.say("sound", [self.warnings[random.randint(0,len(self.warnings)-1)]],False)
+					get_speech_scheduler().say([self.warnings[random.randint(0,len(self.warnings)-1)]], coalesce_key = "path_blocked")
 					announce_time = 0.0
 
 				# set light to "thinking" after not moving for 2 sec
@@ -169,7 +173,7 @@ class ApproachPose(smach.State):
 			else:
 				# robot is moving
 				if not yellow:
-					sss.set_light("light", "yellow")
+					get_light_manager().set_light("yellow")
 					yellow = True
 			
 			# sleep
@@ -77,6 +77,7 @@ import rospy
 import copy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 import tf
 from tf.transformations import *
@@ -95,6 +96,7 @@ class ComputeNavigationGoals(smach.State):
 			input_keys=['goal_poses', 'goal_pose_application', 'new_computation_flag', 'approach_path_accessibility_check'],
 			output_keys=['goal_poses_verified', 'new_computation_flag'])
 
+	@instrumented
 	def execute(self, userdata):
 		sf = ScreenFormat("ComputeNavigationGoals")
 		if not userdata.new_computation_flag:
@@ -130,6 +132,7 @@ class SelectNavigationGoal(smach.State):
 		self.listener = tf.TransformListener(True, rospy.Duration(20.0))
 		self.nogo_area_radius_squared = 0*0 #in meters, radius the current goal covers
 		
+	@instrumented
 	def execute(self, userdata):
 		sf = ScreenFormat("SelectNavigationGoal")
 		
@@ -58,9 +58,11 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 from simple_script_server import *
 sss = simple_script_server()
+from cob_generic_states.light_manager import get_light_manager
 
 
 class Sleep(smach.State):
@@ -69,6 +71,7 @@ class Sleep(smach.State):
 			outcomes=['succeeded'])
 		self.duration = duration
 
+	@instrumented
 	def execute(self, userdata):
 		sss.sleep(self.duration)
 		
@@ -81,8 +84,9 @@ class Light(smach.State):
 			outcomes=['succeeded'])
 		self.color = color
 
+	@instrumented
 	def execute(self, userdata):
-		sss.set_light("light", self.color)
+		get_light_manager().set_light(self.color)
 		return 'succeeded'
 
 class LightDyn(smach.State):
@@ -91,6 +95,7 @@ class LightDyn(smach.State):
 			outcomes=['succeeded'],
 			input_keys=['color'])
 
+	@instrumented
 	def execute(self, userdata):
-		sss.set_light("light", userdata.color)
+		get_light_manager().set_light(userdata.color)
 		return 'succeeded'
@@ -2,36 +2,30 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 import random
 
 from simple_script_server import *
 sss = simple_script_server()
 
+from cob_generic_states.component_groups import bring_up_components
+from cob_generic_states.motion_groups import MotionGroup
+from cob_generic_states.light_manager import get_light_manager
+from cob_generic_states.component_interlocks import get_component_interlock
+
 class CobIntroductionInit(smach.State):
     def __init__(self):
         smach.State.__init__(self, 
             outcomes=['succeeded','failed'])
 			
+    @instrumented
     def execute(self, userdata):
-        handle_base = sss.init("base")
-        handle_torso = sss.init("torso")
-        handle_tray = sss.init("tray")
-        handle_sdh = sss.init("sdh")
-        handle_arm = sss.init("arm")
-        handle_head = sss.init("head")
-
-        if handle_base.get_error_code() != 0:
-            return "failed"
-        if handle_torso.get_error_code() != 0:
-            return "failed"
-        if handle_tray.get_error_code() != 0:
-            return "failed"
-        if handle_sdh.get_error_code() != 0:
-            return "failed"
-        if handle_arm.get_error_code() != 0:
-            return "failed"
-        if handle_head.get_error_code() != 0:
+        # all components are initialized in parallel
+        results = bring_up_components([(component, ["init"]) for component in ["base", "torso", "tray", "sdh", "arm", "head"]])
+        failed_components = [component for (component, result) in results.items() if result != "succeeded"]
+        if len(failed_components) > 0:
+            rospy.logerr("Init failed for components: %s", ", ".join(sorted(failed_components)))
             return "failed"
 
         return "succeeded"
@@ -41,25 +35,13 @@ class CobIntroductionRecover(smach.State):
         smach.State.__init__(self, 
             outcomes=['succeeded','failed'])
 			
+    @instrumented
     def execute(self, userdata):
-        handle_base = sss.recover("base")
-        handle_torso = sss.recover("torso")
-        handle_tray = sss.recover("tray")
-        handle_sdh = sss.recover("sdh")
-        handle_arm = sss.recover("arm")
-        handle_head = sss.recover("head")
-
-        if handle_base.get_error_code() != 0:
-            return "failed"
-        if handle_torso.get_error_code() != 0:
-            return "failed"
-        if handle_tray.get_error_code() != 0:
-            return "failed"
-        if handle_sdh.get_error_code() != 0:
-            return "failed"
-        if handle_arm.get_error_code() != 0:
-            return "failed"
-        if handle_head.get_error_code() != 0:
+        # all components are recovered in parallel
+        results = bring_up_components([(component, ["recover"]) for component in ["base", "torso", "tray", "sdh", "arm", "head"]])
+        failed_components = [component for (component, result) in results.items() if result != "succeeded"]
+        if len(failed_components) > 0:
+            rospy.logerr("Recover failed for components: %s", ", ".join(sorted(failed_components)))
             return "failed"
 
         return "succeeded"
@@ -69,28 +51,15 @@ class CobIntroductionPrepare(smach.State):
         smach.State.__init__(self, 
             outcomes=['succeeded','failed'])
 			
+    @instrumented
     def execute(self, userdata):
-        handle_torso = sss.move("torso", "home",False)
-        handle_tray = sss.move("tray", "down",False)
-        handle_sdh = sss.move("sdh", "home",False)
-        handle_arm = sss.move("arm", "folded",False)
-        handle_head = sss.move("head", "front",False)
-
-        handle_torso.wait()
-        handle_tray.wait()
-        handle_sdh.wait()
-        handle_arm.wait()
-        handle_head.wait()
-
-        if handle_torso.get_error_code() != 0:
+        # wait for components which are still stowed in the background
+        if not get_component_interlock().acquire(["torso", "tray", "sdh", "arm", "head"]):
             return "failed"
-        if handle_tray.get_error_code() != 0:
-            return "failed"
-        if handle_sdh.get_error_code() != 0:
-            return "failed"
-        if handle_arm.get_error_code() != 0:
-            return "failed"
-        if handle_head.get_error_code() != 0:
+
+        result = MotionGroup({"torso": "home", "tray": "down", "sdh": "home", "arm": "folded", "head": "front"}).execute()
+        if not result.succeeded():
+            result.log_failures()
             return "failed"
 
         return "succeeded"
@@ -100,7 +69,12 @@ class CobIntroduction(smach.State):
         smach.State.__init__(self, 
             outcomes=['succeeded','failed'])
 			
+    @instrumented
     def execute(self, userdata):
+        # wait for components which are still stowed in the background
+        if not get_component_interlock().acquire(["base", "torso", "tray", "sdh", "arm", "head"]):
+            return 'failed'
+
         handle_torso = sss.move("torso","nod",False)
         handle_say = sss.say("sound", ["Hello, nice to meet you. My name is Care-O-bot. I am a mobile service robot build by Fraunhofer I. P. A., in Stuttgart and I am designed as a household assistant. My job is to help for example elderly people to stay longer at home, so that they do not have to go to a care facility."],False)
         handle_torso.wait()
@@ -120,25 +94,25 @@ class CobIntroduction(smach.State):
         # sound and led
         sss.say("sound", ["First of all, I can speak to you and change colors. This way I can express my mood and intention."])
 
-        sss.set_light("light", "yellow")
+        get_light_manager().set_light("yellow")
         handle_say = sss.say("sound", ["I normally light up in yellow if I am moving some of my hardware components, so please pay attention."], False)
         handle_say.wait()
 
-        sss.set_light("light", "blue")
+        get_light_manager().set_light("blue")
         handle_say = sss.say("sound", ["Blue means that I am heavily thinking which means I am for example calculating a collision free path."])
         handle_say.wait()
 
-        sss.set_light("light", "green")
+        get_light_manager().set_light("green")
         handle_say = sss.say("sound", ["If I light up in green, everything is fine and I am ready to be at your service."])
         handle_say.wait()
         rospy.sleep(1)
 
         # tray
-        sss.set_light("light", "yellow")
+        get_light_manager().set_light("yellow")
         handle_tray = sss.move("tray", "up", False)
         sss.say("sound", ["I have a tray that can be used to receive or hand over objects from people."])
         handle_tray.wait()
-        sss.set_light("light", "green")
+        get_light_manager().set_light("green")
 
         # head and cameras
         sss.say("sound", ["With my torso I can perform gestures like nodding."],False)
@@ -162,13 +136,13 @@ class CobIntroduction(smach.State):
         # arm
         sss.say("sound", ["Oh, what is that?"])
         sss.say("sound", ["I have an arm and a gripper on the back side."])
-        sss.set_light("light", "yellow")
+        get_light_manager().set_light("yellow")
         handle_arm = sss.move("arm",["intermediateback", "intermediatefront"], False)
         sss.move("head","front", False)
         sss.move("torso","front_left", False)
         sss.say("sound", ["Lets move them to the front so that you can see them. My functional design follows a two side interaction concept: Normally I use the arm on the backside to manipulate objects and use the tray to safely hand over objects to humans on the front side."])
         handle_arm.wait()
-        sss.set_light("light", "green")
+        get_light_manager().set_light("green")
 
         # gripper
         handle_sdh = sss.move("sdh","cylopen",False)
@@ -186,7 +160,7 @@ class CobIntroduction(smach.State):
         sss.move("sdh","home",False)
 
         # arm back
-        sss.set_light("light", "yellow")
+        get_light_manager().set_light("yellow")
         sss.say("sound", ["Are you already impressed? Wait, let me go on."], False)
         handle_arm = sss.move("arm",["intermediatefront", "intermediateback", "folded"], False)
         sss.move("tray","down", False)
@@ -203,7 +177,7 @@ class CobIntroduction(smach.State):
         sss.move_base_rel("base",[0, 0.1, 0])
         sss.move_base_rel("base",[0, -0.1, 0])
         sss.move_base_rel("base",[0, 0, -1.57])
-        sss.set_light("light", "green")
+        get_light_manager().set_light("green")
 
         # please take joystick
         sss.move("torso","left", False)
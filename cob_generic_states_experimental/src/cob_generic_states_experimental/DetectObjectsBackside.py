@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 from math import *
 import copy
@@ -14,6 +15,9 @@ from cob_object_detection_msgs.msg import *
 from cob_object_detection_msgs.srv import *
 
 from cob_generic_states_experimental.ObjectDetector import *
+from cob_generic_states.motion_groups import MotionGroup
+from cob_generic_states.light_manager import get_light_manager
+from cob_generic_states.component_interlocks import get_component_interlock
 
 ## Detect front state
 #
@@ -45,33 +49,35 @@ class DetectObjectsBackside(smach.State):
 		self.object_detector = ObjectDetector(object_names, namespace, detector_srv, self.mode)
 	
 
+	@instrumented
 	def execute(self, userdata):
 
-		sss.set_light("light", 'blue')
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["sdh", "arm", "torso", "head"]):
+			return 'failed'
+
+		get_light_manager().set_light('blue')
 
 		#Preparations for object detection
-		handle_torso = sss.move("torso","home",False)
-		sss.set_light("light", 'yellow')
-		handle_arm = sss.move("arm","folded-to-look_at_table",False)
-		handle_head = sss.move("head","back",False)
-		handle_arm.wait()
-		handle_torso.wait()
-		handle_head.wait()
-		sss.set_light("light", 'blue')
+		get_light_manager().set_light('yellow')
+		result = MotionGroup({"torso": "home", "arm": "folded-to-look_at_table", "head": "back"}).execute()
+		if not result.succeeded():
+			result.log_failures()
+		get_light_manager().set_light('blue')
 
 		result, userdata.objects = self.object_detector.execute(userdata)
 
 		# ... cleanup robot components
 		if result != "detected":
-			sss.set_light("light", 'yellow')
+			get_light_manager().set_light('yellow')
 			sss.move("torso","front")
 			handle_arm = sss.move("arm","look_at_table-to-folded")
 		sss.move("torso","home")
 
 		if result == "failed":
-			sss.set_light("light", 'red')
+			get_light_manager().set_light('red')
 		else:
-			sss.set_light("light", 'green')
+			get_light_manager().set_light('green')
 		
 		return result
 
@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 from math import *
 import copy
@@ -14,6 +15,7 @@ from cob_object_detection_msgs.msg import *
 from cob_object_detection_msgs.srv import *
 
 from cob_generic_states_experimental.ObjectDetector import *
+from cob_generic_states.light_manager import get_light_manager
 
 ## Detect front state
 #
@@ -44,16 +46,17 @@ class DetectObjectsFrontside(smach.State):
 		self.object_detector = ObjectDetector(object_names, namespace, detector_srv, self.mode)
 	
 
+	@instrumented
 	def execute(self, userdata):
 
-		sss.set_light("light", 'blue')
+		get_light_manager().set_light('blue')
 
 		#Preparations for object detection
 		handle_torso = sss.move("torso","home",False)
 		handle_head = sss.move("head","front",False)
 		handle_head.wait()
 		handle_torso.wait()
-		sss.set_light("light", 'blue')
+		get_light_manager().set_light('blue')
 
 		result, userdata.objects = self.object_detector.execute(userdata)
 
@@ -61,9 +64,9 @@ class DetectObjectsFrontside(smach.State):
 		sss.move("torso","home")
 
 		if result == "failed":
-			sss.set_light("light", 'red')
+			get_light_manager().set_light('red')
 		else:
-			sss.set_light("light", 'green')
+			get_light_manager().set_light('green')
 		
 		return result
 
@@ -3,16 +3,19 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from simple_script_server import *  # import script
 sss = simple_script_server()
+from cob_generic_states.speech_scheduler import get_speech_scheduler
 
 class DetectPeople(smach.State):
 	def __init__(self):
 		smach.State.__init__(self, 
 			outcomes=['found','not_found','failed'],
 			input_keys=[])
+	@instrumented
 	def execute(self, userdata):
-		sss.say("sound", ["I am detecting people now."])
+		get_speech_scheduler().say(["I am detecting people now."])
 		sss.sleep(2)
-		sss.say("sound", ["I found two persons."])
+		get_speech_scheduler().say(["I found two persons."])
 		return 'found'
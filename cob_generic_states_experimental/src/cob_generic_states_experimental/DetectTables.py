@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from simple_script_server import *  # import script
 sss = simple_script_server()
 
@@ -18,6 +19,7 @@ class DetectTables(smach.State):
 			output_keys=['tables'])
 		self.client = actionlib.SimpleActionClient('/trigger_segmentation', TriggerAction)
 
+	@instrumented
 	def execute(self, userdata):
 		#stop mapping
 #		goal = TriggerGoal()
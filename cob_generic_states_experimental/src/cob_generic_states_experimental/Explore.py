@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 import random
 from nav_msgs.srv import *
@@ -10,6 +11,7 @@ from cob_object_detection_msgs.msg import *
 
 from cob_generic_states_experimental.ApproachPose import *
 from cob_generic_states_experimental.DetectObjectsFrontside import *
+from cob_generic_states.speech_scheduler import get_speech_scheduler
 
 class SelectNavigationGoal(smach.State):
 	def __init__(self):
@@ -19,6 +21,7 @@ class SelectNavigationGoal(smach.State):
 			
 		self.goals = []
 			
+	@instrumented
 	def execute(self, userdata):
 		# defines
 		x_min = 0
@@ -64,15 +67,16 @@ class AnnounceFoundObjects(smach.State):
 			input_keys=['objects'],
 			output_keys=['objects'])
 			
+	@instrumented
 	def execute(self, userdata):
 		object_names = ""
 		for obj in userdata.objects:
 			object_names += obj.label + ", "
 		
 		if object_names != "":
-			sss.say("sound", ["I found: " + object_names])
+			get_speech_scheduler().say(["I found: " + object_names])
 		else:
-			sss.say("sound", ["I found: nothing"])
+			get_speech_scheduler().say(["I found: nothing"])
 		userdata.objects = []
 		return 'announced'
 
@@ -6,15 +6,18 @@ import math
 import time
 import random
 import threading
+from collections import OrderedDict
+from operator import attrgetter
 
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 import tf
 from tf import TransformListener
 from tf.transformations import euler_from_quaternion
 
-from geometry_msgs.msg import Pose2D
+from geometry_msgs.msg import Pose2D, PoseStamped, Twist
 from cob_perception_msgs.msg import *
 #from accompany_uva_msg.msg import *
 from cob_map_accessibility_analysis.srv import CheckPerimeterAccessibility
@@ -22,6 +25,7 @@ from cob_map_accessibility_analysis.srv import CheckPointAccessibility
 
 from cob_generic_states_experimental.ApproachPose import *
 from cob_generic_states_experimental.GoToUtils import *
+from cob_generic_states_experimental.PersonTracker import *
 from cob_generic_states_experimental.ScreenFormatting import *
 
 
@@ -60,6 +64,10 @@ class GoToGoalGeneric(smach.State):
     self.current_goal=False
     self.new_goal=False
     self.current_goal_approached=False
+    # motion model of every searched person, the goal is the predicted intercept point instead of the last detection
+    self.trackers={}
+    self.track_persons=True
+    self.robot_speed=0.5
     # flag if perimeter goals are supposed to be approached instead of
     # approaching the goal directly
  #   self.use_perimeter_goal=True --> should be set by userdata for each call individually
@@ -77,12 +85,18 @@ class GoToGoalGeneric(smach.State):
 
     if self.callback_activated == True:
       # get pose for name
-      (name,self.new_goal)=self.generic_listener.get_pose_for_name(name=name)
+      (name,self.new_goal,stamp)=self.generic_listener.get_stamped_pose_for_name(name=name)
       #print "I got this from a generic callback"
       #print name
       #print self.new_goal
       #print "------------------"
       if self.new_goal!=False:
+        if self.track_persons==True:
+          if stamp==None or stamp.is_zero():
+            stamp=rospy.Time.now()
+          # re-target only if the predicted intercept point moved, not on every step of a walking person
+          self.get_tracker(name).update(self.new_goal.x,self.new_goal.y,stamp.to_sec())
+          self.new_goal=self.predict_goal(name,self.new_goal)
         self.update_goal=self.goals_differ(self.new_goal,self.current_goal,similar_goal_threshold)
         # if goal is not updated but detection was available - person is
         # detected at current goal - if goal is updated person is NOT detected
@@ -95,6 +109,31 @@ class GoToGoalGeneric(smach.State):
 
 
 
+  def get_tracker(self,name):
+    if name not in self.trackers:
+      self.trackers[name]=PersonTracker()
+    return self.trackers[name]
+
+  def predict_goal(self,name,goal=None):
+    # returns the point where the robot would meet the person name, or goal if the person is not tracked
+    if name not in self.trackers or self.trackers[name].is_initialized()==False:
+      return goal
+    tracker=self.trackers[name]
+    now=rospy.Time.now().to_sec()
+    if now-tracker.stamp>tracker.max_gap:
+      return goal
+    (transform_possible,robot_position,quaternion)=get_robot_pose_cache().get_robot_pose()
+    if transform_possible==True:
+      (x,y)=tracker.predict_intercept(robot_position[0],robot_position[1],self.robot_speed,now)
+    else:
+      (x,y)=tracker.predict_position(now)
+    predicted_goal=Pose2D()
+    predicted_goal.x=x
+    predicted_goal.y=y
+    if goal!=None and goal!=False:
+      predicted_goal.theta=goal.theta
+    return predicted_goal
+
   def activate_callback(self,reset_detections=True):
 
     if reset_detections==True:
@@ -153,16 +192,20 @@ class GoToGoalGeneric(smach.State):
       if True:
         rospy.loginfo("Computing goal on perimeter")
 
-        rotational_sampling_step = 10.0/180.0*math.pi
-        rospy.wait_for_service('map_accessibility_analysis/map_perimeter_accessibility_check',10)
-        try:
-          get_approach_pose = rospy.ServiceProxy('map_accessibility_analysis/map_perimeter_accessibility_check', CheckPerimeterAccessibility)
-          res = get_approach_pose(goal, radius, rotational_sampling_step)
-          valid_poses=res.accessible_poses_on_perimeter
-        except rospy.ServiceException, e:
-          rospy.logwarn("Service call failed: %s",e)
-          print "logwarn  returing false"
-          return False
+        # goal updates close to a previous goal reuse its result as long as the accessibility map did not change
+        valid_poses=get_perimeter_goal_cache().get(goal,radius)
+        if valid_poses==None:
+          rotational_sampling_step = 10.0/180.0*math.pi
+          rospy.wait_for_service('map_accessibility_analysis/map_perimeter_accessibility_check',10)
+          try:
+            get_approach_pose = rospy.ServiceProxy('map_accessibility_analysis/map_perimeter_accessibility_check', CheckPerimeterAccessibility)
+            res = get_approach_pose(goal, radius, rotational_sampling_step)
+            valid_poses=res.accessible_poses_on_perimeter
+          except rospy.ServiceException, e:
+            rospy.logwarn("Service call failed: %s",e)
+            print "logwarn  returing false"
+            return False
+          get_perimeter_goal_cache().put(goal,radius,valid_poses)
         
         #print "valid_poses"
         #print valid_poses
@@ -170,17 +213,19 @@ class GoToGoalGeneric(smach.State):
         if len(valid_poses) == 0:
             return -1
 
-        # try for a while to get robot pose # TODO check if this is necessary
-        for i in xrange(10):
+        # use the cached robot pose, try for a while to get robot pose from tf otherwise
+        (trafo_possible,robot_pose,quaternion)=get_robot_pose_cache().get_robot_pose()
+        attempts=0
+        while trafo_possible==False and attempts<10:
           (trafo_possible,robot_pose,quaternion)=self.utils.getRobotPose(get_transform_listener())
-          rospy.sleep(0.2)
-          if trafo_possible==True:
-            current_pose=Pose2D()
-            current_pose.x=robot_pose[0]
-            current_pose.y=robot_pose[1]
-            break
+          if trafo_possible==False:
+            rospy.sleep(0.2)
+          attempts+=1
 
         if trafo_possible==True:
+          current_pose=Pose2D()
+          current_pose.x=robot_pose[0]
+          current_pose.y=robot_pose[1]
           closest_pose = Pose2D()
           minimum_distance_squared = 100000.0
           for pose in valid_poses:
@@ -209,9 +254,19 @@ class GoToGoalGeneric(smach.State):
       rospy.loginfo("Commanding move to current goal")
 
 
+  @instrumented
   def execute(self,userdata):
+    try:
+      return self.go_to_goal(userdata)
+    finally:
+      # detections are neither received nor processed while the state is inactive
+      self.generic_listener.close()
+
+  def go_to_goal(self,userdata):
     sf = ScreenFormat("GoToGoalGeneric")
     rospy.loginfo("Person detected at goal: %s",userdata.person_detected_at_goal)
+    self.track_persons=userdata.predefinitions.get("track_persons",True)
+    self.robot_speed=userdata.predefinitions.get("robot_speed",0.5)
     self.generic_listener.set_config(userdata.callback_config)
     self.activate_callback(reset_detections=True)
 
@@ -220,12 +275,35 @@ class GoToGoalGeneric(smach.State):
       self.person_detected_at_current_goal=False
       self.generic_listener.reset()
 
-    movement_unecessary=self.utils.goal_approached(userdata.current_goal,get_transform_listener(),dist_threshold=userdata.predefinitions["approached_threshold"])
+    # the loops below wake up on new detections and robot poses instead of polling with a fixed period
+    update_event=threading.Event()
+    self.generic_listener.add_event(update_event)
+    try:
+      return self.go_to_goal_on_events(userdata,update_event)
+    finally:
+      self.generic_listener.remove_event(update_event)
+      get_robot_pose_cache().remove_event(update_event)
+
+  def goal_approached(self,userdata):
+    # uses the cached robot pose if available
+    (transform_possible,current_position,quaternion)=get_robot_pose_cache().get_robot_pose()
+    if transform_possible==True:
+      return self.utils.goal_approached_from_pose(userdata.current_goal,transform_possible,current_position,quaternion,dist_threshold=userdata.predefinitions["approached_threshold"])
+    return self.utils.goal_approached(userdata.current_goal,get_transform_listener(),dist_threshold=userdata.predefinitions["approached_threshold"])
+
+  def go_to_goal_on_events(self,userdata,update_event):
+    # maximum time between two checks if neither detections nor poses arrive [s]
+    check_timeout=userdata.predefinitions.get("check_timeout",1.0)
+
+    movement_unecessary=self.goal_approached(userdata)
     if movement_unecessary==True:
       rospy.loginfo("Move unnecessary - waiting for detections")
-      for i in xrange(5):
+      self.current_goal=userdata.current_goal
+      end_time=time.time()+5.0
+      while not rospy.is_shutdown() and self.person_detected_at_current_goal==False and time.time()<end_time:
+        update_event.wait(min(check_timeout,max(0.0,end_time-time.time())))
+        update_event.clear()
         self.check_callback(userdata.person_name,userdata.predefinitions["similar_goal_threshold"])
-        time.sleep(1)
       if self.person_detected_at_current_goal==True:
           userdata.person_detected_at_goal=True
           return 'approached_goal_found'
@@ -267,6 +345,10 @@ class GoToGoalGeneric(smach.State):
       # activate processing of external information
       # command robot move
       #if self.use_perimeter_goal==True:
+      if userdata.use_perimeter_goal==True and self.track_persons==True:
+        # approach the position where the person is expected to be met
+        userdata.current_goal=self.predict_goal(userdata.person_name,userdata.current_goal)
+        self.current_goal=userdata.current_goal
       print "checking perimeter on current goal: ", userdata.current_goal
       if userdata.use_perimeter_goal==True:
         radius_factor = 1.0
@@ -287,9 +369,11 @@ class GoToGoalGeneric(smach.State):
 
       #TODO check for goal status
       stop_base=False
+      get_robot_pose_cache().add_event(update_event)
       while not rospy.is_shutdown() and stop_base==False :
-        #check every second for goal updates
-        time.sleep(1)
+        # check for goal updates whenever a detection or robot pose arrives
+        update_event.wait(check_timeout)
+        update_event.clear()
         # when external information makes change of goals necessary
         self.check_callback(userdata.person_name,userdata.predefinitions["similar_goal_threshold"])
 
@@ -305,7 +389,7 @@ class GoToGoalGeneric(smach.State):
 
 
 
-          self.current_goal_approached=self.utils.goal_approached(userdata.current_goal,get_transform_listener(),dist_threshold=userdata.predefinitions["approached_threshold"])
+          self.current_goal_approached=self.goal_approached(userdata)
           # when goal has been approached and person was detected in the
           # process
           if self.current_goal_approached==True and self.person_detected_at_current_goal==True:
@@ -367,10 +451,19 @@ class ObserveGeneric(smach.State):
     self.rep_ctr=0
     self.utils=Utils()
     self.generic_listener=GenericListener(target_frame="/map")
+    self.velocity_pubs={}
     #self.tf = TransformListener()
 
 
+  @instrumented
   def execute(self, userdata):
+    try:
+      return self.observe(userdata)
+    finally:
+      # detections are neither received nor processed while the state is inactive
+      self.generic_listener.close()
+
+  def observe(self, userdata):
     sf = ScreenFormat("ObserveGeneric")
     self.generic_listener.reset()
     self.rotate_while_observing=True
@@ -400,37 +493,83 @@ class ObserveGeneric(smach.State):
     #    return 'not_detected'
 
     #elif userdata.rotate_while_observing==True:
-    if True:
-      rel_pose=list()
-      rel_pose.append(0)
-      rel_pose.append(0)
-      rel_pose.append(-0.1)
-      for i in xrange(80):
-        if i==5:
-          rel_pose.pop()
-          rel_pose.append(0.1)
-        handle_base = sss.move_base_rel("base", rel_pose,blocking =True)
-
-        # pick detection label which is majority in list
-        #TODO pick first is temporary hack
-        if userdata.person_name=="NOSET":
-          # automatically use firste entry in detections
-          (new_name,new_goal)=self.generic_listener.get_pose_for_name()
-        else:
-          (new_name,new_goal)=self.generic_listener.get_pose_for_name(name=userdata.person_name)
-
-        # check what is returned from generic listener
-        if new_goal != False:
-            userdata.position_last_seen=new_goal
-            userdata.current_goal=new_goal
-            userdata.person_detected_at_goal=True
-            userdata.use_perimeter_goal = True
-            # stop observation
-            sss.stop("base")
+    # the continuous mode has to be enabled explicitly, it commands velocities instead of going through the script server
+    if userdata.predefinitions.get("observe_mode","stepwise")=="continuous":
+      return self.observe_continuously(userdata)
+    else:
+      return self.observe_stepwise(userdata)
+
+  def observe_stepwise(self, userdata):
+    rel_pose=list()
+    rel_pose.append(0)
+    rel_pose.append(0)
+    rel_pose.append(-0.1)
+    for i in xrange(80):
+      if i==5:
+        rel_pose.pop()
+        rel_pose.append(0.1)
+      handle_base = sss.move_base_rel("base", rel_pose,blocking =True)
+
+      if self.check_detection(userdata)==True:
+          # stop observation
+          sss.stop("base")
+          return 'detected'
+    return 'not_detected'
+
+  def observe_continuously(self, userdata):
+    # rotates the base with a constant angular velocity and checks the detections in every control period,
+    # covers the same angles as the stepwise observation (0.5 rad backwards, then 7.5 rad forwards)
+    # the velocities are sent to the input of the collision velocity filter, never directly to the base controller
+    angular_velocity=abs(userdata.predefinitions.get("observe_angular_velocity",0.4))   # [rad/s]
+    control_rate=userdata.predefinitions.get("observe_control_rate",10.0)               # [Hz]
+    if not angular_velocity>0 or not control_rate>0:
+      rospy.logerr("observe_angular_velocity %s and observe_control_rate %s have to be positive, observing stepwise instead",str(angular_velocity),str(control_rate))
+      return self.observe_stepwise(userdata)
+    rate=rospy.Rate(control_rate)
+    velocity_topic=userdata.predefinitions.get("observe_velocity_topic","/base_controller/command_safe")
+    if rospy.resolve_name(velocity_topic)==rospy.resolve_name("/base_controller/command"):
+      rospy.logerr("observe_velocity_topic %s bypasses the collision velocity filter, observing stepwise instead",velocity_topic)
+      return self.observe_stepwise(userdata)
+    velocity_pub=self.get_velocity_publisher(velocity_topic)
+    twist=Twist()
+    try:
+      for angle in [-0.5,7.5]:
+        twist.angular.z=math.copysign(angular_velocity,angle)
+        end_time=rospy.Time.now()+rospy.Duration(abs(angle)/angular_velocity)
+        while not rospy.is_shutdown() and rospy.Time.now()<end_time:
+          if self.check_detection(userdata)==True:
             return 'detected'
-        else:
-          userdata.person_detected_at_goal=False
-      return 'not_detected'
+          velocity_pub.publish(twist)
+          rate.sleep()
+    finally:
+      # stop observation
+      velocity_pub.publish(Twist())
+    return 'not_detected'
+
+  def get_velocity_publisher(self, topic):
+    if topic not in self.velocity_pubs:
+      self.velocity_pubs[topic]=rospy.Publisher(topic,Twist,queue_size=1)
+    return self.velocity_pubs[topic]
+
+  def check_detection(self, userdata):
+    # pick detection label which is majority in list
+    #TODO pick first is temporary hack
+    if userdata.person_name=="NOSET":
+      # automatically use firste entry in detections
+      (new_name,new_goal)=self.generic_listener.get_pose_for_name()
+    else:
+      (new_name,new_goal)=self.generic_listener.get_pose_for_name(name=userdata.person_name)
+
+    # check what is returned from generic listener
+    if new_goal != False:
+      userdata.position_last_seen=new_goal
+      userdata.current_goal=new_goal
+      userdata.person_detected_at_goal=True
+      userdata.use_perimeter_goal = True
+      return True
+    else:
+      userdata.person_detected_at_goal=False
+      return False
 
 class SetRandomGoal(smach.State):
   def __init__(self):
@@ -439,6 +578,7 @@ class SetRandomGoal(smach.State):
       input_keys= ['predefinitions','current_goal'],
       output_keys=['predefinitions','current_goal','use_perimeter_goal'])
 
+  @instrumented
   def execute(self, userdata):
       sf = ScreenFormat("SetRandomGoal")
       rospy.loginfo("navigating to random goal.")
@@ -465,108 +605,189 @@ class SetRandomGoal(smach.State):
       return 'finished'
 
 class GenericListener():
-  def __init__(self,target_frame=None):
+  # Collects detections of a generic topic (configured by callback_config) and provides the latest position of every label
+  # in target_frame. The subscriber callback only extracts the detections, the transformation into target_frame is done
+  # by a worker thread, so that slow or missing transforms do not block the callback queue of the topic.
+  def __init__(self,target_frame=None,max_detections=50,transform_timeout=0.5):
     # get configuration from input or default one
     self.config=None
     if target_frame==None:
         target_frame="/map"
     # initialize variables
-    self.detections=list()
-
     self.target_frame=target_frame
+    self.max_detections=max_detections          # maximum number of labels kept, the least recently updated label is dropped first
+    self.transform_timeout=transform_timeout    # maximum time to wait for the transform of a detection [s]
     self.utils=Utils()
+    self.extractors=None
 
+    # label -> (position in target_frame, stamp) of the latest detection, ordered by time of update
+    self.detections=OrderedDict()
+    # label -> (PoseStamped, frame) of the latest detection which is not transformed yet
+    self.pending=OrderedDict()
+    self.lock=threading.Lock()
+    self.pending_condition=threading.Condition(self.lock)
+    self.events=[]      # events that are set whenever a detection is stored
+    # incremented whenever the detections are cleared, detections received before are not stored anymore
+    self.generation=0
+    # a config which does not fit the messages of its topic is reported once
+    self.config_mismatch_logged=False
 
-  def set_config(self,config):
-    self.config=config
-    rospy.loginfo("Subscribing to %s",config["topicname"])
-
-    rospy.Subscriber(self.config["topicname"],self.config["msgclass"], self.listen)
+    self.worker=threading.Thread(target=self.transform_detections)
+    self.worker.daemon=True
+    self.worker.start()
 
-  def reset(self):
-    del self.detections[:]
 
-  def listen(self,msg):
-    det_content=getattr(msg,self.config["msg_element"])
-    for d in det_content:
-      d_content=dir(d)
+  def set_config(self,config):
+    # the attribute paths are resolved once per config instead of once per detection
+    extractors={}
+    for key in ["argname_label","argname_position","argname_header","argname_frame"]:
+      extractors[key]=attrgetter(".".join([str(syl) for syl in config[key]]))
+    with self.lock:
+      self.config=config
+      self.extractors=extractors
+      self.config_mismatch_logged=False
+    rospy.loginfo("Subscribing to %s",config["topicname"])
 
-      # check if config fits incoming message
-      if self.config["argname_label"][0]  not in d_content:
-        rospy.logerr("Cannot subscribe to topic because argname_label was not found in incoming message")
-      elif self.config["argname_position"][0] not in d_content:
-        rospy.logerr("Cannot subscribe to topic because argname_position[0] was not found in incoming message")
+    # a new subscription is only created if the topic or the config changed
+    config_key=tuple([config["msg_element"]]+[tuple(config[key]) for key in sorted(extractors.keys())])
+    get_subscription_manager().subscribe(self,config["topicname"],config["msgclass"],self.listen,config_key)
 
+  def shutdown(self):
+    # stops processing detections until set_config is called again, the subscription is kept (see close)
+    with self.lock:
+      self.config=None
+      self.clear_detections()
+    rospy.logdebug("Subscriptions of generic listeners: %s",str(get_subscription_manager().get_counters()))
 
-      else:
-        position=self.extract_from_msg(d,self.config["argname_position"])
-        name=self.extract_from_msg(d,self.config["argname_label"])
-        header=self.extract_from_msg(d,self.config["argname_header"])
-        frame=self.extract_from_msg(d,self.config["argname_frame"])
- 
-
-        #print "-----------------------------------------------------"
-        #print "-----------------------------------------------------"
-        #print name
-        #print "-----------------------------------------------------"
-        #print position
-        #print "-----------------------------------------------------"
-        #print frame
-        #print "-----------------------------------------------------"
-        #print "-----------------------------------------------------"
-
-        # turn position to pose
-        pose=PoseStamped()
-        pose.header=header
-        pose.pose.position=position
-
-        # if necessary transform pose
-        if frame !=self.target_frame:
-          t_pose=self.utils.transformPose(pose,get_transform_listener())
-          #print "trafo necessary"
-        else:
-          #print "trafo not necessary"
-          t_pose=pose
+  def close(self):
+    # stops listening and releases the subscription, the owning state calls it when it exits
+    get_subscription_manager().unsubscribe(self)
+    self.shutdown()
 
-        self.detections.append((name,t_pose.pose.position))
+  def reset(self):
+    with self.lock:
+      self.clear_detections()
 
+  def clear_detections(self):
+    # requires self.lock
+    self.detections.clear()
+    self.pending.clear()
+    self.generation+=1
 
-  def extract_from_msg(self,d,keyword_list):
-        if len(keyword_list)>1:
-          att_it=d
-          for syl in keyword_list:
-            att_it=getattr(att_it,str(syl))
-          val=att_it
-        else:
-          val=getattr(d,str(keyword_list[0]))
-        return val
+  def listen(self,msg):
+    with self.lock:
+      config=self.config
+      extractors=self.extractors
+      generation=self.generation
+    if config==None:
+      return
+    det_content=getattr(msg,config["msg_element"])
+    for d in det_content:
+      try:
+        position=extractors["argname_position"](d)
+        name=extractors["argname_label"](d)
+        header=extractors["argname_header"](d)
+        frame=extractors["argname_frame"](d)
+      except AttributeError, e:
+        # config does not fit this detection, the other detections of the message are still processed
+        with self.lock:
+          logged=self.config_mismatch_logged
+          self.config_mismatch_logged=True
+        if not logged:
+          rospy.logerr("Cannot process detection of topic %s because the callback_config does not fit the message: %s",config["topicname"],e)
+        continue
+
+      # turn position to pose
+      pose=PoseStamped()
+      pose.header=header
+      pose.pose.position=position
+
+      # only the latest detection of every label is transformed
+      with self.lock:
+        if generation!=self.generation:
+          # detections were reset while the message was processed
+          return
+        self.pending.pop(name,None)
+        self.pending[name]=(pose,frame)
+        while len(self.pending)>self.max_detections:
+          self.pending.popitem(last=False)
+        self.pending_condition.notify()
+
+  def transform_detections(self):
+    while not rospy.is_shutdown():
+      with self.lock:
+        while len(self.pending)==0:
+          self.pending_condition.wait(1.0)
+          if rospy.is_shutdown():
+            return
+        (name,(pose,frame))=self.pending.popitem(last=False)
+        generation=self.generation
+
+      # if necessary transform pose
+      if frame!=self.target_frame:
+        try:
+          tl=get_transform_listener()
+          tl.waitForTransform(self.target_frame, pose.header.frame_id, pose.header.stamp, rospy.Duration(self.transform_timeout))
+          pose=tl.transformPose(self.target_frame,pose)
+        except (tf.Exception, tf.LookupException, tf.ConnectivityException, tf.ExtrapolationException), e:
+          rospy.logdebug("Dropping detection of %s, no transform to %s available: %s",name,self.target_frame,e)
+          continue
+
+      with self.lock:
+        if generation!=self.generation:
+          # detections were reset while the detection was transformed
+          continue
+        self.detections.pop(name,None)
+        self.detections[name]=(pose.pose.position,pose.header.stamp)
+        while len(self.detections)>self.max_detections:
+          self.detections.popitem(last=False)
+        events=list(self.events)
+      for event in events:
+        event.set()
+
+  def add_event(self,event):
+    with self.lock:
+      self.events.append(event)
+
+  def remove_event(self,event):
+    with self.lock:
+      if event in self.events:
+        self.events.remove(event)
 
   def get_pose_for_name(self,name=None):
-    if len(self.detections)>0:
-      #print "detections available"
-      if name==None:
+    (name,det_pose,stamp)=self.get_stamped_pose_for_name(name)
+    return (name,det_pose)
+
+  def get_stamped_pose_for_name(self,name=None):
+    # like get_pose_for_name, additionally returns the stamp of the detection
+    with self.lock:
+      if len(self.detections)>0:
+        if name==None:
           #extract position for the first name in detections
-          det_name=self.detections[0][0]
+          (det_name,(position,stamp))=next(self.detections.iteritems())
           det_pose=Pose2D()
-          det_pose.x=self.detections[0][1].x
-          det_pose.y=self.detections[0][1].y
-          det_pose.theta=self.detections[0][1].theta
-          return (det_name,det_pose)
-      # scan detections for name and pose
-      else:
-        for n,p in self.detections:
-          if name == str(n):
-            det_pose=Pose2D()
-            det_pose.x=p.x
-            det_pose.y=p.y
-            det_pose.theta=0
-            self.reset()
-            return (n,det_pose)
-        #extract pose for name return false if not present
-    return (name,False)
-   
+          det_pose.x=position.x
+          det_pose.y=position.y
+          det_pose.theta=0
+          return (det_name,det_pose,stamp)
+        # look up pose for name
+        else:
+          for n in [name,str(name)]:
+            if n in self.detections:
+              (position,stamp)=self.detections[n]
+              det_pose=Pose2D()
+              det_pose.x=position.x
+              det_pose.y=position.y
+              det_pose.theta=0
+              # when name found reset detections
+              self.clear_detections()
+              return (n,det_pose,stamp)
+    #extract pose for name return false if not present
+    return (name,False,None)
+
   def get_detections(self):
-    return self.detections
+    with self.lock:
+      return [(n,position) for (n,(position,stamp)) in self.detections.iteritems()]
 
 
 class SearchPersonGeneric(smach.StateMachine):
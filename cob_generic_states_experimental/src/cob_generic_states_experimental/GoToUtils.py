@@ -7,10 +7,13 @@ import random
 import time
 import threading
 import numpy as np
+from collections import OrderedDict
 
 import tf
 from tf import TransformListener
 from tf.transformations import euler_from_quaternion
+from nav_msgs.msg import Odometry
+from std_msgs.msg import UInt32
 
 
 ###############''WORKAROUND FOR TRANSFORMLISTENER ISSUE####################
@@ -25,6 +28,163 @@ def get_transform_listener():
     return _tl
 #################################################################################
 
+class SubscriptionManager():
+  # Keeps at most one subscription per owner. Subscribing again with the same key (topic, message class, config key)
+  # reuses the existing subscription, a different key swaps it. The counters reveal leaking subscriptions.
+  def __init__(self):
+    self.lock=threading.Lock()
+    self.subscriptions={}   # owner -> (key, subscriber)
+    self.created=0
+    self.reused=0
+    self.unregistered=0
+
+  def subscribe(self,owner,topic,msgclass,callback,config_key=None):
+    key=(topic,msgclass,config_key)
+    with self.lock:
+      if owner in self.subscriptions:
+        (current_key,subscriber)=self.subscriptions[owner]
+        if current_key==key:
+          self.reused+=1
+          return subscriber
+        subscriber.unregister()
+        self.unregistered+=1
+        del self.subscriptions[owner]
+      subscriber=rospy.Subscriber(topic,msgclass,callback)
+      self.subscriptions[owner]=(key,subscriber)
+      self.created+=1
+      return subscriber
+
+  def unsubscribe(self,owner):
+    with self.lock:
+      if owner in self.subscriptions:
+        self.subscriptions.pop(owner)[1].unregister()
+        self.unregistered+=1
+
+  def get_counters(self):
+    with self.lock:
+      return {"active":len(self.subscriptions),"created":self.created,"reused":self.reused,"unregistered":self.unregistered}
+
+class RobotPoseCache():
+  # Keeps the latest robot pose in /map. It is updated whenever odometry arrives (at most every min_update_period seconds)
+  # and signals the registered events, so that states can wait for pose changes instead of polling tf.
+  def __init__(self,odometry_topic="/base_controller/odometry",min_update_period=0.05):
+    self.lock=threading.Lock()
+    self.pose=None          # (position, quaternion, stamp)
+    self.events=[]
+    self.min_update_period=rospy.Duration(min_update_period)
+    self.last_update=rospy.Time(0)
+    rospy.Subscriber(odometry_topic,Odometry,self.odometry_callback)
+
+  def odometry_callback(self,msg):
+    now=rospy.Time.now()
+    if now-self.last_update<self.min_update_period:
+      return
+    self.last_update=now
+    try:
+      (position,quaternion)=get_transform_listener().lookupTransform("/map","/base_link",rospy.Time(0))
+    except (tf.LookupException, tf.ConnectivityException, tf.ExtrapolationException):
+      return
+    with self.lock:
+      self.pose=(position,quaternion,msg.header.stamp)
+      events=list(self.events)
+    for event in events:
+      event.set()
+
+  def get_robot_pose(self,max_age=1.0):
+    # same return values as Utils.getRobotPose, transform_possible is False if no pose younger than max_age [s] is cached
+    with self.lock:
+      pose=self.pose
+    if pose==None or (rospy.Time.now()-pose[2]).to_sec()>max_age:
+      return (False,0,0)
+    return (True,pose[0],pose[1])
+
+  def add_event(self,event):
+    with self.lock:
+      self.events.append(event)
+
+  def remove_event(self,event):
+    with self.lock:
+      if event in self.events:
+        self.events.remove(event)
+
+_pc=None
+_pc_creation_lock=threading.Lock()
+
+def get_robot_pose_cache():
+  global _pc
+  with _pc_creation_lock:
+    if _pc==None:
+      _pc=RobotPoseCache()
+    return _pc
+
+class PerimeterGoalCache():
+  # LRU cache of the accessible poses on a perimeter, keyed on the goal cell (goal quantized to cell_size), the radius and the
+  # version of the accessibility map. The cache is cleared whenever map_accessibility_analysis publishes a new map version,
+  # nothing is cached as long as no map version was received. If the server checks the approach path, the result also
+  # depends on the area the robot is currently in, so nothing is cached either.
+  def __init__(self,cell_size=0.1,max_entries=100,map_version_topic="map_accessibility_analysis/map_version",
+      approach_path_check_param="map_accessibility_analysis/approach_path_accessibility_check"):
+    self.lock=threading.Lock()
+    self.cell_size=cell_size
+    self.max_entries=max_entries
+    self.entries=OrderedDict()
+    self.map_version=None
+    self.enabled=(rospy.get_param(approach_path_check_param,False)==False)
+    self.hits=0
+    self.misses=0
+    rospy.Subscriber(map_version_topic,UInt32,self.map_version_callback)
+
+  def map_version_callback(self,msg):
+    with self.lock:
+      if msg.data!=self.map_version:
+        self.map_version=msg.data
+        self.entries.clear()
+
+  def get_key(self,goal,radius):
+    return (int(round(goal.x/self.cell_size)),int(round(goal.y/self.cell_size)),int(round(radius/self.cell_size)),self.map_version)
+
+  def get(self,goal,radius):
+    # returns the cached poses or None
+    with self.lock:
+      key=self.get_key(goal,radius)
+      if self.enabled==False or self.map_version==None or key not in self.entries:
+        self.misses+=1
+        return None
+      self.hits+=1
+      poses=self.entries.pop(key)
+      self.entries[key]=poses
+      return poses
+
+  def put(self,goal,radius,poses):
+    with self.lock:
+      if self.enabled==False or self.map_version==None:
+        return
+      key=self.get_key(goal,radius)
+      self.entries.pop(key,None)
+      self.entries[key]=poses
+      while len(self.entries)>self.max_entries:
+        self.entries.popitem(last=False)
+
+_gc=None
+_gc_creation_lock=threading.Lock()
+
+def get_perimeter_goal_cache():
+  global _gc
+  with _gc_creation_lock:
+    if _gc==None:
+      _gc=PerimeterGoalCache()
+    return _gc
+
+_sm=None
+_sm_creation_lock=threading.Lock()
+
+def get_subscription_manager():
+  global _sm
+  with _sm_creation_lock:
+    if _sm==None:
+      _sm=SubscriptionManager()
+    return _sm
+
 class Utils():
   def __init__(self):
     a=0
@@ -55,6 +215,9 @@ class Utils():
 
   def goal_approached(self,goal,tl,dist_threshold=0.3):
       (transform_possible,current_position,quaternion)=self.getRobotPose(tl)
+      return self.goal_approached_from_pose(goal,transform_possible,current_position,quaternion,dist_threshold)
+
+  def goal_approached_from_pose(self,goal,transform_possible,current_position,quaternion,dist_threshold=0.3):
       if transform_possible==True:
         [r,p,y]=euler_from_quaternion(quaternion)
         #print r
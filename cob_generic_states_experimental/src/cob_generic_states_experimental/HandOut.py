@@ -3,8 +3,10 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from simple_script_server import *  # import script
 sss = simple_script_server()
+from cob_generic_states.speech_scheduler import get_speech_scheduler
 
 from std_srvs.srv import Trigger
 
@@ -14,8 +16,9 @@ class HandOut(smach.State):
 			outcomes=['handed_out','not_handed_out','failed'],
 			input_keys=['object'])
 
+	@instrumented
 	def execute(self, userdata):
-		sss.say("sound", ["Here is your " + userdata.object.label + ". Please help yourself."],False)
+		get_speech_scheduler().say(["Here is your " + userdata.object.label + ". Please help yourself."])
 		sss.move("torso","nod",False)
 		
 		try:
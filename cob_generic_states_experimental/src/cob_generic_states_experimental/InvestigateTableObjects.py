@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from simple_script_server import *  # import script
 sss = simple_script_server()
 
@@ -14,6 +15,7 @@ class SetObjectName(smach.State):
 							input_keys=['object_names'],
 							output_keys=['object_names'])
 	
+	@instrumented
 	def execute(self, userdata):
 		userdata.object_names = ['all']
 		return 'success'
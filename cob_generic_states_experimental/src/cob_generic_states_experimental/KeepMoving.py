@@ -3,16 +3,20 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 import time
 import random
 from simple_script_server import *  # import script
 sss = simple_script_server()
+from cob_generic_states.speech_scheduler import get_speech_scheduler, PRIORITY_LOW
+from cob_generic_states.light_manager import get_light_manager
 
 class KeepMoving(smach.State):
   def __init__(self):
     smach.State.__init__(self, 
       outcomes=['succeeded'], input_keys=['concurrent_stop'], output_keys=['concurrent_stop'])
 
+  @instrumented
   def execute(self, userdata):
     userdata.concurrent_stop = False
     statements = ["Hello", "What can I bring for you?", "Fanta or Orange juice?", "My name is Care-O-bot", "Ich bin ein Saarbrucker"]
@@ -20,13 +24,13 @@ class KeepMoving(smach.State):
       choice = random.randint(1,4)
       if choice==1:
         choice2 = random.randint(0, len(statements)-1)
-        sss.say("sound", [statements[choice2]])
+        get_speech_scheduler().say([statements[choice2]], priority = PRIORITY_LOW, coalesce_key = "keep_moving")
       elif choice==2:       
-        sss.set_light("light", "red")      
+        get_light_manager().set_light("red")      
       elif choice==3:
-        sss.set_light("light", "blue")
+        get_light_manager().set_light("blue")
       else:
-		sss.set_light("light", "green")  
+		get_light_manager().set_light("green")  
       #else:
       #  sss.move("torso","front")
         #sss.move("torso", "back")
@@ -17,11 +17,13 @@ import random
 
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 from tf import TransformListener
 from tf.transformations import euler_from_quaternion
 from cob_perception_msgs.msg import *
 from cob_generic_states_experimental.ApproachPose import *
+from cob_generic_states.speech_scheduler import get_speech_scheduler
 
 class SelectNavigationGoal(smach.State):
   def __init__(self):
@@ -30,6 +32,7 @@ class SelectNavigationGoal(smach.State):
       output_keys=['base_pose'])
     self.goals = []
 
+  @instrumented
   def execute(self, userdata):
     #print self.goals
     #userdata.base_pose = self.goals.pop() # takes last element out of list
@@ -53,10 +56,11 @@ class SetName(smach.State):
       input_keys=['id'],
       output_keys=['id'])
 
+  @instrumented
   def execute(self, userdata):
     userdata.id='Richard'
     #userdata.id='Richard'
-    sss.say("sound", ["I am looking for %s!"%str(userdata.id)])
+    get_speech_scheduler().say(["I am looking for %s!"%str(userdata.id)])
     return 'set'
 
 class Rotate(smach.State):
@@ -81,8 +85,9 @@ class Rotate(smach.State):
         self.detections.append(msg.detections[i].label)
     return
 
+  @instrumented
   def execute(self, userdata):
-    sss.say("sound", ["I am going to take a look around now."])
+    get_speech_scheduler().say(["I am going to take a look around now."])
 
     # get position from tf
     if self.tf.frameExists("/base_link") and self.tf.frameExists("/map"):
@@ -114,20 +119,20 @@ class Rotate(smach.State):
         # right person is detected
         if det == userdata.id:
           self.stop_rotating=True
-          sss.say("sound", ['I have found you, %s! Nice to see you.'%str(det)])
+          get_speech_scheduler().say(['I have found you, %s! Nice to see you.'%str(det)])
         elif det in self.false_detections:
         # false person is detected
           print "Already in false detections"
        #  person detected is unknown - only react the first time
         elif det == "Unknown":
           print "Unknown face detected"
-          sss.say("sound", ['Hi! Nice to meet you, but I am still searching for %s.'%str(userdata.id)])
+          get_speech_scheduler().say(['Hi! Nice to meet you, but I am still searching for %s.'%str(userdata.id)])
           self.false_detections.append("Unknown")
       # wrong face is detected the first time
         else:
           self.false_detections.append(det)
           print "known - wrong face detected"
-          sss.say("sound", ['Hello %s! Have you seen %s.'%(str(det),str(userdata.id))])
+          get_speech_scheduler().say(['Hello %s! Have you seen %s.'%(str(det),str(userdata.id))])
       #clear detection list, so it is not checked twice
       del self.detections[:]
       time.sleep(2)
@@ -149,16 +154,17 @@ class Talk(smach.State):
         "No,you are not "
         ]
 
+  @instrumented
   def execute(self, userdata):
     name= str(userdata.id)
     print "wanted: %s"%name
     print "found:  %s"% userdata.detected
     if userdata.id != userdata.detected:
       #speech=self.phrases[3]+name+" !"
-      sss.say("sound", ['No, I am sorry, but you are not %s.'%str(name)])
+      get_speech_scheduler().say(['No, I am sorry, but you are not %s.'%str(name)])
       return 'not_found'
     else:
-      sss.say("sound", ['I have found you, %s! Nice to see you.'%str(name)])
+      get_speech_scheduler().say(['I have found you, %s! Nice to see you.'%str(name)])
       time.sleep(2)
       return 'found'
 
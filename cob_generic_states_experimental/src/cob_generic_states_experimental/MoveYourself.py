@@ -3,61 +3,42 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from simple_script_server import *  # import script
 sss = simple_script_server()
 
+from cob_generic_states.motion_groups import MotionGroup
+from cob_generic_states.light_manager import get_light_manager
+from cob_generic_states.component_interlocks import get_component_interlock
+
 class MoveYourself(smach.State):
 	def __init__(self):
 		smach.State.__init__(self,
 			outcomes=['succeeded','failed'])
 
+	@instrumented
 	def execute(self, userdata):
-		# ------------------------------------
-		sss.set_light("light", "yellow")
-		handle_arm = sss.move("arm","pregrasp",False)
-		handle_tray = sss.move("tray","up",False)
-		handle_torso = sss.move("torso","nod",False)
-		handle_sdh = sss.move("sdh","cylopen",False)
-		handle_head = sss.move("head","back",False)
-		
-		handle_head.wait()
-		handle_sdh.wait()
-		handle_torso.wait()
-		handle_tray.wait()
-		handle_arm.wait()
-		
-		if handle_head.get_state() != 3 or handle_sdh.get_state() != 3 or handle_torso.get_state() != 3 or	handle_tray.get_state() != 3 or handle_arm.get_state() != 3:
-			print "head state = ",handle_head.get_state() 
-			print "sdh state = ",handle_sdh.get_state()
-			print "torso state = ",handle_torso.get_state()
-			print "tray state = ",handle_tray.get_state()
-			print "arm state = ",handle_arm.get_state()
-			sss.set_light("light", "red")
-			return 'failed' 
-		
-		# ------------------------------------
-		handle_arm = sss.move("arm","folded",False)
-		handle_tray = sss.move("tray","down",False)
-		handle_torso = sss.move("torso","shake",False)
-		handle_sdh = sss.move("sdh","cylclosed",False)
-		handle_head = sss.move("head","front")
-		
-		handle_head.wait()
-		handle_sdh.wait()
-		handle_torso.wait()
-		handle_tray.wait()
-		handle_arm.wait()
-
-		if handle_head.get_state() != 3 or handle_sdh.get_state() != 3 or handle_torso.get_state() != 3 or	handle_tray.get_state() != 3 or handle_arm.get_state() != 3:
-			print "head state = ",handle_head.get_state() 
-			print "sdh state = ",handle_sdh.get_state()
-			print "torso state = ",handle_torso.get_state()
-			print "tray state = ",handle_tray.get_state()
-			print "arm state = ",handle_arm.get_state()
-			sss.set_light("light", "red")
+		# wait for components which are still stowed in the background
+		if not get_component_interlock().acquire(["arm", "tray", "torso", "sdh", "head"]):
+			return 'failed'
+
+		get_light_manager().set_light("yellow")
+		# every component continues with its second pose as soon as it has reached its first one
+		first = MotionGroup({"arm": "pregrasp", "tray": "up", "torso": "nod", "sdh": "cylopen", "head": "back"}).start()
+		second = first.chain({"arm": "folded", "tray": "down", "torso": "shake", "sdh": "cylclosed", "head": "front"})
+
+		result = first.wait()
+		if result.succeeded():
+			result = second.wait()
+		else:
+			# do not continue with the second poses once any first pose has failed
+			second.stop()
+		if not result.succeeded():
+			result.log_failures()
+			get_light_manager().set_light("red")
 			return 'failed'
 
-		sss.set_light("light", "green")
+		get_light_manager().set_light("green")
 		return 'succeeded'
 
 
@@ -65,6 +65,7 @@ import copy
 
 from simple_script_server import *
 sss = simple_script_server()
+from cob_generic_states.speech_scheduler import get_speech_scheduler
 
 from cob_object_detection_msgs.msg import *
 from cob_object_detection_msgs.srv import *
@@ -149,7 +150,7 @@ class ObjectDetector:
 			print "Service not available: %s"%e
 			return 'failed', self.detected_objects
 	
-		sss.say("sound", ["I am now looking for objects"],False)
+		get_speech_scheduler().say(["I am now looking for objects"])
 	
 		#iterate through torso poses until objects have been detected according to the mode	
 		for pose in self.torso_poses:
@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 from cob_3d_mapping_msgs.msg import *
 from cob_3d_mapping_msgs.srv import *
@@ -23,6 +24,7 @@ class SelectNavigationGoal(smach.State):
 		self.goals = [[0,0,-math.pi/3],[2.5,0,-3*math.pi/4]]
 		self.ctr = 0
 
+	@instrumented
 	def execute(self, userdata):
 		if self.ctr == len(self.goals):
 			print "All poses tried, aborting"
@@ -40,6 +42,7 @@ class ApproachNextTable(smach.State):
 			output_keys=['polygon', 'new_computation_flag'])
 		return
 	
+	@instrumented
 	def execute(self, userdata):
 		if len(userdata.tables.shapes) == 0: 
 			return 'not_found'
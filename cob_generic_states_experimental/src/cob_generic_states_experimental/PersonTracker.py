@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+import math
+import numpy as np
+
+
+class PersonTracker():
+  # Constant velocity Kalman filter over the (x, y) position of one person in /map.
+  # The state is [x, y, vx, vy], times are given in seconds.
+  def __init__(self,process_noise=0.5,measurement_noise=0.15,initial_velocity_noise=1.0,max_gap=3.0):
+    self.process_noise=process_noise                    # acceleration noise [m/s^2]
+    self.measurement_noise=measurement_noise            # standard deviation of the detected position [m]
+    self.initial_velocity_noise=initial_velocity_noise  # standard deviation of the unknown initial velocity [m/s]
+    self.max_gap=max_gap                                # the track is restarted if no detection arrived for max_gap [s]
+    self.H=np.array([[1.0,0.0,0.0,0.0],[0.0,1.0,0.0,0.0]])
+    self.R=np.eye(2)*measurement_noise*measurement_noise
+    self.reset()
+
+  def reset(self):
+    self.x=None
+    self.P=None
+    self.stamp=None
+
+  def is_initialized(self):
+    return self.x is not None
+
+  def predict_state(self,stamp):
+    # returns the (x, P) predicted to stamp without changing the filter
+    dt=max(0.0,stamp-self.stamp)
+    F=np.eye(4)
+    F[0,2]=F[1,3]=dt
+    q=self.process_noise*self.process_noise
+    Q=q*np.array([[dt**3/3.0,0.0,dt**2/2.0,0.0],
+                  [0.0,dt**3/3.0,0.0,dt**2/2.0],
+                  [dt**2/2.0,0.0,dt,0.0],
+                  [0.0,dt**2/2.0,0.0,dt]])
+    return (np.dot(F,self.x),np.dot(np.dot(F,self.P),F.T)+Q)
+
+  def update(self,x,y,stamp):
+    # integrates the detected position (x, y) of time stamp
+    if self.is_initialized()==False or stamp-self.stamp>self.max_gap:
+      self.x=np.array([x,y,0.0,0.0])
+      r=self.measurement_noise*self.measurement_noise
+      v=self.initial_velocity_noise*self.initial_velocity_noise
+      self.P=np.diag([r,r,v,v])
+      self.stamp=stamp
+      return
+    (x_pred,P_pred)=self.predict_state(stamp)
+    innovation=np.array([x,y])-np.dot(self.H,x_pred)
+    S=np.dot(np.dot(self.H,P_pred),self.H.T)+self.R
+    K=np.dot(np.dot(P_pred,self.H.T),np.linalg.inv(S))
+    self.x=x_pred+np.dot(K,innovation)
+    self.P=np.dot(np.eye(4)-np.dot(K,self.H),P_pred)
+    self.stamp=max(self.stamp,stamp)
+
+  def predict_position(self,stamp):
+    # returns the predicted position (x, y) at stamp
+    (x_pred,P_pred)=self.predict_state(stamp)
+    return (x_pred[0],x_pred[1])
+
+  def get_velocity(self):
+    return (self.x[2],self.x[3])
+
+  def predict_intercept(self,robot_x,robot_y,robot_speed,stamp,max_horizon=5.0):
+    # returns the position (x, y) where the robot, starting at stamp from (robot_x, robot_y) with robot_speed [m/s],
+    # meets the person, the prediction does not reach further than max_horizon [s]
+    t=0.0
+    for i in xrange(5):
+      (x,y)=self.predict_position(stamp+t)
+      t=min(max_horizon,math.sqrt((x-robot_x)*(x-robot_x)+(y-robot_y)*(y-robot_y))/max(robot_speed,0.01))
+    return self.predict_position(stamp+t)
@@ -3,18 +3,24 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from simple_script_server import *  # import script
 sss = simple_script_server()
+from cob_generic_states.speech_scheduler import get_speech_scheduler
+from cob_generic_states.component_interlocks import get_component_interlock
 
 class PrepareRobot(smach.State):
     def __init__(self):
         smach.State.__init__(self, 
-                             outcomes=['succeeded'])
+                             outcomes=['succeeded', 'failed'])
+    @instrumented
     def execute(self, userdata):
         sss.sleep(2) # 2 
-        sss.say("sound", ["Preparing."],False)
+        get_speech_scheduler().say(["Preparing."])
         
-        # bring robot into the starting state
+        # bring robot into the starting state after the components which are still stowed in the background have stopped
+        if not get_component_interlock().acquire(["tray", "torso", "arm", "sdh", "head"]):
+            return 'failed'
         handle_tray = sss.move("tray","down",False)
         handle_torso = sss.move("torso","home",False)
         handle_arm = sss.move("arm","look_at_table-to-folded",False)
@@ -30,6 +36,6 @@ class PrepareRobot(smach.State):
         
         
         # announce ready
-        sss.say("sound", ["Ready."])
+        get_speech_scheduler().say(["Ready."])
         return 'succeeded'
     
@@ -1,16 +1,15 @@
 #!/usr/bin/python
 
 import rospy
-import copy
 
 from simple_script_server import *  # import script
 sss = simple_script_server()
 
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 
 import tf
-import tf_conversions.posemath as pm
 
 from std_msgs.msg import *
 from std_srvs.srv import *
@@ -19,8 +18,10 @@ from geometry_msgs.msg import *
 from cob_object_detection_msgs.msg import *
 from cob_srvs.srv import *
 
-def integrate_pose(pseudo_frame_as_pose, target_pose):
-    return pm.toMsg(pm.fromMatrix( numpy.dot(pm.toMatrix(pm.fromMsg(pseudo_frame_as_pose)), pm.toMatrix(pm.fromMsg(target_pose))) ))
+from cob_generic_states.rigid_transforms import make_transform, quaternion_from_euler, transform_poses, stamp_poses
+from cob_generic_states.speech_scheduler import get_speech_scheduler
+from cob_generic_states.light_manager import get_light_manager
+from cob_generic_states.component_interlocks import get_component_interlock
 
 class PressButton(smach.State):
     def __init__(self):
@@ -42,51 +43,45 @@ class PressButton(smach.State):
         if msg.wrench.force.z >= self.wrench_touch_treshold:
             self.arm_stop_request = True
          
+    @instrumented
     def execute(self, userdata):        
-        # move in front of button (initial rotation to orient finger to button)
-        pose_offset = Pose()
-        pose_offset.position.y = -0.15 # move 0.15m in front of button
-        pose_offset.position.y += -0.20 # offset from arm_7_link to finger tip
-        [new_x, new_y, new_z, new_w] = tf.transformations.quaternion_from_euler(-1.5708, 0.0, 0.0) # rpy 
-        pose_offset.orientation.x = new_x
-        pose_offset.orientation.y = new_y
-        pose_offset.orientation.z = new_z
-        pose_offset.orientation.w = new_w
-        tmp_pose = copy.deepcopy(userdata.button.pose)
-        tmp_pose.pose = integrate_pose(tmp_pose.pose, pose_offset)
+        # wait for components which are still stowed in the background
+        if not get_component_interlock().acquire(["arm", "sdh"]):
+            return 'failed'
+
+        # offsets in button frame, all with the initial rotation to orient finger to button
+        finger_orientation = quaternion_from_euler(-1.5708, 0.0, 0.0) # rpy
+        offsets = [make_transform((0.0, -0.15 - 0.20, 0.0), finger_orientation), # move 0.15m in front of button, 0.20m offset from arm_7_link to finger tip
+                   make_transform((0.0, 0.3, 0.0), finger_orientation)] # move towards button (relative movement in button_frame)
+        [pre_button_pose, button_pose] = stamp_poses(userdata.button.pose.header, transform_poses(userdata.button.pose.pose, offsets))
+
         # pre_button_js
-        pre_button_js, error_code = sss.calculate_ik(tmp_pose)
+        pre_button_js, error_code = sss.calculate_ik(pre_button_pose)
         if(error_code.val != error_code.SUCCESS):
             if error_code.val != error_code.NO_IK_SOLUTION:
-                sss.set_light("light", 'red')
+                get_light_manager().set_light('red')
             rospy.logerr("Ik pre_button Failed")
             return 'not_pressed'
 
-        # move towards button (relative movement in button_frame)
-        pose_offset.position.y = 0.3
-        tmp_pose = copy.deepcopy(userdata.button.pose)
-        tmp_pose.pose = integrate_pose(tmp_pose.pose, pose_offset)
         # button_js
-        button_js, error_code = sss.calculate_ik(tmp_pose)
+        button_js, error_code = sss.calculate_ik(button_pose)
         if(error_code.val != error_code.SUCCESS):
             if error_code.val != error_code.NO_IK_SOLUTION:
-                sss.set_light("light", 'red')
+                get_light_manager().set_light('red')
             rospy.logerr("Ik button Failed")
             return 'not_pressed'
 
 #        # move away from button (relative movement in button_frame)
-#        pose_offset.position.y = -0.15
-#        tmp_pose = copy.deepcopy(userdata.button.pose)
-#        tmp_pose.pose = integrate_pose(tmp_pose.pose, pose_offset)
+#        post_button_pose = stamp_poses(userdata.button.pose.header, transform_poses(userdata.button.pose.pose, make_transform((0.0, -0.15, 0.0), finger_orientation)))[0]
         # post_button_js
-#        post_button_js, error_code = sss.calculate_ik(tmp_pose)
+#        post_button_js, error_code = sss.calculate_ik(post_button_pose)
 #        if(error_code.val != error_code.SUCCESS):
 #            if error_code.val != error_code.NO_IK_SOLUTION:
 #                sss.set_light("light", 'red')
 #            rospy.logerr("Ik button Failed")
 #            return 'not_pressed'
 
-        sss.say("sound", ["I am pressing a button now."])
+        get_speech_scheduler().say(["I am pressing a button now."])
         handle_arm = sss.move_planned("arm", [list(pre_button_js.position)])
         if handle_arm.get_error_code() > 0:
         	return 'not_pressed'
@@ -3,6 +3,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from cob_object_detection_msgs.msg import *
 from cob_object_detection_msgs.srv import *
 from visualization_msgs.msg import Marker
@@ -42,6 +43,7 @@ class PublishDetectedObjects(smach.State):
 		self.vis_pub.publish( marker );
 
 	
+	@instrumented
 	def execute(self,userdata):
 		#publish all detected objects
 		self.insert_detected_object(userdata.object)
@@ -14,28 +14,8 @@ class ScreenFormat:
         self.log_exit_state(self.text)
     
     def log_enter_state(self, text):
-    
-        #HEADER = '\033[95m'
-        color = '\033[94m'
-        #OKGREEN = '\033[92m'
-        #WARNING = '\033[93m'
-        #FAIL = '\033[91m'
-        #ENDC = '\033[0m'
-    
-        out_str = ''
-        for num in range(0, len(text)):
-            out_str += '-'
-    
-        rospy.loginfo('%s\n', color)
-        rospy.loginfo("%s----------------------------------------------", out_str)
-        rospy.loginfo("- ENTERING \"%s\" --------------------------------\033[0m", text)
-    
-    
+        # one log call per banner, the line of dashes is as long as the text
+        rospy.loginfo("\033[94m%s\n- ENTERING \"%s\" --------------------------------\033[0m", '-'*len(text) + '----------------------------------------------', text)
+
     def log_exit_state(self, text):
-        color = '\033[94m'
-        out_str = ''
-        for num in range(0, len(text)):
-            out_str += '-'
-        rospy.loginfo('%s', color)
-        rospy.loginfo("- LEAVING \"%s\" ---------------------------------", text)
-        rospy.loginfo("%s----------------------------------------------\n\033[0m", out_str)
+        rospy.loginfo("\033[94m- LEAVING \"%s\" ---------------------------------\n%s\033[0m", text, '-'*len(text) + '----------------------------------------------')
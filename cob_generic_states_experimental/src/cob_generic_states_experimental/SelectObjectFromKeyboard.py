@@ -3,30 +3,41 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
+
+from cob_generic_states.srv import *
+from cob_generic_states.task_queue import TaskQueue
 
 class SelectObjectFromKeyboard(smach.State):
     def __init__(self):
         smach.State.__init__(self, 
                              outcomes=['objectSelected','quit'],
                              output_keys=['object_name'])
+        self.task_queue = TaskQueue()
         rospy.Service('/trigger_new_task', TriggerTask, self.task_callback)
-        self.objectID = ""
         
     def task_callback(self, req):
-        self.objectID = req.task.data
+        self.task_queue.put(req.task.data, req.priority)
         res = TriggerTaskResponse()
+        res.success.data = True
+        res.queue_depth = self.task_queue.get_queue_depth()
         return res        
         
+    @instrumented
     def execute(self, userdata):
         # proto_objects = ['quit', 'milk', 'HohesC', 'Fanta','Pringles','salt', 'tomato_sauce', 'tomato_soup', 'zwieback']
         proto_objects = ['pringles', 'tomatosauce', 'chocolate', 'juice', 'fanta']
         print 'Please select an object:'
         for i in range(len(proto_objects)):
             print str(i) + '  ' + proto_objects[i]
-        self.objectID = ""
-        while self.objectID not in [str(i) for i in range(len(proto_objects))]:
+        print '10  quit'
+        objectID = ""
+        while objectID not in [str(i) for i in range(len(proto_objects))] + ['10']:
             #objectID = "1" #FIXME hardcoded to milk for testing
-            rospy.sleep(1)
+            objectID = self.task_queue.get()
+            if objectID == None: # shutdown
+                userdata.object_name = "quit"
+                return 'quit'
         print 'You selected #' + str(objectID)
         objectID = int(objectID)
         if objectID==10:
@@ -35,6 +35,7 @@
 import rospy
 import smach
 import smach_ros
+from cob_generic_states.state_instrumentation import instrumented
 from cob_generic_states_experimental.srv import Door
 
 class WaitForOpenElevatorDoors(smach.State):
@@ -47,6 +48,7 @@ class WaitForOpenElevatorDoors(smach.State):
       outcomes=['door_open','door_closed','failed'],
       output_keys=['base_pose']) 
 
+  @instrumented
   def execute(self, userdata):
     if self.useTeachedPoses:
       try:
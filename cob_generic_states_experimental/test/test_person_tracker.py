@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import math
+import unittest
+
+from cob_generic_states_experimental.PersonTracker import *
+
+
+class TestPersonTracker(unittest.TestCase):
+
+  def test_initialization(self):
+    tracker=PersonTracker()
+    self.assertFalse(tracker.is_initialized())
+    tracker.update(1.0,2.0,10.0)
+    self.assertTrue(tracker.is_initialized())
+    self.assertEqual(tracker.predict_position(10.0),(1.0,2.0))
+    self.assertEqual(tracker.get_velocity(),(0.0,0.0))
+
+  def test_constant_velocity(self):
+    # person walking with 0.5 m/s along x
+    tracker=PersonTracker()
+    for i in range(20):
+      t=0.2*i
+      tracker.update(0.5*t,1.0,t)
+    (vx,vy)=tracker.get_velocity()
+    self.assertAlmostEqual(vx,0.5,delta=0.05)
+    self.assertAlmostEqual(vy,0.0,delta=0.05)
+    (x,y)=tracker.predict_position(tracker.stamp+2.0)
+    self.assertAlmostEqual(x,0.5*(tracker.stamp+2.0),delta=0.15)
+    self.assertAlmostEqual(y,1.0,delta=0.05)
+
+  def test_restart_after_gap(self):
+    tracker=PersonTracker(max_gap=3.0)
+    tracker.update(0.0,0.0,0.0)
+    tracker.update(0.5,0.0,1.0)
+    tracker.update(5.0,5.0,10.0)
+    self.assertEqual(tracker.stamp,10.0)
+    self.assertEqual(tracker.predict_position(10.0),(5.0,5.0))
+    self.assertEqual(tracker.get_velocity(),(0.0,0.0))
+
+  def test_intercept(self):
+    # person walking away from the robot with 0.5 m/s, the robot drives with 1.0 m/s
+    tracker=PersonTracker()
+    for i in range(20):
+      t=0.2*i
+      tracker.update(0.5+0.5*t,0.0,t)
+    (x,y)=tracker.predict_intercept(0.0,0.0,1.0,tracker.stamp)
+    (px,py)=tracker.predict_position(tracker.stamp)
+    self.assertTrue(x>px)
+    # the robot needs about as long to reach the intercept point as the person
+    self.assertAlmostEqual(math.hypot(x,y)/1.0,(x-px)/0.5,delta=0.3)
+    # the prediction does not reach further than max_horizon
+    (x,y)=tracker.predict_intercept(0.0,0.0,0.1,tracker.stamp,max_horizon=2.0)
+    self.assertAlmostEqual(x,px+0.5*2.0,delta=0.15)
+
+
+if __name__ == '__main__':
+  import rosunit
+  rosunit.unitrun('cob_generic_states_experimental', 'test_person_tracker', TestPersonTracker)
@@ -0,0 +1,215 @@
+/*!
+*****************************************************************
+* \file
+*
+* \note
+* Copyright (c) 2013 \n
+* Fraunhofer Institute for Manufacturing Engineering
+* and Automation (IPA) \n\n
+*
+*****************************************************************
+*
+* \note
+* Project name: care-o-bot
+* \note
+* ROS stack name: cob_scenario_states
+* \note
+* ROS package name: cob_map_accessibility_analysis
+*
+* \author
+* Author: cob_scenario_states contributors
+*
+* \date Date of creation: October 2026
+*
+* \brief
+* Non-blocking output of annotated debug images: images are queued in a bounded queue (dropping the oldest one) and published or written to disk by a worker thread.
+*
+*****************************************************************
+*
+* Redistribution and use in source and binary forms, with or without
+* modification, are permitted provided that the following conditions are met:
+*
+* - Redistributions of source code must retain the above copyright
+* notice, this list of conditions and the following disclaimer. \n
+* - Redistributions in binary form must reproduce the above copyright
+* notice, this list of conditions and the following disclaimer in the
+* documentation and/or other materials provided with the distribution. \n
+* - Neither the name of the Fraunhofer Institute for Manufacturing
+* Engineering and Automation (IPA) nor the names of its
+* contributors may be used to endorse or promote products derived from
+* this software without specific prior written permission. \n
+*
+* This program is free software: you can redistribute it and/or modify
+* it under the terms of the GNU Lesser General Public License LGPL as
+* published by the Free Software Foundation, either version 3 of the
+* License, or (at your option) any later version.
+*
+* This program is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+* GNU Lesser General Public License LGPL for more details.
+*
+* You should have received a copy of the GNU Lesser General Public
+* License LGPL along with this program.
+* If not, see <http://www.gnu.org/licenses/>.
+*
+****************************************************************/
+
+
+
+
+#ifndef DEBUG_IMAGE_PUBLISHER_H
+#define DEBUG_IMAGE_PUBLISHER_H
+
+#include <string>
+#include <deque>
+#include <map>
+#include <sstream>
+
+#include <ros/ros.h>
+#include <image_transport/image_transport.h>
+
+// opencv
+#include <opencv/cv.h>
+#include <opencv/highgui.h>
+#include <cv_bridge/cv_bridge.h>
+
+#include <boost/thread.hpp>
+#include <boost/thread/mutex.hpp>
+#include <boost/thread/condition_variable.hpp>
+
+
+class DebugImagePublisher
+{
+public:
+
+	enum Mode {OFF=0, PUBLISH, DISK};
+
+	DebugImagePublisher()
+	: mode_(OFF), it_(0), queue_size_(1), sampling_step_(1), sample_counter_(0), image_counter_(0), dropped_images_(0), stop_(false)
+	{
+	}
+
+	~DebugImagePublisher()
+	{
+		stop();
+	}
+
+	// mode: "off", "publish" (images are published on debug/<name>) or "disk" (images are written as png to directory)
+	// queue_size: maximum number of pending images, the oldest image is dropped if the queue is full
+	// sampling_step: only every sampling_step-th request produces a debug image
+	void init(image_transport::ImageTransport* it, const std::string& mode, const int queue_size, const int sampling_step, const std::string& directory)
+	{
+		it_ = it;
+		queue_size_ = std::max(1, queue_size);
+		sampling_step_ = std::max(1, sampling_step);
+		directory_ = directory;
+		if (mode == "publish")
+			mode_ = PUBLISH;
+		else if (mode == "disk")
+			mode_ = DISK;
+		else
+		{
+			if (mode != "off")
+				ROS_WARN("DebugImagePublisher: unknown debug image mode '%s', debug images are switched off.", mode.c_str());
+			mode_ = OFF;
+		}
+		if (mode_ != OFF)
+			worker_ = boost::thread(boost::bind(&DebugImagePublisher::run, this));
+	}
+
+	// returns true if the current request shall produce a debug image (call once per request before drawing)
+	bool sample()
+	{
+		if (mode_ == OFF)
+			return false;
+		boost::mutex::scoped_lock lock(mutex_);
+		return (sample_counter_++ % sampling_step_) == 0;
+	}
+
+	// queues the image for output without blocking, the caller must not modify image afterwards
+	void push(const std::string& name, const cv::Mat& image)
+	{
+		if (mode_ == OFF)
+			return;
+		{
+			boost::mutex::scoped_lock lock(mutex_);
+			if ((int)queue_.size() >= queue_size_)
+			{
+				queue_.pop_front();
+				++dropped_images_;
+				ROS_DEBUG("DebugImagePublisher: queue full, dropped %lu images so far.", dropped_images_);
+			}
+			queue_.push_back(std::make_pair(name, image));
+		}
+		condition_.notify_one();
+	}
+
+	// stops the worker thread, pending images are discarded
+	void stop()
+	{
+		{
+			boost::mutex::scoped_lock lock(mutex_);
+			stop_ = true;
+		}
+		condition_.notify_all();
+		if (worker_.joinable())
+			worker_.join();
+	}
+
+protected:
+
+	void run()
+	{
+		while (true)
+		{
+			std::pair<std::string, cv::Mat> item;
+			{
+				boost::mutex::scoped_lock lock(mutex_);
+				while (queue_.empty() == true && stop_ == false)
+					condition_.wait(lock);
+				if (stop_ == true)
+					return;
+				item = queue_.front();
+				queue_.pop_front();
+			}
+
+			if (mode_ == PUBLISH)
+			{
+				std::map<std::string, image_transport::Publisher>::iterator publisher = publishers_.find(item.first);
+				if (publisher == publishers_.end())
+					publisher = publishers_.insert(std::make_pair(item.first, it_->advertise("debug/" + item.first, 1, true))).first;
+				cv_bridge::CvImage cv_image;
+				cv_image.header.stamp = ros::Time::now();
+				cv_image.image = item.second;
+				cv_image.encoding = "mono8";
+				publisher->second.publish(cv_image.toImageMsg());
+			}
+			else if (mode_ == DISK)
+			{
+				std::stringstream filename;
+				filename << directory_ << "/" << item.first << "_" << image_counter_++ << ".png";
+				if (cv::imwrite(filename.str(), item.second) == false)
+					ROS_WARN("DebugImagePublisher: could not write %s.", filename.str().c_str());
+			}
+		}
+	}
+
+	Mode mode_;
+	image_transport::ImageTransport* it_;
+	std::map<std::string, image_transport::Publisher> publishers_;	// one publisher per image name, only used by the worker thread
+	std::string directory_;
+	int queue_size_;
+	int sampling_step_;
+	unsigned long sample_counter_;
+	unsigned long image_counter_;
+	unsigned long dropped_images_;
+
+	std::deque< std::pair<std::string, cv::Mat> > queue_;
+	bool stop_;
+	boost::mutex mutex_;
+	boost::condition_variable condition_;
+	boost::thread worker_;
+};
+
+#endif	//DEBUG_IMAGE_PUBLISHER_H
@@ -64,6 +64,8 @@
 #include <iostream>
 #include <string>
 #include <vector>
+#include <limits>
+#include <algorithm>
 #include <math.h>
 
 #include <ros/ros.h>
@@ -73,6 +75,7 @@
 #include <geometry_msgs/Point.h>
 #include <geometry_msgs/Pose2D.h>
 #include <nav_msgs/GridCells.h>
+#include <std_msgs/UInt32.h>
 
 #include <image_transport/image_transport.h>
 
@@ -86,6 +89,8 @@
 #include <cob_map_accessibility_analysis/CheckPointAccessibility.h>
 #include <cob_map_accessibility_analysis/CheckPerimeterAccessibility.h>
 #include <cob_3d_mapping_msgs/GetApproachPoseForPolygon.h>
+#include <cob_map_accessibility_analysis/shared_map_writer.h>
+#include <cob_map_accessibility_analysis/debug_image_publisher.h>
 
 // opencv
 #include <opencv/cv.h>
@@ -98,6 +103,8 @@
 #include <pcl/point_types.h>
 
 #include <boost/thread/mutex.hpp>
+#include <boost/thread/shared_mutex.hpp>
+#include <boost/thread/locks.hpp>
 #include <boost/shared_ptr.hpp>
 #include <boost/tokenizer.hpp>
 #include <boost/foreach.hpp>
@@ -110,6 +117,9 @@ public:
 	MapAccessibilityAnalysis(ros::NodeHandle nh);
 	~MapAccessibilityAnalysis();
 
+	// number of threads that shall serve the callbacks of this node
+	int getNumberServiceThreads() const;
+
 protected:
 
 	struct Pose
@@ -133,6 +143,38 @@ protected:
 	    }
 	};
 
+	// immutable snapshot of the inflated map: service callbacks keep a reference to the snapshot they started with,
+	// while map updates replace the whole snapshot (copy-on-write)
+	struct AccessibilityMap
+	{
+		cv::Mat inflated_map;				// contains inflated static and dynamic obstacles, must not be modified once the snapshot is shared
+		std::vector<cv::Mat> pyramid;		// multi-resolution accessibility pyramid of inflated_map (level 0 = inflated_map)
+
+		AccessibilityMap()
+		: area_contours_computed_(false)
+		{
+		}
+
+		// returns the contours of the individual connected areas of inflated_map, they are computed on first use only
+		const std::vector< std::vector<cv::Point> >& getAreaContours()
+		{
+			boost::mutex::scoped_lock lock(mutex_area_contours_);
+			if (area_contours_computed_ == false)
+			{
+				cv::Mat inflated_map_copy = inflated_map.clone();
+				cv::findContours(inflated_map_copy, area_contours_, CV_RETR_LIST, CV_CHAIN_APPROX_SIMPLE);
+				area_contours_computed_ = true;
+			}
+			return area_contours_;
+		}
+
+	protected:
+		boost::mutex mutex_area_contours_;
+		bool area_contours_computed_;
+		std::vector< std::vector<cv::Point> > area_contours_;		// first index=contour index;  second index=point index within contour
+	};
+	typedef boost::shared_ptr<AccessibilityMap> AccessibilityMapPtr;
+
 	// reads out the robot footprint from a string or array
 	std::vector<geometry_msgs::Point> loadRobotFootprint(XmlRpc::XmlRpcValue& footprint_list);
 
@@ -163,14 +205,29 @@ protected:
 	// callback for service checking the accessibility of a perimeter around a polygon
 	bool checkPolygonCallback(cob_3d_mapping_msgs::GetApproachPoseForPolygon::Request& req, cob_3d_mapping_msgs::GetApproachPoseForPolygon::Response& res);
 
+	// returns the current snapshot of the inflated map
+	AccessibilityMapPtr getAccessibilityMap();
+
+	// replaces the current snapshot by a new one made of inflated_map and publishes the new map version, nothing happens if inflated_map equals the current map
+	// (the caller has to hold mutex_map_update_ and must not modify inflated_map afterwards)
+	void setAccessibilityMap(const cv::Mat& inflated_map);
+
 	// reads the robot coordinates from tf
 	cv::Point getRobotLocationInPixelCoordinates();
 
 	// this function computes whether a given point (potentialApproachPose) is accessible by the robot at location robotLocation
-	bool isApproachPositionAccessible(const cv::Point& robotLocation, const cv::Point& potentialApproachPose, std::vector< std::vector<cv::Point> > contours);
+	bool isApproachPositionAccessible(const cv::Point& robotLocation, const cv::Point& potentialApproachPose, const std::vector< std::vector<cv::Point> >& contours);
+
+	// pose_p and closest_point_on_polygon in pixel coordinates! Only the region of interest roi of map_with_polygon is searched.
+	void computeClosestPointOnPolygon(const cv::Mat& map_with_polygon, const cv::Rect& roi, const Pose& pose_p, Pose& closest_point_on_polygon);
 
-	// pose_p and closest_point_on_polygon in pixel coordinates!
-	void computeClosestPointOnPolygon(const cv::Mat& map_with_polygon, const Pose& pose_p, Pose& closest_point_on_polygon);
+	// computes the accessibility pyramid of map: level 0 is map itself, each cell of level i is the maximum of the respective 2x2 cells in level i-1,
+	// i.e. a cell is 0 (blocked) only if all pixels of the covered 2^i x 2^i block are blocked (min-pooling of the occupancy)
+	void computeAccessibilityPyramid(const cv::Mat& map, std::vector<cv::Mat>& pyramid);
+
+	// returns the number of consecutive perimeter samples starting at pixel coordinates (u,v) that surely lie inside a blocked cell of the pyramid,
+	// when neighboring samples are at most sample_distance pixels apart (0 if (u,v) is not inside a blocked coarse cell)
+	int getNumberOfBlockedSamples(const std::vector<cv::Mat>& pyramid, const double u, const double v, const double sample_distance);
 
 	template <class T>
 	T convertFromMeterToPixelCoordinates(const Pose& pose);
@@ -185,7 +242,12 @@ protected:
 
 	image_transport::ImageTransport* it_;
 	image_transport::Publisher inflated_map_image_pub_;
+	DebugImagePublisher debug_image_publisher_;	// non-blocking output of annotated debug images of the service requests
 	bool publish_inflated_map_;
+	ros::Publisher map_version_pub_;	// publishes the version of the accessibility map whenever it changes (latched), clients may cache results per version
+	unsigned int map_version_;			// number of accessibility map changes
+	bool export_shared_map_;			// if true, the inflated map is written into a shared memory segment on every update
+	SharedMapWriter shared_map_writer_;	// writes the inflated map into the shared memory segment
 	message_filters::Subscriber<nav_msgs::GridCells> obstacles_sub_;
 	message_filters::Subscriber<nav_msgs::GridCells> inflated_obstacles_sub_;
 	typedef message_filters::sync_policies::ApproximateTime<nav_msgs::GridCells, nav_msgs::GridCells> InflatedObstaclesSyncPolicy;
@@ -203,9 +265,13 @@ protected:
 	// maps
 	cv::Mat original_map_;
 	cv::Mat inflated_original_map_;		// contains only the inflated static obstacles
-	cv::Mat inflated_map_;				// contains inflated static and dynamic obstacles
+	AccessibilityMapPtr accessibility_map_;		// contains inflated static and dynamic obstacles
+	int accessibility_pyramid_levels_;	// number of coarse levels of the accessibility pyramid (0 = no coarse-to-fine search)
+
+	boost::shared_mutex mutex_accessibility_map_;	// readers copy accessibility_map_ under a shared lock, map updates only swap it under an exclusive lock
+	boost::mutex mutex_map_update_;					// serializes the map updates
 
-	boost::mutex mutex_inflated_map_;		// mutex for access on inflated_map
+	int number_service_threads_;		// number of threads serving the callbacks in parallel
 
 	// map properties
 	double map_resolution_; // in [m/cell]
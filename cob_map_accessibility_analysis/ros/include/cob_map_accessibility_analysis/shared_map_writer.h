@@ -0,0 +1,221 @@
+/*!
+*****************************************************************
+* \file
+*
+* \note
+* Copyright (c) 2013 \n
+* Fraunhofer Institute for Manufacturing Engineering
+* and Automation (IPA) \n\n
+*
+*****************************************************************
+*
+* \note
+* Project name: care-o-bot
+* \note
+* ROS stack name: cob_scenario_states
+* \note
+* ROS package name: cob_map_accessibility_analysis
+*
+* \author
+* Author: cob_scenario_states contributors
+*
+* \date Date of creation: October 2026
+*
+* \brief
+* Exports the inflated map into a POSIX shared memory segment, which can be mapped read-only by other processes on the same machine (see shared_map.py).
+*
+*****************************************************************
+*
+* Redistribution and use in source and binary forms, with or without
+* modification, are permitted provided that the following conditions are met:
+*
+* - Redistributions of source code must retain the above copyright
+* notice, this list of conditions and the following disclaimer. \n
+* - Redistributions in binary form must reproduce the above copyright
+* notice, this list of conditions and the following disclaimer in the
+* documentation and/or other materials provided with the distribution. \n
+* - Neither the name of the Fraunhofer Institute for Manufacturing
+* Engineering and Automation (IPA) nor the names of its
+* contributors may be used to endorse or promote products derived from
+* this software without specific prior written permission. \n
+*
+* This program is free software: you can redistribute it and/or modify
+* it under the terms of the GNU Lesser General Public License LGPL as
+* published by the Free Software Foundation, either version 3 of the
+* License, or (at your option) any later version.
+*
+* This program is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+* GNU Lesser General Public License LGPL for more details.
+*
+* You should have received a copy of the GNU Lesser General Public
+* License LGPL along with this program.
+* If not, see <http://www.gnu.org/licenses/>.
+*
+****************************************************************/
+
+
+
+
+#ifndef SHARED_MAP_WRITER_H
+#define SHARED_MAP_WRITER_H
+
+#include <string>
+#include <cstring>
+#include <stdint.h>
+
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+#include <ros/ros.h>
+
+#include <opencv/cv.h>
+
+
+// Memory layout of the shared map segment (keep in sync with cob_map_accessibility_analysis/shared_map.py):
+// a header of SHARED_MAP_DATA_OFFSET bytes followed by height*step bytes of map data (CV_8UC1, 255=accessible, 0=blocked).
+// The header is protected by a seqlock: sequence is odd while the segment is written or resized, readers have to retry if
+// sequence was odd or has changed while they were reading. The segment only grows, so that memory mapped by a reader
+// never disappears, i.e. it may be larger than required by the current map.
+struct SharedMapHeader
+{
+	uint32_t magic;				// SHARED_MAP_MAGIC
+	uint32_t layout_version;	// SHARED_MAP_LAYOUT_VERSION
+	uint32_t sequence;			// seqlock counter
+	uint32_t width;				// in [cell]
+	uint32_t height;			// in [cell]
+	uint32_t step;				// in [byte] per row
+	double resolution;			// in [m/cell]
+	double origin_x;			// in [m]
+	double origin_y;			// in [m]
+	uint64_t map_version;		// number of completed map updates
+};
+
+static const uint32_t SHARED_MAP_MAGIC = 0x4d424f43;	// "COBM"
+static const uint32_t SHARED_MAP_LAYOUT_VERSION = 1;
+static const size_t SHARED_MAP_DATA_OFFSET = 64;
+
+
+class SharedMapWriter
+{
+public:
+	SharedMapWriter()
+	: fd_(-1), memory_(0), size_(0), map_version_(0)
+	{
+	}
+
+	~SharedMapWriter()
+	{
+		close();
+	}
+
+	// creates (or opens) the shared memory segment with the given name, e.g. "/cob_inflated_map"
+	bool open(const std::string& name)
+	{
+		close();
+		name_ = name;
+		fd_ = shm_open(name_.c_str(), O_CREAT | O_RDWR, S_IRUSR | S_IWUSR | S_IRGRP | S_IROTH);
+		if (fd_ < 0)
+		{
+			ROS_ERROR("SharedMapWriter: could not open shared memory segment %s.", name_.c_str());
+			return false;
+		}
+		return true;
+	}
+
+	// writes map into the shared memory segment, the segment is resized if the map size has changed
+	bool write(const cv::Mat& map, const double resolution, const cv::Point2d& origin)
+	{
+		if (fd_ < 0 || map.type() != CV_8UC1)
+			return false;
+
+		const size_t size = SHARED_MAP_DATA_OFFSET + map.rows*map.cols;
+		if (memory_ != 0)
+			beginWrite();
+		if (size > size_ && resize(size) == false)
+			return false;
+
+		SharedMapHeader* header = (SharedMapHeader*)memory_;
+		volatile uint32_t* sequence = &header->sequence;
+		beginWrite();
+
+		header->magic = SHARED_MAP_MAGIC;
+		header->layout_version = SHARED_MAP_LAYOUT_VERSION;
+		header->width = map.cols;
+		header->height = map.rows;
+		header->step = map.cols;
+		header->resolution = resolution;
+		header->origin_x = origin.x;
+		header->origin_y = origin.y;
+		header->map_version = ++map_version_;
+		unsigned char* data = (unsigned char*)memory_ + SHARED_MAP_DATA_OFFSET;
+		for (int v=0; v<map.rows; ++v)
+			memcpy(data + v*map.cols, map.ptr<unsigned char>(v), map.cols);
+
+		__sync_synchronize();
+		*sequence = *sequence + 1;		// even: consistent
+		return true;
+	}
+
+	void close()
+	{
+		if (memory_ != 0)
+			munmap(memory_, size_);
+		memory_ = 0;
+		size_ = 0;
+		if (fd_ >= 0)
+		{
+			::close(fd_);
+			shm_unlink(name_.c_str());
+		}
+		fd_ = -1;
+	}
+
+protected:
+
+	// makes the seqlock counter odd (writing) if it is not odd already
+	void beginWrite()
+	{
+		volatile uint32_t* sequence = &((SharedMapHeader*)memory_)->sequence;
+		if (*sequence % 2 == 0)
+			*sequence = *sequence + 1;
+		__sync_synchronize();
+	}
+
+	// grows the segment to at least size bytes, the segment is never shrunk because readers may still map its end
+	bool resize(size_t size)
+	{
+		if (memory_ != 0)
+			munmap(memory_, size_);
+		memory_ = 0;
+		size_ = 0;
+		struct stat segment_stat;
+		if (fstat(fd_, &segment_stat) == 0 && (size_t)segment_stat.st_size > size)
+			size = segment_stat.st_size;
+		if (ftruncate(fd_, size) != 0)
+		{
+			ROS_ERROR("SharedMapWriter: could not resize shared memory segment %s to %lu bytes.", name_.c_str(), (unsigned long)size);
+			return false;
+		}
+		void* memory = mmap(0, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd_, 0);
+		if (memory == MAP_FAILED)
+		{
+			ROS_ERROR("SharedMapWriter: could not map shared memory segment %s.", name_.c_str());
+			return false;
+		}
+		memory_ = memory;
+		size_ = size;
+		return true;
+	}
+
+	std::string name_;
+	int fd_;
+	void* memory_;
+	size_t size_;
+	uint64_t map_version_;
+};
+
+#endif	//SHARED_MAP_WRITER_H
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+# Benchmark for the services of map_accessibility_analysis_server on synthetic maps.
+#
+# For every combination of map size, clutter level and approach_path_accessibility_check a fresh server is launched on a
+# synthetic occupancy grid (the server reads the map only once at startup). The point, perimeter and polygon services are
+# timed and the statistics are written as JSON to ~output_file, so that runs can be compared for regressions.
+#
+# usage (with a running roscore):
+#   rosrun cob_map_accessibility_analysis benchmark_map_accessibility_analysis.py _output_file:=/tmp/benchmark.json
+
+import rospy
+import roslaunch
+import json
+import math
+import random
+import time
+import socket
+
+from nav_msgs.msg import OccupancyGrid
+from geometry_msgs.msg import Pose2D
+from sensor_msgs.msg import PointField
+import sensor_msgs.point_cloud2 as point_cloud2
+from cob_3d_mapping_msgs.msg import Shape
+from cob_3d_mapping_msgs.srv import GetApproachPoseForPolygon, GetApproachPoseForPolygonRequest
+from cob_map_accessibility_analysis.srv import CheckPointAccessibility, CheckPointAccessibilityRequest
+from cob_map_accessibility_analysis.srv import CheckPerimeterAccessibility, CheckPerimeterAccessibilityRequest
+
+
+def create_synthetic_map(size, clutter, resolution, seed=0):
+  # square occupancy grid of size x size cells with outer walls and random rectangular obstacles covering approximately
+  # the fraction clutter of the map; the center (robot position) is kept free
+  rnd = random.Random(seed)
+  data = [0] * (size*size)
+  for i in xrange(size):
+    data[i] = data[(size-1)*size+i] = data[i*size] = data[i*size+size-1] = 100
+  occupied = 0
+  center = size/2
+  free_radius = max(2, int(1.0/resolution))
+  while occupied < clutter*size*size:
+    w = rnd.randint(2, max(3, size/20))
+    h = rnd.randint(2, max(3, size/20))
+    u0 = rnd.randint(1, size-w-1)
+    v0 = rnd.randint(1, size-h-1)
+    if abs(u0+w/2-center) < free_radius+w and abs(v0+h/2-center) < free_radius+h:
+      continue
+    for v in xrange(v0, v0+h):
+      for u in xrange(u0, u0+w):
+        if data[v*size+u] == 0:
+          data[v*size+u] = 100
+          occupied += 1
+
+  grid = OccupancyGrid()
+  grid.header.frame_id = "/map"
+  grid.header.stamp = rospy.Time.now()
+  grid.info.resolution = resolution
+  grid.info.width = size
+  grid.info.height = size
+  grid.info.origin.position.x = -0.5*size*resolution
+  grid.info.origin.position.y = -0.5*size*resolution
+  grid.info.origin.orientation.w = 1.0
+  grid.data = data
+  return grid
+
+
+def create_polygon(x, y, half_size):
+  shape = Shape()
+  fields = [PointField("x", 0, PointField.FLOAT32, 1), PointField("y", 4, PointField.FLOAT32, 1), PointField("z", 8, PointField.FLOAT32, 1)]
+  points = [(x-half_size, y-half_size, 0.0), (x+half_size, y-half_size, 0.0), (x+half_size, y+half_size, 0.0), (x-half_size, y+half_size, 0.0)]
+  shape.points.append(point_cloud2.create_cloud(shape.header, fields, points))
+  shape.holes.append(False)
+  return shape
+
+
+def compute_statistics(durations):
+  durations = sorted(durations)
+  n = len(durations)
+  if n == 0:
+    return {}
+  return {"repetitions": n,
+          "min": durations[0],
+          "median": durations[n/2],
+          "p90": durations[min(n-1, int(math.ceil(0.9*n))-1)],
+          "max": durations[-1],
+          "mean": sum(durations)/float(n)}
+
+
+def time_service(service, requests):
+  durations = []
+  for req in requests:
+    start = time.time()
+    try:
+      service(req)
+    except rospy.ServiceException, e:
+      rospy.logerr("Service call failed: %s"%e)
+      continue
+    durations.append(time.time()-start)
+  return durations
+
+
+class MapAccessibilityBenchmark():
+
+  def __init__(self):
+    self.map_sizes = rospy.get_param("~map_sizes", [200, 400, 800, 1600])          # in [cell]
+    self.clutter_levels = rospy.get_param("~clutter_levels", [0.05, 0.2])           # fraction of occupied cells
+    self.resolution = rospy.get_param("~resolution", 0.05)                           # in [m/cell]
+    self.repetitions = rospy.get_param("~repetitions", 20)
+    self.points_per_request = rospy.get_param("~points_per_request", 10)
+    self.rotational_sampling_step = rospy.get_param("~rotational_sampling_step", 10.0/180.0*math.pi)
+    self.output_file = rospy.get_param("~output_file", "map_accessibility_benchmark.json")
+    self.service_timeout = rospy.get_param("~service_timeout", 60.0)
+    self.map_pub = rospy.Publisher("/map_accessibility_benchmark/map", OccupancyGrid, queue_size=1, latch=True)
+
+    self.launch = roslaunch.scriptapi.ROSLaunch()
+    self.launch.start()
+    # the robot stands in the center of every synthetic map
+    self.launch.launch(roslaunch.core.Node("tf", "static_transform_publisher", name="map_accessibility_benchmark_tf",
+        args="0 0 0 0 0 0 /map /base_link 100"))
+
+  def run(self):
+    results = []
+    run_index = 0
+    for size in self.map_sizes:
+      for clutter in self.clutter_levels:
+        grid = create_synthetic_map(size, clutter, self.resolution, seed=size)
+        for approach_path_accessibility_check in [False, True]:
+          namespace = "/map_accessibility_benchmark/run_%d"%run_index
+          run_index += 1
+          rospy.loginfo("Benchmarking map size %d, clutter %.2f, approach_path_accessibility_check=%s", size, clutter, approach_path_accessibility_check)
+          results.extend(self.run_configuration(namespace, grid, clutter, approach_path_accessibility_check))
+          if rospy.is_shutdown():
+            return results
+    return results
+
+  def run_configuration(self, namespace, grid, clutter, approach_path_accessibility_check):
+    rospy.set_param(namespace+"/approach_path_accessibility_check", approach_path_accessibility_check)
+    rospy.set_param(namespace+"/publish_inflated_map", False)
+    self.map_pub.publish(grid)
+    node = roslaunch.core.Node("cob_map_accessibility_analysis", "map_accessibility_analysis_server", name="map_accessibility_analysis",
+        namespace=namespace, remap_args=[("map", "/map_accessibility_benchmark/map"), ("obstacles", "/map_accessibility_benchmark/obstacles")])
+    process = self.launch.launch(node)
+    results = []
+    try:
+      # the services are advertised after the map has been processed
+      start = time.time()
+      for service_name in ["map_points_accessibility_check", "map_perimeter_accessibility_check", "map_polygon_accessibility_check"]:
+        rospy.wait_for_service(namespace+"/"+service_name, self.service_timeout)
+      startup_duration = time.time()-start
+
+      extent = 0.5*grid.info.width*grid.info.resolution
+      rnd = random.Random(grid.info.width)
+      def random_pose():
+        return Pose2D(rnd.uniform(-0.9*extent, 0.9*extent), rnd.uniform(-0.9*extent, 0.9*extent), rnd.uniform(-math.pi, math.pi))
+
+      point_requests = []
+      perimeter_requests = []
+      polygon_requests = []
+      for i in xrange(self.repetitions):
+        point_requests.append(CheckPointAccessibilityRequest(points_to_check=[random_pose() for j in xrange(self.points_per_request)],
+            approach_path_accessibility_check=approach_path_accessibility_check))
+        perimeter_requests.append(CheckPerimeterAccessibilityRequest(center=random_pose(), radius=rnd.uniform(0.3, 1.5),
+            rotational_sampling_step=self.rotational_sampling_step))
+        center = random_pose()
+        polygon_requests.append(GetApproachPoseForPolygonRequest(polygon=create_polygon(center.x, center.y, rnd.uniform(0.3, 1.0))))
+
+      services = [("map_points_accessibility_check", CheckPointAccessibility, point_requests),
+                  ("map_perimeter_accessibility_check", CheckPerimeterAccessibility, perimeter_requests),
+                  ("map_polygon_accessibility_check", GetApproachPoseForPolygon, polygon_requests)]
+      for (service_name, service_class, requests) in services:
+        service = rospy.ServiceProxy(namespace+"/"+service_name, service_class, persistent=True)
+        durations = time_service(service, requests)
+        service.close()
+        result = {"service": service_name,
+                  "map_width": grid.info.width,
+                  "map_height": grid.info.height,
+                  "map_resolution": grid.info.resolution,
+                  "clutter": clutter,
+                  "approach_path_accessibility_check": approach_path_accessibility_check,
+                  "server_startup": startup_duration,
+                  "failed_calls": len(requests)-len(durations)}
+        result.update(compute_statistics(durations))
+        results.append(result)
+        rospy.loginfo("  %s: median %.4f s, max %.4f s", service_name, result.get("median", -1.0), result.get("max", -1.0))
+    except rospy.ROSException, e:
+      rospy.logerr("Benchmark run in %s failed: %s", namespace, e)
+    finally:
+      process.stop()
+      rospy.delete_param(namespace)
+    return results
+
+  def write_report(self, results):
+    report = {"host": socket.gethostname(),
+              "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "parameters": {"map_sizes": self.map_sizes,
+                             "clutter_levels": self.clutter_levels,
+                             "resolution": self.resolution,
+                             "repetitions": self.repetitions,
+                             "points_per_request": self.points_per_request,
+                             "rotational_sampling_step": self.rotational_sampling_step},
+              "results": results}
+    with open(self.output_file, "w") as f:
+      json.dump(report, f, indent=2, sort_keys=True)
+    rospy.loginfo("Benchmark report written to %s", self.output_file)
+
+
+if __name__ == "__main__":
+
+  rospy.init_node("map_accessibility_benchmark")
+  benchmark = MapAccessibilityBenchmark()
+  try:
+    results = benchmark.run()
+    benchmark.write_report(results)
+  finally:
+    benchmark.launch.stop()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+import os
+import mmap
+import struct
+import time
+
+import numpy
+
+
+# memory layout of the shared map segment written by map_accessibility_analysis_server
+# (keep in sync with ros/include/cob_map_accessibility_analysis/shared_map_writer.h)
+SHARED_MAP_MAGIC = 0x4d424f43          # "COBM"
+SHARED_MAP_LAYOUT_VERSION = 1
+SHARED_MAP_DATA_OFFSET = 64
+SHARED_MAP_HEADER_FORMAT = "<6I3dQ"    # magic, layout_version, sequence, width, height, step, resolution, origin_x, origin_y, map_version
+SHARED_MAP_SEQUENCE_OFFSET = 8
+
+
+class SharedInflatedMap():
+  """Read-only, zero-copy access to the inflated map exported by map_accessibility_analysis_server with export_shared_map=true.
+
+  The map is a uint8 array (255=accessible, 0=blocked) indexed as [v,u] = [(y-origin_y)/resolution, (x-origin_x)/resolution].
+  The segment is protected by a seqlock: arrays returned by view() are only valid while is_consistent(sequence) holds,
+  use snapshot() to obtain a consistent copy. Before every read the mapping is checked against the size of the segment and
+  remapped if the segment has grown or has been recreated by a restarted server. Mappings are never closed explicitly,
+  they are released when the last array viewing them has been garbage collected.
+  """
+
+  def __init__(self, name="/cob_inflated_map", shm_directory="/dev/shm"):
+    self.path = os.path.join(shm_directory, name.lstrip("/"))
+    self.file = None
+    self.memory = None
+    self.inode = None
+    self.header = None
+
+  def open(self):
+    # returns False as long as the server has not exported a map yet
+    self.close()
+    try:
+      self.file = open(self.path, "rb")
+    except IOError:
+      return False
+    segment_stat = os.fstat(self.file.fileno())
+    if segment_stat.st_size < SHARED_MAP_DATA_OFFSET:
+      self.close()
+      return False
+    self.memory = mmap.mmap(self.file.fileno(), segment_stat.st_size, access=mmap.ACCESS_READ)
+    self.inode = segment_stat.st_ino
+    return True
+
+  def close(self):
+    # the mapping itself is not closed, numpy arrays returned by view() may still refer to it
+    if self.file != None:
+      self.file.close()
+    self.memory = None
+    self.file = None
+    self.inode = None
+
+  def _revalidate(self):
+    # (re)maps the segment if it is not mapped yet, has been resized or has been recreated, returns False if it is not available
+    if self.memory == None:
+      return self.open()
+    try:
+      path_stat = os.stat(self.path)
+    except OSError:
+      # the server has been shut down, the old segment stays readable until it is closed
+      return True
+    if path_stat.st_ino != self.inode or os.fstat(self.file.fileno()).st_size != len(self.memory):
+      return self.open()
+    return True
+
+  def sequence(self):
+    return struct.unpack_from("<I", self.memory, SHARED_MAP_SEQUENCE_OFFSET)[0]
+
+  def is_consistent(self, sequence):
+    # True if the segment has not been written since sequence was obtained
+    return sequence % 2 == 0 and self.sequence() == sequence
+
+  def view(self, timeout=1.0):
+    # returns (sequence, header, map) with map being a read-only numpy view on the shared memory, or (None, None, None)
+    deadline = time.time() + timeout
+    while True:
+      if not self._revalidate():
+        return (None, None, None)
+      sequence = self.sequence()
+      if sequence % 2 == 0:
+        header = self._read_header()
+        if header != None and self.is_consistent(sequence) and SHARED_MAP_DATA_OFFSET + header["height"]*header["step"] <= len(self.memory):
+          data = numpy.frombuffer(self.memory, dtype=numpy.uint8, count=header["height"]*header["step"], offset=SHARED_MAP_DATA_OFFSET)
+          self.header = header
+          return (sequence, header, data.reshape(header["height"], header["step"])[:, :header["width"]])
+      if time.time() > deadline:
+        return (None, None, None)
+      time.sleep(0.001)
+
+  def snapshot(self, timeout=1.0):
+    # returns (header, map) with map being a consistent copy of the shared map, or (None, None)
+    deadline = time.time() + timeout
+    while time.time() <= deadline:
+      (sequence, header, data) = self.view(timeout=max(0.0, deadline-time.time()))
+      if sequence == None:
+        break
+      data = data.copy()
+      if self.is_consistent(sequence):
+        return (header, data)
+    return (None, None)
+
+  def is_accessible(self, x, y, timeout=1.0):
+    # checks a single position in [m] without copying the map, returns None if no consistent map is available
+    deadline = time.time() + timeout
+    while time.time() <= deadline:
+      (sequence, header, data) = self.view(timeout=max(0.0, deadline-time.time()))
+      if sequence == None:
+        break
+      u = int((x-header["origin_x"])/header["resolution"])
+      v = int((y-header["origin_y"])/header["resolution"])
+      accessible = (0 <= u < header["width"] and 0 <= v < header["height"] and data[v, u] == 255)
+      if self.is_consistent(sequence):
+        return accessible
+    return None
+
+  def _read_header(self):
+    (magic, layout_version, sequence, width, height, step, resolution, origin_x, origin_y, map_version) = struct.unpack_from(SHARED_MAP_HEADER_FORMAT, self.memory, 0)
+    if magic != SHARED_MAP_MAGIC or layout_version != SHARED_MAP_LAYOUT_VERSION:
+      return None
+    return {"width": width, "height": height, "step": step, "resolution": resolution,
+            "origin_x": origin_x, "origin_y": origin_y, "map_version": map_version}
@@ -61,8 +61,6 @@
 #include <cob_map_accessibility_analysis/map_accessibility_analysis_server.h>
 #include <pcl_ros/point_cloud.h>
 
-//#define __DEBUG_DISPLAYS__
-
 MapAccessibilityAnalysis::MapAccessibilityAnalysis(ros::NodeHandle nh)
 : node_handle_(nh)
 {
@@ -81,6 +79,17 @@ MapAccessibilityAnalysis::MapAccessibilityAnalysis(ros::NodeHandle nh)
 	last_update_time_obstacles_ = ros::Time::now();
 	node_handle_.param("publish_inflated_map", publish_inflated_map_, false);
 	std::cout << "publish_inflated_map = " << publish_inflated_map_ << std::endl;
+	node_handle_.param("accessibility_pyramid_levels", accessibility_pyramid_levels_, 4);
+	std::cout << "accessibility_pyramid_levels = " << accessibility_pyramid_levels_ << std::endl;
+	node_handle_.param("number_service_threads", number_service_threads_, 4);
+	std::cout << "number_service_threads = " << number_service_threads_ << std::endl;
+	node_handle_.param("export_shared_map", export_shared_map_, false);
+	std::cout << "export_shared_map = " << export_shared_map_ << std::endl;
+	std::string shared_map_name;
+	node_handle_.param<std::string>("shared_map_name", shared_map_name, "/cob_inflated_map");
+	std::cout << "shared_map_name = " << shared_map_name << std::endl;
+	if (export_shared_map_ == true)
+		export_shared_map_ = shared_map_writer_.open(shared_map_name);
 	robot_radius_=0.;
 	if (node_handle_.hasParam("/local_costmap_node/costmap/footprint"))
 	{
@@ -105,6 +114,10 @@ MapAccessibilityAnalysis::MapAccessibilityAnalysis(ros::NodeHandle nh)
 	robot_radius_ = 0.35;
 	std::cout << "robot_radius = " << robot_radius_ << std::endl;
 
+	// the map version is increased with every change of the accessibility map
+	map_version_ = 0;
+	map_version_pub_ = node_handle_.advertise<std_msgs::UInt32>("map_version", 1, true);
+
 	// receive ground floor map once
 	mapInit(node_handle_);
 
@@ -116,6 +129,20 @@ MapAccessibilityAnalysis::MapAccessibilityAnalysis(ros::NodeHandle nh)
 	it_ = new image_transport::ImageTransport(node_handle_);
 	inflated_map_image_pub_ = it_->advertise("inflated_map", 1);
 
+	// debug images are published or stored by a worker thread, so that the service callbacks never block on them
+	std::string debug_images;
+	node_handle_.param<std::string>("debug_images", debug_images, "off");
+	std::cout << "debug_images = " << debug_images << std::endl;
+	int debug_image_queue_size, debug_image_sampling_step;
+	node_handle_.param("debug_image_queue_size", debug_image_queue_size, 5);
+	std::cout << "debug_image_queue_size = " << debug_image_queue_size << std::endl;
+	node_handle_.param("debug_image_sampling_step", debug_image_sampling_step, 1);
+	std::cout << "debug_image_sampling_step = " << debug_image_sampling_step << std::endl;
+	std::string debug_image_directory;
+	node_handle_.param<std::string>("debug_image_directory", debug_image_directory, "/tmp");
+	std::cout << "debug_image_directory = " << debug_image_directory << std::endl;
+	debug_image_publisher_.init(it_, debug_images, debug_image_queue_size, debug_image_sampling_step, debug_image_directory);
+
 	// advertise services
 	map_points_accessibility_check_server_ = node_handle_.advertiseService("map_points_accessibility_check", &MapAccessibilityAnalysis::checkPose2DArrayCallback, this);
 	map_perimeter_accessibility_check_server_ = node_handle_.advertiseService("map_perimeter_accessibility_check", &MapAccessibilityAnalysis::checkPerimeterCallback, this);
@@ -126,9 +153,15 @@ MapAccessibilityAnalysis::MapAccessibilityAnalysis(ros::NodeHandle nh)
 
 MapAccessibilityAnalysis::~MapAccessibilityAnalysis()
 {
+	debug_image_publisher_.stop();
 	if (it_ != 0) delete it_;
 }
 
+int MapAccessibilityAnalysis::getNumberServiceThreads() const
+{
+	return std::max(1, number_service_threads_);
+}
+
 std::vector<geometry_msgs::Point> MapAccessibilityAnalysis::loadRobotFootprint(XmlRpc::XmlRpcValue& footprint_list)
 {
 	std::vector<geometry_msgs::Point> footprint;
@@ -319,8 +352,11 @@ void MapAccessibilityAnalysis::mapDataCallback(const nav_msgs::OccupancyGrid::Co
 	// compute inflated static map
 	std::cout << "inflation thickness: " << cvRound(robot_radius_*inverse_map_resolution_) << std::endl;
 	cv::erode(original_map_, inflated_original_map_, cv::Mat(), cv::Point(-1,-1), cvRound(robot_radius_*inverse_map_resolution_));
-	if (inflated_map_.empty() == true)
-		inflated_map_ = inflated_original_map_;	// initial setup (if no obstacle msgs were received yet)
+	{
+		boost::mutex::scoped_lock lock(mutex_map_update_);
+		if (accessibility_map_ == 0)
+			setAccessibilityMap(inflated_original_map_);	// initial setup (if no obstacle msgs were received yet)
+	}
 
 	map_data_recieved_ = true;
 	map_msg_sub_.shutdown();
@@ -330,14 +366,16 @@ void MapAccessibilityAnalysis::inflatedObstacleDataCallback(const nav_msgs::Grid
 {
 	if (obstacle_topic_update_rate_!=0.0  &&  (ros::Time::now()-last_update_time_obstacles_) > obstacle_topic_update_delay_)
 	{
-		boost::mutex::scoped_lock lock(mutex_inflated_map_);
+		boost::mutex::scoped_lock lock(mutex_map_update_);
 
-		inflated_map_ = inflated_original_map_.clone();
+		cv::Mat inflated_map = inflated_original_map_.clone();
 		for (unsigned int i=0; i<obstacles_data->cells.size(); ++i)
-			inflated_map_.at<uchar>((obstacles_data->cells[i].y - map_origin_.y) * inverse_map_resolution_, (obstacles_data->cells[i].x - map_origin_.x) * inverse_map_resolution_) = 0;
+			inflated_map.at<uchar>((obstacles_data->cells[i].y - map_origin_.y) * inverse_map_resolution_, (obstacles_data->cells[i].x - map_origin_.x) * inverse_map_resolution_) = 0;
 
 		for (unsigned int i = 0; i < inflated_obstacles_data->cells.size(); i++)
-			inflated_map_.at<uchar>((inflated_obstacles_data->cells[i].y - map_origin_.y) * inverse_map_resolution_, (inflated_obstacles_data->cells[i].x - map_origin_.x) * inverse_map_resolution_) = 0;
+			inflated_map.at<uchar>((inflated_obstacles_data->cells[i].y - map_origin_.y) * inverse_map_resolution_, (inflated_obstacles_data->cells[i].x - map_origin_.x) * inverse_map_resolution_) = 0;
+
+		setAccessibilityMap(inflated_map);
 
 		last_update_time_obstacles_ = ros::Time::now();
 	}
@@ -349,22 +387,23 @@ void MapAccessibilityAnalysis::obstacleDataCallback(const nav_msgs::GridCells::C
 	{
 		double radius = cvRound(robot_radius_*inverse_map_resolution_);
 
-		boost::mutex::scoped_lock lock(mutex_inflated_map_);
+		boost::mutex::scoped_lock lock(mutex_map_update_);
 
-		inflated_map_ = inflated_original_map_.clone();
+		cv::Mat inflated_map = inflated_original_map_.clone();
 		for (unsigned int i=0; i<obstacles_data->cells.size(); ++i)
 		{
 			int x = (obstacles_data->cells[i].x - map_origin_.x) * inverse_map_resolution_;
 			int y = (obstacles_data->cells[i].y - map_origin_.y) * inverse_map_resolution_;
-			inflated_map_.at<uchar>(y, x) = 0;
-			cv::circle(inflated_map_, cv::Point(x,y), radius, cv::Scalar(0,0,0,0), -1);
+			inflated_map.at<uchar>(y, x) = 0;
+			cv::circle(inflated_map, cv::Point(x,y), radius, cv::Scalar(0,0,0,0), -1);
 		}
+		setAccessibilityMap(inflated_map);
 
 		if (publish_inflated_map_ == true)
 		{
 			// publish image
 			cv_bridge::CvImage cv_ptr;
-			cv_ptr.image = inflated_map_;
+			cv_ptr.image = inflated_map;
 			cv_ptr.encoding = "mono8";
 			inflated_map_image_pub_.publish(cv_ptr.toImageMsg());
 		}
@@ -377,57 +416,46 @@ bool MapAccessibilityAnalysis::checkPose2DArrayCallback(cob_map_accessibility_an
 {
 	ROS_INFO("Received request to check accessibility of %u points.", (unsigned int)req.points_to_check.size());
 
-	const bool value_approach_path_accessibility_check_ = approach_path_accessibility_check_;
-	approach_path_accessibility_check_ = req.approach_path_accessibility_check;
+	// the request parameter applies to this request only (requests are served in parallel)
+	const bool approach_path_accessibility_check = req.approach_path_accessibility_check;
 
 	// determine robot pose if approach path analysis activated
 	cv::Point robot_location(0,0);
-	if (approach_path_accessibility_check_ == true)
+	if (approach_path_accessibility_check == true)
 		robot_location = getRobotLocationInPixelCoordinates();
 
 	res.accessibility_flags.resize(req.points_to_check.size(), false);
 	{
-		boost::mutex::scoped_lock lock(mutex_inflated_map_);
+		AccessibilityMapPtr accessibility_map = getAccessibilityMap();
+		const cv::Mat& inflated_map = accessibility_map->inflated_map;
 
-#ifdef __DEBUG_DISPLAYS__
-		cv::Mat display_map = inflated_map_.clone();
-#endif
+		const bool debug_image = debug_image_publisher_.sample();
+		cv::Mat display_map;
+		if (debug_image == true)
+			display_map = inflated_map.clone();
 
 		// find the individual connected areas
-		std::vector< std::vector<cv::Point> > area_contours;		// first index=contour index;  second index=point index within contour
-		if (approach_path_accessibility_check_ == true)
-		{
-			cv::Mat inflated_map_copy = inflated_map_.clone();
-			cv::findContours(inflated_map_copy, area_contours, CV_RETR_LIST, CV_CHAIN_APPROX_SIMPLE);
-		}
+		static const std::vector< std::vector<cv::Point> > no_contours;
+		const std::vector< std::vector<cv::Point> >& area_contours = (approach_path_accessibility_check == true ? accessibility_map->getAreaContours() : no_contours);
 
 		for (unsigned int i=0; i<req.points_to_check.size(); ++i)
 		{
 			int u = cvRound((req.points_to_check[i].x-map_origin_.x)*inverse_map_resolution_);
 			int v = cvRound((req.points_to_check[i].y-map_origin_.y)*inverse_map_resolution_);
 			std::cout << "Checking accessibility of point (" << req.points_to_check[i].x << ", " << req.points_to_check[i].y << ")m / (" << u << ", " << v << ")pix." << std::endl;
-			if (inflated_map_.at<uchar>(v, u) != 0)
+			if (u >= 0 && v >= 0 && u < inflated_map.cols && v < inflated_map.rows && inflated_map.at<uchar>(v, u) != 0)
 				// check if robot can approach this position
-				if (approach_path_accessibility_check_==false || isApproachPositionAccessible(robot_location, cv::Point(u,v), area_contours)==true)
+				if (approach_path_accessibility_check==false || isApproachPositionAccessible(robot_location, cv::Point(u,v), area_contours)==true)
 					res.accessibility_flags[i] = true;
 
-#ifdef __DEBUG_DISPLAYS__
-			if (res.accessibility_flags[i] == false)
-				cv::circle(display_map, cv::Point((req.points_to_check[i].x-map_origin_.x)*inverse_map_resolution_, (req.points_to_check[i].y-map_origin_.y)*inverse_map_resolution_), 2, cv::Scalar(64), 10);
-			else
-				cv::circle(display_map, cv::Point((req.points_to_check[i].x-map_origin_.x)*inverse_map_resolution_, (req.points_to_check[i].y-map_origin_.y)*inverse_map_resolution_), 2, cv::Scalar(192), 10);
-#endif
+			if (debug_image == true)
+				cv::circle(display_map, cv::Point((req.points_to_check[i].x-map_origin_.x)*inverse_map_resolution_, (req.points_to_check[i].y-map_origin_.y)*inverse_map_resolution_), 2, cv::Scalar(res.accessibility_flags[i] ? 192 : 64), 10);
 		}
 
-#ifdef __DEBUG_DISPLAYS__
-		cv::imshow("points", display_map);
-		cv::waitKey();
-#endif
+		if (debug_image == true)
+			debug_image_publisher_.push("points", display_map);
 	}
 
-	// reset parameter
-	approach_path_accessibility_check_ = value_approach_path_accessibility_check_;
-
 	return true;
 }
 
@@ -447,27 +475,42 @@ bool MapAccessibilityAnalysis::checkPerimeterCallback(cob_map_accessibility_anal
 		robot_location = getRobotLocationInPixelCoordinates();
 
 	{
-		boost::mutex::scoped_lock lock(mutex_inflated_map_);
+		AccessibilityMapPtr accessibility_map = getAccessibilityMap();
+		const cv::Mat& inflated_map = accessibility_map->inflated_map;
 
-#ifdef __DEBUG_DISPLAYS__
-		cv::Mat display_map = inflated_map_.clone();
-#endif
+		const bool debug_image = debug_image_publisher_.sample();
+		cv::Mat display_map;
+		if (debug_image == true)
+			display_map = inflated_map.clone();
 
 		// find the individual connected areas
-		std::vector< std::vector<cv::Point> > area_contours;		// first index=contour index;  second index=point index within contour
-		if (approach_path_accessibility_check_ == true)
-		{
-			cv::Mat inflated_map_copy = inflated_map_.clone();
-			cv::findContours(inflated_map_copy, area_contours, CV_RETR_LIST, CV_CHAIN_APPROX_SIMPLE);
-		}
+		static const std::vector< std::vector<cv::Point> > no_contours;
+		const std::vector< std::vector<cv::Point> >& area_contours = (approach_path_accessibility_check_ == true ? accessibility_map->getAreaContours() : no_contours);
 
+		// maximum distance between two neighboring samples on the perimeter, in [pixel]
+		const double sample_distance = req.radius*req.rotational_sampling_step*inverse_map_resolution_;
 		for (double angle=req.center.theta; angle<req.center.theta+2*CV_PI; angle+=req.rotational_sampling_step)
 		{
 			double x = req.center.x + req.radius * cos(angle);
 			double y = req.center.y + req.radius * sin(angle);
-			int u = (x-map_origin_.x)*inverse_map_resolution_;
-			int v = (y-map_origin_.y)*inverse_map_resolution_;
-			if (inflated_map_.at<uchar>(v, u) == 255)
+			const double u_subpixel = (x-map_origin_.x)*inverse_map_resolution_;
+			const double v_subpixel = (y-map_origin_.y)*inverse_map_resolution_;
+			int u = u_subpixel;
+			int v = v_subpixel;
+			if (u_subpixel < 0. || v_subpixel < 0. || u >= inflated_map.cols || v >= inflated_map.rows)
+				continue;
+
+			// coarse-to-fine: reject the whole arc that runs through a blocked cell of the pyramid at once
+			const int blocked_samples = getNumberOfBlockedSamples(accessibility_map->pyramid, u_subpixel, v_subpixel, sample_distance);
+			if (blocked_samples > 0)
+			{
+				if (debug_image == true)
+					cv::circle(display_map, cv::Point(u, v), 2, cv::Scalar(64), 5);
+				angle += (blocked_samples-1)*req.rotational_sampling_step;
+				continue;
+			}
+
+			if (inflated_map.at<uchar>(v, u) == 255)
 			{
 				// check if robot can approach this position
 				if (approach_path_accessibility_check_==false || isApproachPositionAccessible(robot_location, cv::Point(u,v), area_contours)==true)
@@ -483,23 +526,19 @@ bool MapAccessibilityAnalysis::checkPerimeterCallback(cob_map_accessibility_anal
 						pose.theta += 2*CV_PI;
 					res.accessible_poses_on_perimeter.push_back(pose);
 
-#ifdef __DEBUG_DISPLAYS__
-					cv::circle(display_map, cv::Point(u, v), 2, cv::Scalar(192), 5);
-#endif
+					if (debug_image == true)
+						cv::circle(display_map, cv::Point(u, v), 2, cv::Scalar(192), 5);
 				}
 			}
 			else
 			{
-#ifdef __DEBUG_DISPLAYS__
-				cv::circle(display_map, cv::Point(u, v), 2, cv::Scalar(64), 5);
-#endif
+				if (debug_image == true)
+					cv::circle(display_map, cv::Point(u, v), 2, cv::Scalar(64), 5);
 			}
 		}
 
-#ifdef __DEBUG_DISPLAYS__
-		cv::imshow("perimeter", display_map);
-		cv::waitKey();
-#endif
+		if (debug_image == true)
+			debug_image_publisher_.push("perimeter", display_map);
 	}
 
 	return true;
@@ -537,16 +576,27 @@ bool MapAccessibilityAnalysis::checkPolygonCallback(cob_3d_mapping_msgs::GetAppr
 	int iterations = cvRound(robot_radius_*inverse_map_resolution_);
 	cv::erode(polygon_expanded, polygon_expanded, cv::Mat(), cv::Point(-1,-1), iterations);
 
-	// combine inflated polygon with inflated map
-	cv::Mat inflated_map;
+	// only the surrounding of the polygon can contain approach poses
+	cv::Rect polygon_roi(1, 1, original_map_.cols-2, original_map_.rows-2);
+	if (polygon_contours.empty() == false)
 	{
-		boost::mutex::scoped_lock lock(mutex_inflated_map_);
-		inflated_map = cv::min(polygon_expanded, inflated_map_);
+		std::vector<cv::Point> polygon_points;
+		for (unsigned int i=0; i<polygon_contours.size(); ++i)
+			polygon_points.insert(polygon_points.end(), polygon_contours[i].begin(), polygon_contours[i].end());
+		const cv::Rect bounding_box = cv::boundingRect(polygon_points);
+		const int margin = iterations + 2;
+		polygon_roi &= cv::Rect(bounding_box.x-margin, bounding_box.y-margin, bounding_box.width+2*margin, bounding_box.height+2*margin);
 	}
-#ifdef __DEBUG_DISPLAYS__
-	cv::imshow("inflated polygon map", inflated_map);
-	cv::waitKey();
-#endif
+
+	// combine inflated polygon with inflated map
+	AccessibilityMapPtr accessibility_map = getAccessibilityMap();
+	cv::Mat inflated_map = cv::min(polygon_expanded, accessibility_map->inflated_map);
+	const std::vector<cv::Mat>& inflated_map_pyramid = accessibility_map->pyramid;
+	// coarsest pyramid level used for skipping blocked regions (blocked in the accessibility map implies blocked in inflated_map)
+	const int skip_level = std::max(0, (int)inflated_map_pyramid.size()-1);
+	const bool debug_image = debug_image_publisher_.sample();
+	if (debug_image == true)
+		debug_image_publisher_.push("inflated_polygon_map", inflated_map);
 
 	// find the individual connected areas
 	std::vector< std::vector<cv::Point> > area_contours;		// first index=contour index;  second index=point index within contour
@@ -557,14 +607,23 @@ bool MapAccessibilityAnalysis::checkPolygonCallback(cob_3d_mapping_msgs::GetAppr
 	}
 
 	// iterate through all white points and consider those as potential approach poses that have an expanded table pixel in their neighborhood
-#ifdef __DEBUG_DISPLAYS__
-	cv::Mat map_expanded_copy = inflated_map.clone();
-	cv::drawContours(map_expanded_copy, area_contours, -1, cv::Scalar(128,128,128,128), 2);
-#endif
-	for (int y=1; y<inflated_map.rows-1; y++)
+	cv::Mat map_expanded_copy;
+	if (debug_image == true)
+	{
+		map_expanded_copy = inflated_map.clone();
+		cv::drawContours(map_expanded_copy, area_contours, -1, cv::Scalar(128,128,128,128), 2);
+	}
+	for (int y=polygon_roi.y; y<polygon_roi.y+polygon_roi.height; y++)
 	{
-		for (int x=1; x<inflated_map.cols-1; x++)
+		for (int x=polygon_roi.x; x<polygon_roi.x+polygon_roi.width; x++)
 		{
+			// coarse-to-fine: jump over the remainder of a completely blocked cell of the pyramid
+			if (skip_level > 0 && inflated_map_pyramid[skip_level].at<uchar>(y>>skip_level, x>>skip_level) == 0)
+			{
+				x = (((x>>skip_level)+1)<<skip_level) - 1;
+				continue;
+			}
+
 			if (inflated_map.at<uchar>(y,x)==255)
 			{
 				bool close_to_polygon = false;
@@ -590,31 +649,59 @@ bool MapAccessibilityAnalysis::checkPolygonCallback(cob_3d_mapping_msgs::GetAppr
 						pose.position.z = 0;
 
 						Pose closest_point_on_polygon;
-						computeClosestPointOnPolygon(inflated_map, pose_p, closest_point_on_polygon);
+						computeClosestPointOnPolygon(inflated_map, polygon_roi, pose_p, closest_point_on_polygon);
 
 						tf::quaternionTFToMsg(tf::createQuaternionFromYaw(atan2(closest_point_on_polygon.y-pose_p.y, closest_point_on_polygon.x-pose_p.x)), pose.orientation);
 						//tf::quaternionTFToMsg(tf::createQuaternionFromYaw(atan2(-dy.at<float>(y,x),-dx.at<float>(y,x))), pose.orientation);
 						res.approach_poses.poses.push_back(pose);
 					}
 
-#ifdef __DEBUG_DISPLAYS__
-					// display found contours
-					cv::circle(map_expanded_copy, robot_location, 3, cv::Scalar(200,200,200,200), -1);
-					cv::circle(map_expanded_copy, cv::Point(x,y), 3, cv::Scalar(200,200,200,200), -1);
-//					std::cout << " x=" << x << "  y=" << y << "\n";
-#endif
+					if (debug_image == true)
+					{
+						// display found contours
+						cv::circle(map_expanded_copy, robot_location, 3, cv::Scalar(200,200,200,200), -1);
+						cv::circle(map_expanded_copy, cv::Point(x,y), 3, cv::Scalar(200,200,200,200), -1);
+					}
 				}
 			}
 		}
 	}
-#ifdef __DEBUG_DISPLAYS__
-	cv::imshow("contour areas", map_expanded_copy);
-	cv::waitKey();
-#endif
+	if (debug_image == true)
+		debug_image_publisher_.push("contour_areas", map_expanded_copy);
 
 	return true;
 }
 
+MapAccessibilityAnalysis::AccessibilityMapPtr MapAccessibilityAnalysis::getAccessibilityMap()
+{
+	boost::shared_lock<boost::shared_mutex> lock(mutex_accessibility_map_);
+	return accessibility_map_;
+}
+
+void MapAccessibilityAnalysis::setAccessibilityMap(const cv::Mat& inflated_map)
+{
+	// skip updates which do not change the map, so that the map version stays the same (only map updates modify accessibility_map_)
+	if (accessibility_map_ != 0 && accessibility_map_->inflated_map.size() == inflated_map.size() && cv::countNonZero(accessibility_map_->inflated_map != inflated_map) == 0)
+		return;
+
+	// prepare the new snapshot without blocking the service callbacks
+	AccessibilityMapPtr accessibility_map(new AccessibilityMap());
+	accessibility_map->inflated_map = inflated_map;
+	computeAccessibilityPyramid(inflated_map, accessibility_map->pyramid);
+
+	{
+		boost::unique_lock<boost::shared_mutex> lock(mutex_accessibility_map_);
+		accessibility_map_ = accessibility_map;
+	}
+
+	std_msgs::UInt32 map_version;
+	map_version.data = ++map_version_;
+	map_version_pub_.publish(map_version);
+
+	if (export_shared_map_ == true)
+		shared_map_writer_.write(inflated_map, map_resolution_, map_origin_);
+}
+
 cv::Point MapAccessibilityAnalysis::getRobotLocationInPixelCoordinates()
 {
 	tf::StampedTransform transform;
@@ -635,7 +722,7 @@ cv::Point MapAccessibilityAnalysis::getRobotLocationInPixelCoordinates()
     return robot_location;
 }
 
-bool MapAccessibilityAnalysis::isApproachPositionAccessible(const cv::Point& robotLocation, const cv::Point& potentialApproachPose, std::vector< std::vector<cv::Point> > contours)
+bool MapAccessibilityAnalysis::isApproachPositionAccessible(const cv::Point& robotLocation, const cv::Point& potentialApproachPose, const std::vector< std::vector<cv::Point> >& contours)
 {
 	// check whether potentialApproachPose and robotLocation are in the same area (=same contour)
 	int contourIndexRobot = -1;
@@ -656,12 +743,12 @@ bool MapAccessibilityAnalysis::isApproachPositionAccessible(const cv::Point& rob
 
 
 // pose_p and closest_point_on_polygon in pixel coordinates!
-void MapAccessibilityAnalysis::computeClosestPointOnPolygon(const cv::Mat& map_with_polygon, const Pose& pose_p, Pose& closest_point_on_polygon)
+void MapAccessibilityAnalysis::computeClosestPointOnPolygon(const cv::Mat& map_with_polygon, const cv::Rect& roi, const Pose& pose_p, Pose& closest_point_on_polygon)
 {
 	double closest_pixel_distance_squared = 1e10;
-	for (int v=0; v<map_with_polygon.rows; v++)
+	for (int v=roi.y; v<roi.y+roi.height; v++)
 	{
-		for (int u=0; u<map_with_polygon.cols; u++)
+		for (int u=roi.x; u<roi.x+roi.width; u++)
 		{
 			double dist_squared = 0;
 			if (map_with_polygon.at<uchar>(v,u) == 128 && (dist_squared=(pose_p.x-u)*(pose_p.x-u)+(pose_p.y-v)*(pose_p.y-v))<closest_pixel_distance_squared)
@@ -675,6 +762,50 @@ void MapAccessibilityAnalysis::computeClosestPointOnPolygon(const cv::Mat& map_w
 }
 
 
+void MapAccessibilityAnalysis::computeAccessibilityPyramid(const cv::Mat& map, std::vector<cv::Mat>& pyramid)
+{
+	pyramid.clear();
+	pyramid.push_back(map);
+	for (int level=1; level<=accessibility_pyramid_levels_; ++level)
+	{
+		const cv::Mat& finer = pyramid.back();
+		if (finer.rows < 2 && finer.cols < 2)
+			break;
+		cv::Mat coarser = cv::Mat::zeros((finer.rows+1)/2, (finer.cols+1)/2, CV_8UC1);
+		for (int v=0; v<finer.rows; ++v)
+		{
+			const uchar* finer_row = finer.ptr<uchar>(v);
+			uchar* coarser_row = coarser.ptr<uchar>(v/2);
+			for (int u=0; u<finer.cols; ++u)
+				if (finer_row[u] > coarser_row[u/2])
+					coarser_row[u/2] = finer_row[u];
+		}
+		pyramid.push_back(coarser);
+	}
+}
+
+
+int MapAccessibilityAnalysis::getNumberOfBlockedSamples(const std::vector<cv::Mat>& pyramid, const double u, const double v, const double sample_distance)
+{
+	// search the coarsest blocked cell containing (u,v)
+	for (int level=(int)pyramid.size()-1; level>0; --level)
+	{
+		const int cell_u = (int)u >> level;
+		const int cell_v = (int)v >> level;
+		if (pyramid[level].at<uchar>(cell_v, cell_u) != 0)
+			continue;
+
+		// all following samples closer than the distance to the cell border lie inside the blocked cell as well
+		const double cell_size = (double)(1 << level);
+		const double distance_to_border = std::min(std::min(u - cell_u*cell_size, (cell_u+1)*cell_size - u), std::min(v - cell_v*cell_size, (cell_v+1)*cell_size - v));
+		if (sample_distance <= 0.)
+			return std::numeric_limits<int>::max()/2;
+		return 1 + (int)((distance_to_border - 1e-6) / sample_distance);
+	}
+	return 0;
+}
+
+
 template <class T>
 T MapAccessibilityAnalysis::convertFromMeterToPixelCoordinates(const Pose& pose)
 {
@@ -702,7 +833,10 @@ int main(int argc, char** argv)
 
 	MapAccessibilityAnalysis map_accessibility_analysis(nh);
 
-	ros::spin();
+	// serve the point, perimeter and polygon requests as well as the map updates in parallel
+	ros::AsyncSpinner spinner(map_accessibility_analysis.getNumberServiceThreads());
+	spinner.start();
+	ros::waitForShutdown();
 
 	return 0;
 }
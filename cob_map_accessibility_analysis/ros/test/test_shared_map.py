@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy
+
+from cob_map_accessibility_analysis.shared_map import *
+
+
+def write_segment(path, map, sequence, resolution=0.05, origin=(-1.0, -2.0), map_version=1, size=None):
+  # writes the segment like SharedMapWriter (which only grows the segment)
+  height, width = map.shape
+  data = struct.pack(SHARED_MAP_HEADER_FORMAT, SHARED_MAP_MAGIC, SHARED_MAP_LAYOUT_VERSION, sequence, width, height, width,
+                     resolution, origin[0], origin[1], map_version)
+  data += b"\0" * (SHARED_MAP_DATA_OFFSET-len(data)) + map.tobytes()
+  if size != None:
+    data += b"\0" * (size-len(data))
+  mode = "r+b" if os.path.exists(path) else "wb"
+  with open(path, mode) as f:
+    f.write(data)
+
+
+def set_sequence(path, sequence):
+  with open(path, "r+b") as f:
+    f.seek(SHARED_MAP_SEQUENCE_OFFSET)
+    f.write(struct.pack("<I", sequence))
+
+
+class TestSharedInflatedMap(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.path = os.path.join(self.directory, "cob_inflated_map")
+    self.map = numpy.zeros((4, 6), dtype=numpy.uint8)
+    self.map[1, 2] = 255
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def test_missing_segment(self):
+    shared_map = SharedInflatedMap(shm_directory=self.directory)
+    self.assertEqual(shared_map.view(timeout=0.01), (None, None, None))
+
+  def test_seqlock_read(self):
+    write_segment(self.path, self.map, 2)
+    shared_map = SharedInflatedMap(shm_directory=self.directory)
+    (sequence, header, data) = shared_map.view()
+    self.assertEqual(sequence, 2)
+    self.assertEqual((header["width"], header["height"], header["map_version"]), (6, 4, 1))
+    self.assertTrue((data == self.map).all())
+    self.assertTrue(shared_map.is_consistent(sequence))
+    self.assertTrue(shared_map.is_accessible(-1.0+2.5*0.05, -2.0+1.5*0.05))
+    self.assertFalse(shared_map.is_accessible(-1.0+0.5*0.05, -2.0+0.5*0.05))
+
+    # a write in progress is not read, a finished write invalidates older views
+    set_sequence(self.path, 3)
+    self.assertEqual(shared_map.view(timeout=0.01), (None, None, None))
+    self.assertEqual(shared_map.snapshot(timeout=0.01), (None, None))
+    self.assertIsNone(shared_map.is_accessible(0.0, 0.0, timeout=0.01))
+    set_sequence(self.path, 4)
+    self.assertFalse(shared_map.is_consistent(sequence))
+    (header, data) = shared_map.snapshot()
+    self.assertTrue((data == self.map).all())
+
+  def test_resized_and_recreated_segment(self):
+    write_segment(self.path, self.map, 2)
+    shared_map = SharedInflatedMap(shm_directory=self.directory)
+    (sequence, header, old_data) = shared_map.view()
+
+    # the segment grows with a larger map
+    larger_map = numpy.full((8, 10), 255, dtype=numpy.uint8)
+    write_segment(self.path, larger_map, 4, map_version=2)
+    (header, data) = shared_map.snapshot()
+    self.assertEqual((header["width"], header["height"], header["map_version"]), (10, 8, 2))
+    self.assertTrue((data == larger_map).all())
+
+    # a restarted server creates a new segment, which may be smaller
+    os.unlink(self.path)
+    write_segment(self.path, self.map, 2, map_version=1)
+    (header, data) = shared_map.snapshot()
+    self.assertEqual(header["map_version"], 1)
+    self.assertTrue((data == self.map).all())
+
+    # views obtained before stay readable after remapping and closing
+    shared_map.close()
+    self.assertEqual(old_data[1, 2], 255)
+
+
+if __name__ == '__main__':
+  import rosunit
+  rosunit.unitrun('cob_map_accessibility_analysis', 'test_shared_map', TestSharedInflatedMap)